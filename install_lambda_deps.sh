@@ -9,6 +9,11 @@ echo "Installing dependencies for Lambda layers..."
 # Use an older version of cryptography that's compatible with Lambda's GLIBC
 pip install --target package/python langchain-text-splitters==0.3.8 pydantic==2.11.3 regex opensearch-py==2.0.0 requests-aws4auth==1.1.0 pyjwt==2.6.0 cryptography==36.0.0 aws-xray-sdk==2.12.0
 
+# numpy is imported by policy_search for its semantic cache. Install the binary wheel
+# built for the Lambda runtime (python3.9 on x86_64), whatever the build machine runs
+pip install --target package/python --platform manylinux2014_x86_64 --python-version 3.9 \
+  --implementation cp --only-binary=:all: numpy==1.26.4
+
 # Clean up unnecessary files to reduce size
 echo "Cleaning up to reduce layer size..."
 find package -type d -name "__pycache__" -exec rm -rf {} +
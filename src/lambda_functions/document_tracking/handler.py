@@ -5,10 +5,27 @@ This Lambda subscribes to SNS topics and updates DynamoDB with tracking informat
 import json
 import logging
 import os
+import sys
 import boto3
 import decimal
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+try:
+    # orjson parses SNS message payloads considerably faster than the stdlib
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    json_loads = json.loads
+
+try:  # pragma: no cover
+    # When running in the Lambda environment with utils from the layer
+    from utils.tracking_utils import ATTRIBUTE_NAMES, to_full_names
+except ImportError:  # pragma: no cover
+    # When running locally or in tests with src structure
+    from src.utils.tracking_utils import ATTRIBUTE_NAMES, to_full_names
 
 
 # Helper class to convert Decimal objects to int/float for JSON serialization
@@ -33,9 +50,128 @@ region = os.environ.get("AWS_REGION", "eu-west-2")
 # Get environment variables
 TRACKING_TABLE = os.environ.get("TRACKING_TABLE", "ee-ai-rag-mcp-demo-doc-tracking")
 
+# Initialization types that run outside a request, where warming up adds no user latency
+WARM_UP_INITIALIZATION_TYPES = ("provisioned-concurrency", "snap-start")
+
+# Maximum number of SNS records processed concurrently per invocation
+MAX_RECORD_WORKERS = int(os.environ.get("MAX_RECORD_WORKERS", "16"))
+
 # Constants
 ERROR_MISSING_REQUIRED_FIELDS = "Missing required fields in message data"
 
+# Error code returned when an update's ConditionExpression is not met
+CONDITIONAL_CHECK_FAILED = "ConditionalCheckFailedException"
+
+# Only mark an existing document COMPLETED, and only once. Items created by chunk
+# updates that arrived before their start message have no status yet.
+NOT_COMPLETED_CONDITION = (
+    "attribute_exists(document_id) AND (attribute_not_exists(st) OR st <> :completed_status)"
+)
+
+# SNS subjects are interned so routing can use identity comparison
+SUBJECT_PROCESSING_STARTED = sys.intern("Document Processing Started")
+SUBJECT_CHUNK_INDEXED = sys.intern("Document Chunk Indexed")
+SUBJECT_INDEXING_COMPLETED = sys.intern("Document Indexing Completed")
+
+
+def error_result(message):
+    """
+    Build the result for a record that could not be processed.
+
+    Args:
+        message (str): Error message
+
+    Returns:
+        dict: Error result
+    """
+    return {"status": "error", "message": message}
+
+
+def success_result(document_id, message, **details):
+    """
+    Build the result for a successfully processed record.
+
+    Args:
+        document_id (str): The document ID
+        message (str): Result message
+        **details: Additional fields to include in the result
+
+    Returns:
+        dict: Success result
+    """
+    return {"status": "success", "document_id": document_id, "message": message, **details}
+
+
+def to_stored_item(item):
+    """
+    Convert a tracking item to its stored form using short attribute names.
+
+    Args:
+        item (dict): Tracking item with full attribute names
+
+    Returns:
+        dict: Tracking item with short attribute names
+    """
+    return {ATTRIBUTE_NAMES.get(name, name): value for name, value in item.items()}
+
+
+def current_timestamp():
+    """
+    Get the current time as integer epoch seconds.
+
+    Returns:
+        int: Epoch seconds
+    """
+    return int(datetime.now().timestamp())
+
+
+def to_epoch(value, default):
+    """
+    Convert a timestamp to integer epoch seconds.
+
+    Args:
+        value: ISO 8601 string or numeric epoch timestamp
+        default (int): Epoch seconds to use when the value cannot be converted
+
+    Returns:
+        int: Epoch seconds
+    """
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except (TypeError, ValueError):
+        return default
+
+
+# Converts DynamoDB stream images from their typed JSON form to Python values
+type_deserializer = TypeDeserializer()
+
+# Initialize the DynamoDB resource and table once per container, outside the request path
+dynamodb = boto3.resource("dynamodb", region_name=region)
+tracking_table = dynamodb.Table(TRACKING_TABLE)
+
+
+def warm_up():
+    """
+    Force boto3 endpoint and credential resolution during the Lambda init phase.
+    Under SnapStart or provisioned concurrency this cost is paid once at init
+    rather than by the first request.
+    """
+    try:
+        tracking_table.meta.client.describe_table(TableName=TRACKING_TABLE)
+    except Exception as e:
+        logger.warning(f"DynamoDB warm-up failed: {str(e)}")
+
+
+# Only warm up when the environment is initialized ahead of requests. On-demand cold
+# starts would make the first request wait for the extra DescribeTable call, and tests
+# or tooling importing the module have no initialization type at all
+if (
+    os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") in WARM_UP_INITIALIZATION_TYPES
+):  # pragma: no cover
+    warm_up()
+
 
 def get_document_history(base_document_id):
     """
@@ -49,27 +185,50 @@ def get_document_history(base_document_id):
         list: Processing records sorted by timestamp
     """
     try:
-        dynamodb = boto3.resource("dynamodb", region_name=region)
-        tracking_table = dynamodb.Table(TRACKING_TABLE)
-
         response = tracking_table.query(
             IndexName="BaseDocumentIndex",
             KeyConditionExpression=Key("base_document_id").eq(base_document_id),
             ScanIndexForward=False,  # Newest first
         )
 
-        return response.get("Items", [])
+        return [to_full_names(item) for item in response.get("Items", [])]
     except Exception as e:
         logger.error(f"Error getting document history: {str(e)}")
         return []
 
 
-def complete_document_indexing(message_data):
+def update_tracking_item(document_id, update_expression, values, **kwargs):
+    """
+    Update a tracking item through the table's low-level client.
+    Unlike the Table resource, low-level clients are thread-safe, so the message
+    handlers that lambda_handler runs in worker threads write through this. The
+    resource's client still converts values to and from DynamoDB's typed form.
+
+    Args:
+        document_id (str): The document ID
+        update_expression (str): The UpdateExpression
+        values (dict): The ExpressionAttributeValues
+        **kwargs: Additional update_item parameters, e.g. ConditionExpression
+
+    Returns:
+        dict: The update_item response
+    """
+    return tracking_table.meta.client.update_item(
+        TableName=TRACKING_TABLE,
+        Key={"document_id": document_id},
+        UpdateExpression=update_expression,
+        ExpressionAttributeValues=values,
+        **kwargs,
+    )
+
+
+def complete_document_indexing(message_data, now=None):
     """
     Mark document indexing as completed.
 
     Args:
         message_data (dict): Data from the SNS message
+        now (int, optional): Current epoch seconds, computed once per invocation
 
     Returns:
         dict: Result of the operation
@@ -78,67 +237,56 @@ def complete_document_indexing(message_data):
         # Extract data from the message
         document_id = message_data.get("document_id")
         total_chunks = message_data.get("total_chunks")
-        completion_time = message_data.get("completion_time", datetime.now().isoformat())
+        if now is None:
+            now = current_timestamp()
+        completion_time = to_epoch(message_data.get("completion_time"), now)
 
         # Validate required fields
         if not all([document_id, total_chunks]):
-            return {"status": "error", "message": ERROR_MISSING_REQUIRED_FIELDS}
+            return error_result(ERROR_MISSING_REQUIRED_FIELDS)
 
         logger.info(f"Completing indexing for document: {document_id}")
 
         # Update DynamoDB record to mark document as COMPLETED
-        dynamodb = boto3.resource("dynamodb", region_name=region)
-        tracking_table = dynamodb.Table(TRACKING_TABLE)
         try:
             # Only update if status isn't already COMPLETED (avoid race conditions)
-            update_result = tracking_table.update_item(
-                Key={"document_id": document_id},
-                UpdateExpression=(
-                    "SET #status = :status, "
-                    "completion_time = :completion_time, "
-                    "indexed_chunks = :total_chunks"
-                ),
-                ConditionExpression="#status <> :completed_status",
-                ExpressionAttributeNames={"#status": "status"},
-                ExpressionAttributeValues={
+            update_result = update_tracking_item(
+                document_id,
+                "SET st = :status, cts = :completion_time, ic = :total_chunks",
+                {
                     ":status": "COMPLETED",
                     ":completion_time": completion_time,
                     ":completed_status": "COMPLETED",
                     ":total_chunks": total_chunks,  # Ensure indexed_chunks equals total_chunks
                 },
+                ConditionExpression=NOT_COMPLETED_CONDITION,
                 ReturnValues="UPDATED_NEW",
             )
             logger.info(f"Marked document {document_id} as COMPLETED via explicit message")
-        except Exception as e:
-            if "ConditionalCheckFailedException" in str(e):
-                logger.info(f"Document {document_id} already marked as COMPLETED")
-                # Get the current status for logging
-                item_response = tracking_table.get_item(Key={"document_id": document_id})
-                current_item = item_response.get("Item", {})
-                logger.info(f"Current state: {json.dumps(current_item, cls=DecimalEncoder)}")
-                update_result = {"Attributes": current_item}
-            else:
+        except ClientError as e:
+            if e.response["Error"]["Code"] != CONDITIONAL_CHECK_FAILED:
                 logger.warning(f"Error marking document {document_id} as COMPLETED: {str(e)}")
                 raise
+            # The document is either already COMPLETED or has no tracking record, so
+            # the message is a no-op and there is no need to re-read the item
+            logger.info(f"Document {document_id} already COMPLETED or not being tracked")
+            update_result = {}
         logger.info(f"DynamoDB update result: {json.dumps(update_result, cls=DecimalEncoder)}")
 
-        return {
-            "status": "success",
-            "document_id": document_id,
-            "message": f"Document indexing completed for {document_id}",
-        }
+        return success_result(document_id, f"Document indexing completed for {document_id}")
 
     except Exception as e:
         logger.error(f"Error completing document indexing: {str(e)}")
-        return {"status": "error", "message": f"Error completing document indexing: {str(e)}"}
+        return error_result(f"Error completing document indexing: {str(e)}")
 
 
-def update_indexing_progress(message_data):
+def update_indexing_progress(message_data, now=None):
     """
     Update the indexing progress for a document chunk.
 
     Args:
         message_data (dict): Data from the SNS message
+        now (int, optional): Current epoch seconds, computed once per invocation
 
     Returns:
         dict: Result of the operation
@@ -159,74 +307,38 @@ def update_indexing_progress(message_data):
 
         # Validate required fields
         if not all([document_id, page_number]):
-            return {"status": "error", "message": ERROR_MISSING_REQUIRED_FIELDS}
+            return error_result(ERROR_MISSING_REQUIRED_FIELDS)
 
         logger.info(f"Updating: doc={document_id}, name={document_name}, page={page_number}")
 
         # Update DynamoDB record with progress
-        dynamodb = boto3.resource("dynamodb", region_name=region)
-        tracking_table = dynamodb.Table(TRACKING_TABLE)
-
-        # First get the current item to check total_chunks (we need this for progress reporting)
-        item_response = tracking_table.get_item(Key={"document_id": document_id})
-        current_item = item_response.get("Item", {})
-        total_chunks = current_item.get("total_chunks", 0)
-        indexed_chunks = current_item.get("indexed_chunks", 0)
-
-        if is_problematic:
-            logger.info(
-                f"PROBLEMATIC: {document_name} - indexed={indexed_chunks}, total={total_chunks}"
-            )
-
-        # Use DynamoDB's atomic counter increment instead of read-then-write pattern
-        # This avoids race conditions when multiple chunks are processed simultaneously
-        update_result = tracking_table.update_item(
-            Key={"document_id": document_id},
-            UpdateExpression="ADD indexed_chunks :inc",
-            ExpressionAttributeValues={
+        # Atomically increment the counter and read back the full item in a single round trip.
+        # ALL_NEW returns total_chunks alongside the new count, so no prior get_item is needed
+        # and concurrent chunk updates cannot race each other.
+        update_result = update_tracking_item(
+            document_id,
+            "ADD ic :inc SET lu = :timestamp",
+            {
                 ":inc": 1,  # Increment by 1 atomically
+                ":timestamp": current_timestamp() if now is None else now,
             },
-            ReturnValues="UPDATED_NEW",
+            ReturnValues="ALL_NEW",
         )
 
-        # Get the new incremented value from the update result
-        new_indexed_chunks = update_result["Attributes"].get("indexed_chunks", 0)
+        # Get the new incremented value and the total from the update result
+        updated_item = to_full_names(update_result.get("Attributes", {}))
+        new_indexed_chunks = updated_item.get("indexed_chunks", 0)
+        total_chunks = updated_item.get("total_chunks", 0)
         progress_str = f"{new_indexed_chunks}/{total_chunks}"
 
-        # Update the progress_info field with the actual incremented value
-        tracking_table.update_item(
-            Key={"document_id": document_id},
-            UpdateExpression="SET progress_info = :progress",
-            ExpressionAttributeValues={
-                ":progress": progress_str,
-            },
-        )
+        if is_problematic:
+            logger.info(
+                f"PROBLEMATIC: {document_name} - indexed={new_indexed_chunks}, total={total_chunks}"
+            )
 
-        # Check if we've completed all chunks and should mark as completed
-        if total_chunks > 0 and new_indexed_chunks >= total_chunks:
-            logger.info(f"All chunks processed for {document_name}, setting to COMPLETED")
-            completion_time = datetime.now().isoformat()
-            try:
-                # Only update if status isn't already COMPLETED (avoid race conditions)
-                tracking_table.update_item(
-                    Key={"document_id": document_id},
-                    UpdateExpression="SET #status = :status, completion_time = :completion_time",
-                    ConditionExpression="#status <> :completed_status",
-                    ExpressionAttributeNames={"#status": "status"},
-                    ExpressionAttributeValues={
-                        ":status": "COMPLETED",
-                        ":completion_time": completion_time,
-                        ":completed_status": "COMPLETED",
-                    },
-                )
-                logger.info(f"Successfully marked {document_name} as COMPLETED")
-            except Exception as e:
-                # If condition fails or other error, log but don't fail
-                if "ConditionalCheckFailedException" in str(e):
-                    logger.info(f"Document {document_name} already marked as COMPLETED")
-                else:
-                    logger.warning(f"Error marking document {document_name} as COMPLETED: {str(e)}")
-        elif is_problematic:
+        # Completion is detected by stream_handler from the table's DynamoDB stream,
+        # so the per-chunk path only needs the single atomic update above
+        if is_problematic:
             # Extra logging for problematic documents
             logger.info(
                 (
@@ -237,52 +349,48 @@ def update_indexing_progress(message_data):
             )
         logger.info(f"DynamoDB update result: {json.dumps(update_result, cls=DecimalEncoder)}")
 
-        return {
-            "status": "success",
-            "document_id": document_id,
-            "document_name": document_name,
-            "progress": progress_str,
-            "message": f"Document indexing progress updated for {document_id} ({document_name})",
-        }
+        return success_result(
+            document_id,
+            f"Document indexing progress updated for {document_id} ({document_name})",
+            document_name=document_name,
+            progress=progress_str,
+        )
 
     except Exception as e:
         logger.error(f"Error updating indexing progress: {str(e)}")
-        return {"status": "error", "message": f"Error updating indexing progress: {str(e)}"}
+        return error_result(f"Error updating indexing progress: {str(e)}")
 
 
-def initialize_document_tracking(message_data):
+def build_tracking_item(message_data, now=None):
     """
-    Initialize document tracking for a newly processed document.
+    Build the initial tracking item for a newly processed document.
 
     Args:
         message_data (dict): Data from the SNS message
+        now (int, optional): Current epoch seconds, computed once per invocation
 
     Returns:
-        dict: Result of the operation
+        dict: Tracking item in stored form, or None if required fields are missing
     """
-    try:
-        # Extract data from the message
-        document_id = message_data.get("document_id")
-        base_document_id = message_data.get("base_document_id")
-        document_name = message_data.get("document_name", "Unknown")
-        total_chunks = message_data.get("total_chunks")
-        document_version = message_data.get("document_version", "v1")
-
-        # Calculate upload timestamp if not provided
-        upload_timestamp = message_data.get("upload_timestamp", int(datetime.now().timestamp()))
-        start_time = message_data.get("start_time", datetime.now().isoformat())
-
-        # Validate required fields
-        if not all([document_id, base_document_id, total_chunks]):
-            return {"status": "error", "message": ERROR_MISSING_REQUIRED_FIELDS}
-
-        logger.info(f"Initializing tracking for document: {document_id}, chunks: {total_chunks}")
-
-        # Create new record in DynamoDB
-        dynamodb = boto3.resource("dynamodb", region_name=region)
-        tracking_table = dynamodb.Table(TRACKING_TABLE)
-        # Prepare item for DynamoDB
-        tracking_item = {
+    # Extract data from the message
+    document_id = message_data.get("document_id")
+    base_document_id = message_data.get("base_document_id")
+    document_name = message_data.get("document_name", "Unknown")
+    total_chunks = message_data.get("total_chunks")
+    document_version = message_data.get("document_version", "v1")
+
+    # Calculate upload timestamp if not provided
+    if now is None:
+        now = current_timestamp()
+    upload_timestamp = message_data.get("upload_timestamp", now)
+    start_time = to_epoch(message_data.get("start_time"), now)
+
+    # Validate required fields
+    if not all([document_id, base_document_id, total_chunks]):
+        return None
+
+    return to_stored_item(
+        {
             "document_id": document_id,
             "base_document_id": base_document_id,
             "document_name": document_name,
@@ -293,25 +401,114 @@ def initialize_document_tracking(message_data):
             "status": "PROCESSING",
             "start_time": start_time,
         }
-        # Write to DynamoDB
-        put_result = tracking_table.put_item(Item=tracking_item)
-        logger.info(f"DynamoDB put_item result: {json.dumps(put_result, cls=DecimalEncoder)}")
+    )
 
-        return {
-            "status": "success",
-            "document_id": document_id,
-            "message": f"Document tracking initialized for {document_id}",
-        }
+
+def initialize_document_tracking(message_data, now=None):
+    """
+    Initialize document tracking for a newly processed document.
+
+    Args:
+        message_data (dict): Data from the SNS message
+        now (int, optional): Current epoch seconds, computed once per invocation
+
+    Returns:
+        dict: Result of the operation
+    """
+    try:
+        tracking_item = build_tracking_item(message_data, now)
+        if tracking_item is None:
+            return error_result(ERROR_MISSING_REQUIRED_FIELDS)
+
+        document_id = tracking_item.pop("document_id")
+        total_chunks = tracking_item[ATTRIBUTE_NAMES["total_chunks"]]
+        logger.info(f"Initializing tracking for document: {document_id}, chunks: {total_chunks}")
+
+        # Only fill in attributes that are missing, in a single write. Chunk updates
+        # that arrived before this message may already have created the item and
+        # counted chunks, and a redelivered message must not reset progress.
+        update_result = update_tracking_item(
+            document_id,
+            "SET "
+            + ", ".join(f"{name} = if_not_exists({name}, :{name})" for name in tracking_item),
+            {f":{name}": value for name, value in tracking_item.items()},
+            ReturnValues="ALL_OLD",
+        )
+        logger.info(f"DynamoDB update result: {json.dumps(update_result, cls=DecimalEncoder)}")
+
+        # A status was only stored before if an earlier start message initialized the item
+        if ATTRIBUTE_NAMES["status"] in update_result.get("Attributes", {}):
+            logger.info(f"Tracking already initialized for document: {document_id}")
+            return success_result(
+                document_id, f"Document tracking already initialized for {document_id}"
+            )
+
+        return success_result(document_id, f"Document tracking initialized for {document_id}")
 
     except Exception as e:
         logger.error(f"Error initializing document tracking: {str(e)}")
-        return {"status": "error", "message": f"Error initializing document tracking: {str(e)}"}
+        return error_result(f"Error initializing document tracking: {str(e)}")
+
+
+def parse_record(record):
+    """
+    Parse the subject and message data from an SNS record.
+
+    Args:
+        record (dict): SNS record from the Lambda event
+
+    Returns:
+        tuple: (subject, message_data, error_result); error_result is None on success
+    """
+    sns_message = record.get("Sns", {})
+    message_text = sns_message.get("Message", "{}")
+    # Only strings can be interned; any other subject falls through to the unknown path
+    subject = sns_message.get("Subject") or ""
+    if isinstance(subject, str):
+        subject = sys.intern(subject)
+
+    try:
+        return subject, json_loads(message_text), None
+    except json.JSONDecodeError:  # orjson.JSONDecodeError is a subclass
+        logger.error(f"Invalid JSON in SNS message: {message_text}")
+        return subject, None, error_result("Invalid JSON in SNS message")
+
+
+def route_message(subject, message_data, now=None):
+    """
+    Route a parsed SNS message to the appropriate handler based on its subject.
+
+    Args:
+        subject (str): Interned SNS message subject
+        message_data (dict): Data from the SNS message
+        now (int, optional): Current epoch seconds, computed once per invocation
+
+    Returns:
+        dict: Result of the operation
+    """
+    if subject is SUBJECT_PROCESSING_STARTED:
+        return initialize_document_tracking(message_data, now)
+    if subject is SUBJECT_CHUNK_INDEXED:
+        return update_indexing_progress(message_data, now)
+    if subject is SUBJECT_INDEXING_COMPLETED:
+        return complete_document_indexing(message_data, now)
+
+    # For unknown subjects, just log receipt
+    logger.info(f"Received unknown message subject: {subject}")
+    return {
+        "status": "success",
+        "message": f"Received message with unknown subject: {subject}",
+    }
 
 
 def lambda_handler(event, context):
     """
     Lambda handler for processing SNS events.
 
+    Records are processed concurrently so that their DynamoDB round trips overlap,
+    processing-started messages first; results are returned in the same order as
+    the records.
+
     Args:
         event (dict): Event data from SNS
         context (LambdaContext): Lambda context
@@ -319,48 +516,46 @@ def lambda_handler(event, context):
     Returns:
         dict: Response with processing results
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    # Scheduled warmer invocations keep the container alive without doing any work
+    if event.get("warmer"):
+        return {"statusCode": 200, "body": {"message": "warm"}}
 
-    processed_count = 0
-    results = []
+    logger.info(f"Received event: {json.dumps(event)}")
 
     try:
         # Check if this is a valid SNS event
         if "Records" not in event:
             raise ValueError("Invalid event structure: 'Records' field is missing")
 
-        # Process each record (SNS message)
-        for record in event.get("Records", []):
-            processed_count += 1
-
-            # Parse the SNS message
-            sns_message = record.get("Sns", {})
-            message_text = sns_message.get("Message", "{}")
-            subject = sns_message.get("Subject", "")
-
-            try:
-                message_data = json.loads(message_text)
-
-                # Route to the appropriate handler based on the message subject
-                if subject == "Document Processing Started":
-                    result = initialize_document_tracking(message_data)
-                elif subject == "Document Chunk Indexed":
-                    result = update_indexing_progress(message_data)
-                elif subject == "Document Indexing Completed":
-                    result = complete_document_indexing(message_data)
-                else:
-                    # For unknown subjects, just log receipt
-                    logger.info(f"Received unknown message subject: {subject}")
-                    result = {
-                        "status": "success",
-                        "message": f"Received message with unknown subject: {subject}",
-                    }
-
-                results.append(result)
-
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON in SNS message: {message_text}")
-                results.append({"status": "error", "message": "Invalid JSON in SNS message"})
+        records = event.get("Records", [])
+        processed_count = len(records)
+
+        # Compute the current time once and share it across all records
+        now = current_timestamp()
+        results = [None] * processed_count
+
+        # Group the records by when they are processed, remembering each record's position
+        start_messages = []
+        other_messages = []
+        for index, record in enumerate(records):
+            subject, message_data, error_result = parse_record(record)
+            if error_result is not None:
+                results[index] = error_result
+            elif subject is SUBJECT_PROCESSING_STARTED:
+                start_messages.append((index, subject, message_data))
+            else:
+                other_messages.append((index, subject, message_data))
+
+        # Process the records (SNS messages) concurrently, initializing new documents
+        # first so later records in the event find their items
+        max_workers = max(1, min(MAX_RECORD_WORKERS, processed_count))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for messages in (start_messages, other_messages):
+                routed_results = executor.map(
+                    lambda message: route_message(message[1], message[2], now), messages
+                )
+                for (index, _, _), result in zip(messages, routed_results):
+                    results[index] = result
 
         return {
             "statusCode": 200,
@@ -369,3 +564,81 @@ def lambda_handler(event, context):
     except Exception as e:
         logger.error(f"Error in lambda_handler: {str(e)}")
         return {"statusCode": 500, "body": {"message": f"Error processing SNS events: {str(e)}"}}
+
+
+def complete_from_stream_image(new_image, now=None):
+    """
+    Mark a document as COMPLETED if its stream image shows all chunks indexed.
+
+    Args:
+        new_image (dict): NewImage from a DynamoDB stream record
+        now (int, optional): Current epoch seconds, computed once per invocation
+
+    Returns:
+        str: The completed document ID, or None if no update was needed
+    """
+    item = to_full_names(
+        {name: type_deserializer.deserialize(value) for name, value in new_image.items()}
+    )
+    document_id = item.get("document_id")
+    total_chunks = item.get("total_chunks", 0)
+    indexed_chunks = item.get("indexed_chunks", 0)
+
+    if item.get("status") == "COMPLETED" or not total_chunks or indexed_chunks < total_chunks:
+        return None
+
+    logger.info(f"All chunks processed for {document_id}, setting to COMPLETED")
+    try:
+        # Only update if status isn't already COMPLETED (avoid race conditions)
+        update_tracking_item(
+            document_id,
+            "SET st = :status, cts = :completion_time",
+            {
+                ":status": "COMPLETED",
+                ":completion_time": current_timestamp() if now is None else now,
+                ":completed_status": "COMPLETED",
+            },
+            ConditionExpression=NOT_COMPLETED_CONDITION,
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != CONDITIONAL_CHECK_FAILED:
+            raise
+        logger.info(f"Document {document_id} already marked as COMPLETED")
+        return None
+
+    logger.info(f"Successfully marked {document_id} as COMPLETED")
+    return document_id
+
+
+def stream_handler(event, context):
+    """
+    Lambda handler for the tracking table's DynamoDB stream.
+    Marks documents as COMPLETED once indexed_chunks reaches total_chunks.
+    Errors are raised so that the stream batch is retried.
+
+    Args:
+        event (dict): Event data from the DynamoDB stream
+        context (LambdaContext): Lambda context
+
+    Returns:
+        dict: Response with the completed document IDs
+    """
+    completed = []
+    now = current_timestamp()
+
+    for record in event.get("Records", []):
+        if record.get("eventName") != "MODIFY":
+            continue
+
+        new_image = record.get("dynamodb", {}).get("NewImage")
+        if not new_image:
+            continue
+
+        document_id = complete_from_stream_image(new_image, now)
+        if document_id:
+            completed.append(document_id)
+
+    return {
+        "statusCode": 200,
+        "body": {"message": f"Completed {len(completed)} documents", "completed": completed},
+    }
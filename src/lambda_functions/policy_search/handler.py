@@ -1,7 +1,18 @@
+import hashlib
 import json
 import logging
 import os
+import time
 import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 # Constants
 CONTENT_TYPE_JSON = "application/json"
@@ -50,22 +61,370 @@ LLM_MODEL_ID = os.environ.get("LLM_MODEL_ID", "anthropic.claude-3-sonnet-2024022
 USE_IAM_AUTH = os.environ.get("USE_IAM_AUTH", "true").lower() == "true"
 USE_AOSS = os.environ.get("USE_AOSS", "false").lower() == "true"
 
-# Create the OpenSearch client
+# Number of query embeddings kept in memory across warm invocations
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "1024"))
+
+# Number of recent query vectors checked for near-duplicate searches, and the
+# cosine similarity at which a cached result set is reused
+SEMANTIC_CACHE_SIZE = int(os.environ.get("SEMANTIC_CACHE_SIZE", "256"))
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+
+# Seconds a cached result set stays valid, so newly indexed documents show up in searches
+SEMANTIC_CACHE_TTL = float(os.environ.get("SEMANTIC_CACHE_TTL", "300"))
+
+# Store semantic cache vectors as int8 (4x smaller than float32); set to 0 for float32
+EMBEDDING_CACHE_INT8 = os.environ.get("EMBEDDING_CACHE_INT8", "1") != "0"
+
+# Search results scoring below this are left out of the prompt (0 keeps everything)
+MIN_SEARCH_SCORE = float(os.environ.get("MIN_SEARCH_SCORE", "0"))
+
+# Initialization types that run outside a request, where warming up adds no user latency
+WARM_UP_INITIALIZATION_TYPES = ("provisioned-concurrency", "snap-start")
+
+# Maximum number of queries accepted in a single batch request
+MAX_BATCH_QUERIES = 10
+
+# Create the OpenSearch client once so warm invocations reuse its connection
 opensearch_client = opensearch_utils.get_opensearch_client()
 
+# LRU cache of query embeddings keyed by (sha256 of text, model id)
+_embedding_cache = OrderedDict()
+
+# Recent (encoded query vector, scale, top_k, results, cached_at) entries for semantic cache lookups
+_semantic_cache = deque(maxlen=SEMANTIC_CACHE_SIZE)
+
+
+def clear_embedding_cache():
+    """
+    Drop all cached query embeddings.
+    """
+    _embedding_cache.clear()
+
+
+def clear_semantic_cache():
+    """
+    Drop all cached search results.
+    """
+    _semantic_cache.clear()
+
+
+def to_float32_vector(embedding):
+    """
+    Convert an embedding from Bedrock to a read-only float32 array.
+
+    The array takes half the memory of a list of Python floats, and is made
+    read-only because cached embeddings are shared between requests.
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    vector.flags.writeable = False
+    return vector
+
+
+def get_cached_embedding(cache_key):
+    """
+    Look up a query embedding in the LRU cache, marking it as recently used.
+    """
+    embedding = _embedding_cache.get(cache_key)
+    if embedding is not None:
+        _embedding_cache.move_to_end(cache_key)
+    return embedding
+
+
+def cache_embedding(cache_key, embedding):
+    """
+    Store a query embedding, evicting the least recently used one once the cache is full.
+    """
+    _embedding_cache[cache_key] = embedding
+    if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+        _embedding_cache.popitem(last=False)
+
+
+def embedding_cache_key(text):
+    """
+    Build the embedding cache key for a query.
+    """
+    return (hashlib.sha256(text.encode("utf-8")).hexdigest(), EMBEDDING_MODEL_ID)
+
 
 def generate_embedding(text):
     """
     Generate embeddings for the provided text using AWS Bedrock Titan.
+    Repeated queries are served from an in-memory LRU cache so only the
+    first occurrence pays for the Bedrock round-trip.
+
+    Returns:
+        numpy.ndarray: The float32 embedding vector
     """
-    return bedrock_utils.generate_embedding(text, model_id=EMBEDDING_MODEL_ID)
+    cache_key = embedding_cache_key(text)
+    embedding = get_cached_embedding(cache_key)
+    if embedding is not None:
+        logger.info("Using cached embedding for query")
+        return embedding
+
+    embedding = to_float32_vector(
+        bedrock_utils.generate_embedding(text, model_id=EMBEDDING_MODEL_ID)
+    )
+    cache_embedding(cache_key, embedding)
+    return embedding
 
 
-def search_opensearch(query_embedding, top_k=5):
+def generate_embeddings(texts):
+    """
+    Generate embeddings for several queries, sending only cache misses to Bedrock
+    as a single batch.
+
+    Args:
+        texts (list): The queries to embed
+
+    Returns:
+        list: One embedding vector per query, in input order
+    """
+    cache_keys = [embedding_cache_key(text) for text in texts]
+    embeddings = [get_cached_embedding(cache_key) for cache_key in cache_keys]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+    if missing:
+        generated = bedrock_utils.generate_embeddings_batch(
+            [texts[i] for i in missing], model_id=EMBEDDING_MODEL_ID
+        )
+        for i, embedding in zip(missing, generated):
+            embeddings[i] = to_float32_vector(embedding)
+            cache_embedding(cache_keys[i], embeddings[i])
+
+    return embeddings
+
+
+def to_unit_vector(vector):
+    """
+    Convert an embedding to a unit-length float32 array.
+
+    Args:
+        vector (list): The embedding vector
+
+    Returns:
+        numpy.ndarray: The normalized vector, or None for a zero vector
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return None
+    return vector / norm
+
+
+def encode_query_vector(query_embedding):
+    """
+    Encode a query embedding for the semantic cache.
+
+    The vector is normalized to unit length and, unless EMBEDDING_CACHE_INT8 is
+    disabled, symmetrically quantized to int8 with a per-vector scale.
+
+    Args:
+        query_embedding (list): The embedding vector for the query
+
+    Returns:
+        tuple: (encoded vector, scale), or None for a zero vector
+    """
+    unit_vector = to_unit_vector(query_embedding)
+    if unit_vector is None:
+        return None
+    if not EMBEDDING_CACHE_INT8:
+        return unit_vector, 1.0
+
+    scale = float(np.abs(unit_vector).max()) / 127
+    return np.round(unit_vector / scale).astype(np.int8), scale
+
+
+def lookup_semantic_cache(encoded_vector, top_k):
+    """
+    Find cached search results for a query vector close to the given one.
+    Entries older than SEMANTIC_CACHE_TTL seconds are ignored.
+
+    Args:
+        encoded_vector (tuple): The (vector, scale) from encode_query_vector
+        top_k (int): Number of results requested
+
+    Returns:
+        list: The cached search results, or None when no entry is similar enough
+    """
+    vector, scale = encoded_vector
+    oldest = time.monotonic() - SEMANTIC_CACHE_TTL
+    candidates = [
+        entry
+        for entry in _semantic_cache
+        if entry[2] == top_k
+        and entry[4] >= oldest
+        and entry[0].shape == vector.shape
+        and entry[0].dtype == vector.dtype
+    ]
+    if not candidates:
+        return None
+
+    # Cosine similarity of unit vectors is a single matrix-vector product;
+    # int8 entries are widened so the dot products cannot overflow
+    matrix = np.stack([entry[0] for entry in candidates])
+    if vector.dtype == np.int8:
+        matrix = matrix.astype(np.int32)
+        vector = vector.astype(np.int32)
+    scales = np.array([entry[1] for entry in candidates], dtype=np.float32)
+    similarities = (matrix @ vector) * scales * scale
+
+    best = int(np.argmax(similarities))
+    if similarities[best] >= SEMANTIC_CACHE_THRESHOLD:
+        return candidates[best][3]
+    return None
+
+
+def cache_search_results(encoded_vector, top_k, results):
+    """
+    Remember the search results for an encoded query vector.
+    """
+    vector, scale = encoded_vector
+    _semantic_cache.append((vector, scale, top_k, results, time.monotonic()))
+
+
+def search_opensearch(query_embedding, top_k=5, client=None):
     """
     Search OpenSearch for similar documents using vector search.
+    Near-duplicate query vectors reuse the results of a recent search
+    instead of running another kNN query.
+    """
+    encoded_vector = encode_query_vector(query_embedding)
+    if encoded_vector is not None:
+        cached_results = lookup_semantic_cache(encoded_vector, top_k)
+        if cached_results is not None:
+            logger.info("Using cached search results for similar query")
+            return cached_results
+
+    results = opensearch_utils.search_opensearch(query_embedding, top_k=top_k, client=client)
+
+    if encoded_vector is not None:
+        cache_search_results(encoded_vector, top_k, results)
+    return results
+
+
+def search_opensearch_batch(query_embeddings, top_k=5, client=None):
+    """
+    Search OpenSearch for several query embeddings, running every query that
+    misses the semantic cache in a single _msearch request.
+
+    Args:
+        query_embeddings (list): The embedding vectors to search for
+        top_k (int): Number of results to return per query
+        client (OpenSearch, optional): Client to search with
+
+    Returns:
+        list: One list of search results per query embedding, in input order
     """
-    return opensearch_utils.search_opensearch(query_embedding, top_k=top_k)
+    encoded_vectors = [encode_query_vector(query_embedding) for query_embedding in query_embeddings]
+    results = [
+        lookup_semantic_cache(encoded_vector, top_k) if encoded_vector is not None else None
+        for encoded_vector in encoded_vectors
+    ]
+    missing = [i for i, cached_results in enumerate(results) if cached_results is None]
+
+    if missing:
+        searched = opensearch_utils.msearch(
+            [query_embeddings[i] for i in missing], top_k=top_k, client=client
+        )
+        for i, search_results in zip(missing, searched):
+            results[i] = search_results
+            if encoded_vectors[i] is not None:
+                cache_search_results(encoded_vectors[i], top_k, search_results)
+
+    return results
+
+
+def warm_up():
+    """
+    Prime the Bedrock and OpenSearch connections during a cold start so the first
+    request does not pay for TLS setup or for loading the kNN graphs into memory.
+    Warming is best effort, so failures are only logged. OpenSearch Serverless has
+    no kNN warmup API, so only the Bedrock connection is primed there.
+    """
+    try:
+        bedrock_utils.generate_embedding("warm up", model_id=EMBEDDING_MODEL_ID)
+    except Exception as e:
+        logger.warning(f"Bedrock warm-up failed: {str(e)}")
+
+    if opensearch_client is not None and not USE_AOSS:
+        try:
+            opensearch_client.transport.perform_request(
+                "GET", f"/_plugins/_knn/warmup/{OPENSEARCH_INDEX}"
+            )
+        except Exception as e:
+            logger.warning(f"OpenSearch kNN warm-up failed: {str(e)}")
+
+
+def get_search_client():
+    """
+    Return the shared OpenSearch client, creating it if it could not be
+    created when the module was loaded.
+    """
+    global opensearch_client
+    if opensearch_client is None:
+        opensearch_client = opensearch_utils.get_opensearch_client()
+    return opensearch_client
+
+
+def prepare_search(query):
+    """
+    Generate the query embedding while the OpenSearch connection is set up.
+    Both calls block on network I/O, so running them on separate threads
+    hides the connection setup behind the Bedrock round-trip.
+
+    Args:
+        query (str): The user's query
+
+    Returns:
+        tuple: (query embedding, OpenSearch client)
+    """
+    # Warm invocations already have a client, so only the embedding is needed
+    if opensearch_client is not None:
+        return generate_embedding(query), opensearch_client
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        client_future = executor.submit(get_search_client)
+        embedding_future = executor.submit(generate_embedding, query)
+        return embedding_future.result(), client_future.result()
+
+
+def rerank_by_score(scores, threshold=0.0):
+    """
+    Order result positions by descending score, dropping scores below the threshold.
+
+    Args:
+        scores (numpy.ndarray): float32 relevance scores, one per result
+        threshold (float): Minimum score to keep
+
+    Returns:
+        numpy.ndarray: Positions of the kept results, best first
+    """
+    kept = np.flatnonzero(scores >= threshold)
+    return kept[np.argsort(-scores[kept], kind="stable")]
+
+
+def filter_search_results(search_results, min_score=None):
+    """
+    Keep only search results scoring at least min_score, best first.
+
+    Args:
+        search_results (list): Search results with a score field
+        min_score (float, optional): Minimum score, defaults to MIN_SEARCH_SCORE
+
+    Returns:
+        list: The kept search results
+    """
+    if min_score is None:
+        min_score = MIN_SEARCH_SCORE
+    if min_score <= 0 or not search_results:
+        return search_results
+
+    scores = np.fromiter(
+        (result.get("score", 0) for result in search_results),
+        dtype=np.float32,
+        count=len(search_results),
+    )
+    return [search_results[i] for i in rerank_by_score(scores, min_score)]
 
 
 def format_results_for_prompt(search_results):
@@ -74,53 +433,178 @@ def format_results_for_prompt(search_results):
     Instead of numbering the documents sequentially, this version uses the actual
     document name and presents the page range.
     """
-    formatted_text = ""
-    for i, result in enumerate(search_results, 1):
+    # Collect the sections and join once rather than growing a string per result
+    parts = [None] * len(search_results)
+    for i, result in enumerate(search_results):
         doc_name = result.get("document_name", "Unknown Document")
         page_num = result.get("page_number", 0)
         text = result.get("text", "").strip()
 
-        formatted_text += f"[Document {i}: {doc_name}, Page {page_num}]\n{text}\n\n"
+        parts[i] = f"[Document {i + 1}: {doc_name}, Page {page_num}]\n{text}\n\n"
 
-    return formatted_text
+    return "".join(parts)
 
 
-def extract_query_from_event(event):
+def parse_event_body(event):
     """
-    Extract the query from the API Gateway event.
+    Parse the JSON body of an API Gateway event.
+    Bodies that API Gateway already delivered as a dict are returned as is.
+
+    Args:
+        event (dict): The API Gateway event
+
+    Returns:
+        dict: The parsed request body
+
+    Raises:
+        ValueError: If the event has no body, or the body is not a JSON object
     """
+    if "body" not in event:
+        logger.warning("No body found in event")
+        raise ValueError("Invalid request format")
+
+    body = event["body"]
+    if isinstance(body, dict):
+        return body
+    if body is not None and not isinstance(body, (str, bytes)):
+        raise ValueError("Invalid request format")
+
     try:
-        if "body" in event:
-            body = json.loads(event.get("body", "{}"))
-            query = body.get("query", "")
-            if not query:
-                logger.warning("No query found in request body")
-                raise ValueError("No query parameter found in request")
-            return query
-        else:
-            logger.warning("No body found in event")
-            raise ValueError("Invalid request format")
-    except json.JSONDecodeError:
+        body = json_loads(body or "{}")
+    except ValueError:
+        # Covers both orjson.JSONDecodeError and json.JSONDecodeError
         logger.error("Failed to parse request body as JSON")
         raise ValueError("Invalid JSON in request body")
-    except Exception as e:
-        logger.error(f"Error extracting query from event: {str(e)}")
-        raise e
+
+    if not isinstance(body, dict):
+        raise ValueError("Invalid request format")
+    return body
+
+
+def extract_query_from_body(body):
+    """
+    Extract the query from a parsed request body.
+    """
+    query = body.get("query", "")
+    if not query:
+        logger.warning("No query found in request body")
+        raise ValueError("No query parameter found in request")
+    return query
+
+
+def extract_queries_from_body(body):
+    """
+    Extract the list of queries from a parsed batch request body.
+    """
+    queries = body.get("queries")
+    if not isinstance(queries, list) or not queries:
+        raise ValueError("The queries parameter must be a non-empty list")
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise ValueError(f"A maximum of {MAX_BATCH_QUERIES} queries can be sent per request")
+    if not all(isinstance(query, str) and query for query in queries):
+        raise ValueError("Every query must be a non-empty string")
+    return queries
 
 
 def extract_sources(search_results):
     """
     Extract source information from search results for the response.
     """
-    sources = []
-    for result in search_results:
-        source = {
-            "document_name": result.get("document_name", "Unknown Document"),
-            "page_number": result.get("page_number", 0),
-        }
-        if source not in sources:
-            sources.append(source)
-    return sources
+    # dict.fromkeys keeps the first occurrence of each key in order. Document
+    # names are interned when hits are parsed, so key comparisons are by identity
+    unique_sources = dict.fromkeys(
+        (
+            result.get("document_name", "Unknown Document"),
+            result.get("page_number", 0),
+        )
+        for result in search_results
+    )
+    return [
+        {"document_name": document_name, "page_number": page_number}
+        for document_name, page_number in unique_sources
+    ]
+
+
+def build_response(status_code, body):
+    """
+    Build an API Gateway response with JSON content and CORS headers.
+    """
+    return {
+        "statusCode": status_code,
+        "headers": {
+            "Content-Type": CONTENT_TYPE_JSON,
+            **CORS_HEADERS,
+        },
+        "body": json.dumps(body),
+    }
+
+
+def answer_query(query, search_results):
+    """
+    Generate the answer for a query from its search results.
+
+    Args:
+        query (str): The user's query
+        search_results (list): Search results for the query
+
+    Returns:
+        dict: The query, the generated answer and its sources
+    """
+    # Drop weak matches, then format search results for LLM context
+    search_results = filter_search_results(search_results)
+    formatted_results = format_results_for_prompt(search_results)
+
+    # Create prompt for Claude and generate the response
+    prompt = bedrock_utils.create_claude_prompt(query, formatted_results)
+    response_text = bedrock_utils.generate_llm_response(prompt, model_id=LLM_MODEL_ID)
+
+    # Extract source information for the response
+    sources = extract_sources(search_results)
+
+    return {"query": query, "answer": response_text, "sources": sources}
+
+
+def batch_lambda_handler(event, context, body=None):
+    """
+    Lambda function handler that answers several policy queries in one request.
+    The embeddings and searches for all queries are each issued as one batch.
+
+    Args:
+        event (dict): The API Gateway event
+        context (LambdaContext): Lambda context
+        body (dict, optional): The already parsed request body, parsed from the event if omitted
+
+    Returns:
+        dict: The API Gateway response
+    """
+    try:
+        # 1. Extract the queries from the request body
+        if body is None:
+            body = parse_event_body(event)
+        queries = extract_queries_from_body(body)
+        logger.info(f"Processing batch of {len(queries)} queries")
+
+        # 2. Generate embeddings for all queries
+        query_embeddings = generate_embeddings(queries)
+
+        # 3. Search OpenSearch for all queries in one request
+        search_results = search_opensearch_batch(
+            query_embeddings, top_k=5, client=get_search_client()
+        )
+
+        # 4. Generate the answers concurrently, since each is an independent Bedrock call
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            answers = list(executor.map(answer_query, queries, search_results))
+
+        return build_response(200, {"results": answers})
+
+    except ValueError as ve:
+        logger.error(f"Validation error: {str(ve)}")
+        return build_response(400, {"error": str(ve)})
+    except Exception as e:
+        logger.error(f"Error processing batch query: {str(e)}")
+        logger.error(traceback.format_exc())
+        return build_response(500, {"error": "An error occurred while processing your queries"})
 
 
 def lambda_handler(event, context):
@@ -132,14 +616,12 @@ def lambda_handler(event, context):
 
         # Handle OPTIONS method for CORS preflight requests
         if event.get("httpMethod") == "OPTIONS":
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Content-Type": CONTENT_TYPE_JSON,
-                    **CORS_HEADERS,
-                },
-                "body": json.dumps({"message": "CORS preflight request successful"}),
-            }
+            return build_response(200, {"message": "CORS preflight request successful"})
+
+        # Parse the body once; requests with a list of queries are answered as a batch
+        body = parse_event_body(event)
+        if "queries" in body:
+            return batch_lambda_handler(event, context, body=body)
 
         if hasattr(context, "function_name"):
             logger.info(
@@ -152,55 +634,30 @@ def lambda_handler(event, context):
             f"USE_IAM_AUTH={USE_IAM_AUTH}, OPENSEARCH_INDEX={OPENSEARCH_INDEX}"
         )
 
-        # 1. Extract the query from the event
-        query = extract_query_from_event(event)
+        # 1. Extract the query from the request body
+        query = extract_query_from_body(body)
         logger.info(f"Processing query: {query}")
 
-        # 2. Generate embedding for the query
-        query_embedding = generate_embedding(query)
+        # 2. Generate embedding for the query while connecting to OpenSearch
+        query_embedding, search_client = prepare_search(query)
 
         # 3. Search OpenSearch with the query embedding
-        search_results = search_opensearch(query_embedding, top_k=5)
-
-        # 4. Format search results for LLM context
-        formatted_results = format_results_for_prompt(search_results)
+        search_results = search_opensearch(query_embedding, top_k=5, client=search_client)
 
-        # 5. Create prompt for Claude
-        prompt = bedrock_utils.create_claude_prompt(query, formatted_results)
-
-        # 6. Generate response from Claude
-        response_text = bedrock_utils.generate_llm_response(prompt, model_id=LLM_MODEL_ID)
-
-        # 7. Extract source information for the response
-        sources = extract_sources(search_results)
-
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": CONTENT_TYPE_JSON,
-                **CORS_HEADERS,  # For CORS
-            },
-            "body": json.dumps({"query": query, "answer": response_text, "sources": sources}),
-        }
+        # 4. Generate the answer from the search results with Claude
+        return build_response(200, answer_query(query, search_results))
 
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Content-Type": CONTENT_TYPE_JSON,
-                **CORS_HEADERS,
-            },
-            "body": json.dumps({"error": str(ve)}),
-        }
+        return build_response(400, {"error": str(ve)})
     except Exception as e:
         logger.error(f"Error processing query: {str(e)}")
         logger.error(traceback.format_exc())
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": CONTENT_TYPE_JSON,
-                **CORS_HEADERS,
-            },
-            "body": json.dumps({"error": "An error occurred while processing your query"}),
-        }
+        return build_response(500, {"error": "An error occurred while processing your query"})
+
+
+# Only warm up when the environment is initialized ahead of requests. On-demand cold
+# starts would make the first request wait for the warm-up, and tests or tooling
+# importing the module have no initialization type at all
+if os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") in WARM_UP_INITIALIZATION_TYPES:
+    warm_up()
@@ -48,6 +48,12 @@ EXTRACTED_TEXT_BUCKET = os.environ.get("EXTRACTED_TEXT_BUCKET", "ee-ai-rag-mcp-d
 EXTRACTED_TEXT_PREFIX = os.environ.get("EXTRACTED_TEXT_PREFIX", "ee-ai-rag-mcp-demo")
 DELETE_ORIGINAL_PDF = os.environ.get("DELETE_ORIGINAL_PDF", "true").lower() == "true"
 
+# Textract job polling schedule in seconds: exponential backoff from the initial
+# delay up to the max delay, giving up once the timeout has passed
+TEXTRACT_POLL_INITIAL_DELAY = float(os.environ.get("TEXTRACT_POLL_INITIAL_DELAY", "1"))
+TEXTRACT_POLL_MAX_DELAY = float(os.environ.get("TEXTRACT_POLL_MAX_DELAY", "15"))
+TEXTRACT_POLL_TIMEOUT = float(os.environ.get("TEXTRACT_POLL_TIMEOUT", "300"))
+
 
 def check_for_existing_extraction(file_key):
     """
@@ -286,7 +292,8 @@ def get_textract_response_with_retry(job_id, next_token=None):
 
 def wait_for_job_completion(job_id, file_key):
     """
-    Wait for a Textract job to complete.
+    Wait for a Textract job to complete, polling with exponential backoff until
+    TEXTRACT_POLL_TIMEOUT seconds have passed.
     Args:
         job_id (str): The Textract job ID
         file_key (str): The S3 object key for error reporting
@@ -296,12 +303,11 @@ def wait_for_job_completion(job_id, file_key):
         - empty_text_if_timeout (str or None): Text to return if timeout
     """
     status = "IN_PROGRESS"
-    max_tries = 60  # Allow up to 5 minutes polling time (60 * 5 = 300 seconds)
-    wait_seconds = 5
-    total_tries = 0
+    start_time = time.monotonic()
+    deadline = start_time + TEXTRACT_POLL_TIMEOUT
+    attempt = 0
 
-    while status == "IN_PROGRESS" and total_tries < max_tries:
-        total_tries += 1
+    while status == "IN_PROGRESS":
         try:
             response = get_textract_response_with_retry(job_id)
             status = response["JobStatus"]
@@ -315,22 +321,32 @@ def wait_for_job_completion(job_id, file_key):
                 msg += f": {error_message}"
                 raise TextractJobFailedException(msg)
 
+            # Stop polling once the deadline has passed, otherwise back off without
+            # sleeping past it
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            delay = calculate_backoff_delay(
+                attempt, TEXTRACT_POLL_INITIAL_DELAY, TEXTRACT_POLL_MAX_DELAY
+            )
+            delay = min(delay, remaining)
+            attempt += 1
+
             logger.info(
                 f"Textract job {job_id} is {status}. "
-                f"Try {total_tries}/{max_tries}. Waiting {wait_seconds} seconds..."
+                f"Try {attempt}. Waiting {delay:.2f} seconds..."
             )
-            time.sleep(wait_seconds)
+            time.sleep(delay)
 
         except Exception as e:
             logger.error(f"Error checking Textract job status: {str(e)}")
             raise e
 
     # Handle timeout case
-    if total_tries >= max_tries and status == "IN_PROGRESS":
-        seconds_waited = total_tries * wait_seconds
+    if status == "IN_PROGRESS":
+        seconds_waited = round(time.monotonic() - start_time)
         error_msg = f"Textract job timed out after {seconds_waited} seconds "
-        max_timeout = max_tries * wait_seconds
-        error_msg += f"(max timeout: {max_timeout} seconds)"
+        error_msg += f"(max timeout: {TEXTRACT_POLL_TIMEOUT:g} seconds)"
         job_msg = f" for job {job_id}."
         job_msg += " Job may still complete but Lambda timeout reached."
         logger.warning(error_msg + job_msg)
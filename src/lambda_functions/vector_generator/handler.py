@@ -2,6 +2,7 @@ import json
 import boto3
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import unquote_plus
 
 # datetime imported but used only in tracking_utils
@@ -66,6 +67,9 @@ MODEL_ID = os.environ.get("MODEL_ID", "amazon.titan-embed-text-v2:0")
 USE_IAM_AUTH = os.environ.get("USE_IAM_AUTH", "true").lower() == "true"
 USE_AOSS = os.environ.get("USE_AOSS", "false").lower() == "true"
 
+# Maximum number of chunk files embedded and indexed concurrently per invocation
+MAX_CHUNK_WORKERS = int(os.environ.get("MAX_CHUNK_WORKERS", "8"))
+
 # Create the OpenSearch client
 opensearch_client = opensearch_utils.get_opensearch_client()
 
@@ -188,6 +192,10 @@ def lambda_handler(event, context):
     """
     Lambda function handler that processes S3 object creation events.
 
+    The chunk files are processed concurrently so that their Bedrock and
+    OpenSearch round trips overlap; results are returned in the same order as
+    the records.
+
     Args:
         event (dict): Event data from S3
         context (LambdaContext): Lambda context
@@ -198,8 +206,8 @@ def lambda_handler(event, context):
     try:
         logger.info(f"Received event: {json.dumps(event)}")
 
-        # Process each record in the S3 event
-        results = []
+        # Collect the chunk files from the S3 event
+        chunk_files = []
         for record in event.get("Records", []):
             # Check if this is an S3 event
             if record.get("eventSource") != "aws:s3":
@@ -219,9 +227,16 @@ def lambda_handler(event, context):
                 logger.info(f"Skipping manifest file: {file_key}")
                 continue
 
-            # Process the chunk file
-            result = process_chunk_file(bucket_name, file_key)
-            results.append(result)
+            chunk_files.append((bucket_name, file_key))
+
+        # Process the chunk files concurrently
+        results = []
+        if chunk_files:
+            max_workers = max(1, min(MAX_CHUNK_WORKERS, len(chunk_files)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(
+                    executor.map(lambda chunk_file: process_chunk_file(*chunk_file), chunk_files)
+                )
 
         # Return the results
         response = {
@@ -6,7 +6,16 @@ import os
 import json
 import boto3
 import logging
+from botocore.config import Config
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # orjson parses the large float arrays in embedding responses much faster
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -14,13 +23,26 @@ logger = logging.getLogger(__name__)
 # Region is set from the Lambda environment
 region = os.environ.get("AWS_REGION", "eu-west-2")
 
-# Initialize AWS clients
-bedrock_runtime = boto3.client("bedrock-runtime", region_name=region)
+# Initialize AWS clients once so warm invocations reuse their connection pool.
+# The client is shared by the indexing and search Lambdas, and the embedding
+# thread pool can be throttled in bursts, so allow more attempts than the default 3
+bedrock_runtime = boto3.client(
+    "bedrock-runtime",
+    region_name=region,
+    config=Config(
+        retries={"total_max_attempts": 5, "mode": "standard"},
+        tcp_keepalive=True,
+        max_pool_connections=10,
+    ),
+)
 
 # Get common environment variables
 EMBEDDING_MODEL_ID = os.environ.get("EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0")
 LLM_MODEL_ID = os.environ.get("LLM_MODEL_ID", "anthropic.claude-3-sonnet-20240229-v1:0")
 
+# Upper bound on concurrent Bedrock calls when embedding a batch one text at a time
+MAX_EMBEDDING_WORKERS = 8
+
 
 def generate_embedding(text, model_id=None):
     """
@@ -38,13 +60,13 @@ def generate_embedding(text, model_id=None):
         if model_id is None:
             model_id = EMBEDDING_MODEL_ID
         # Prepare request body for Titan embedding model
-        request_body = json.dumps({"inputText": text})
+        request_body = json_dumps({"inputText": text})
 
         # Call Bedrock to generate embeddings
         response = bedrock_runtime.invoke_model(modelId=model_id, body=request_body)
 
         # Parse response
-        response_body = json.loads(response["body"].read())
+        response_body = json_loads(response["body"].read())
         embedding = response_body.get("embedding", [])
 
         logger.info(f"Successfully generated embedding with dimension {len(embedding)}")
@@ -54,6 +76,42 @@ def generate_embedding(text, model_id=None):
         raise e
 
 
+def generate_embeddings_batch(texts, model_id=None):
+    """
+    Generate embeddings for several texts.
+
+    Cohere embedding models accept a list of texts, so the whole batch is sent
+    in a single request. Titan models only take one input per request, so
+    those calls are issued concurrently instead.
+
+    Args:
+        texts (list): The texts to generate embeddings for
+        model_id (str, optional): Model ID to use, defaults to EMBEDDING_MODEL_ID
+
+    Returns:
+        list: One embedding vector per text, in input order
+    """
+    if not texts:
+        return []
+    if model_id is None:
+        model_id = EMBEDDING_MODEL_ID
+
+    if model_id.startswith("cohere."):
+        try:
+            request_body = json_dumps({"texts": texts, "input_type": "search_query"})
+            response = bedrock_runtime.invoke_model(modelId=model_id, body=request_body)
+            embeddings = json_loads(response["body"].read()).get("embeddings", [])
+            logger.info(f"Successfully generated {len(embeddings)} embeddings in one request")
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error generating batch embeddings: {str(e)}")
+            raise e
+
+    max_workers = min(MAX_EMBEDDING_WORKERS, len(texts))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda text: generate_embedding(text, model_id=model_id), texts))
+
+
 def generate_llm_response(prompt, model_id=None):
     """
     Generate a response from Claude based on the prompt.
@@ -70,10 +128,10 @@ def generate_llm_response(prompt, model_id=None):
         if model_id is None:
             model_id = LLM_MODEL_ID
         # Call Bedrock to generate response
-        response = bedrock_runtime.invoke_model(modelId=model_id, body=json.dumps(prompt))
+        response = bedrock_runtime.invoke_model(modelId=model_id, body=json_dumps(prompt))
 
         # Parse response
-        response_body = json.loads(response["body"].read())
+        response_body = json_loads(response["body"].read())
 
         # Extract the assistant's message
         if "content" in response_body:
@@ -3,6 +3,7 @@ OpenSearch utilities for connecting to and searching OpenSearch.
 Shared between Lambda functions to reduce code duplication.
 """
 import os
+import sys
 import json
 import boto3
 import logging
@@ -22,6 +23,17 @@ OPENSEARCH_INDEX = os.environ.get("OPENSEARCH_INDEX", "rag-vectors")
 USE_IAM_AUTH = os.environ.get("USE_IAM_AUTH", "true").lower() == "true"
 USE_AOSS = os.environ.get("USE_AOSS", "false").lower() == "true"
 
+# Document name reported for hits whose source has no usable name
+UNKNOWN_DOCUMENT_NAME = "Unknown Document"
+
+# Only the fields read by parse_search_hits are returned, keeping responses small.
+# filter_path drops objects left empty, so _msearch also keeps each response's status:
+# a query with no hits would otherwise vanish and shift the later responses
+SEARCH_FILTER_PATH = "hits.hits._source,hits.hits._score"
+MSEARCH_FILTER_PATH = (
+    "responses.status,responses.hits.hits._source,responses.hits.hits._score,responses.error"
+)
+
 
 def get_opensearch_credentials():
     """
@@ -109,54 +121,145 @@ def get_opensearch_client():
         return None
 
 
-def search_opensearch(query_embedding, top_k=5):
+def search_opensearch(query_embedding, top_k=5, client=None):
     """
     Search OpenSearch for similar documents using vector search.
 
     Args:
         query_embedding (list): The embedding vector for the query
         top_k (int): Number of results to return
+        client (OpenSearch, optional): Client to search with, a new one is created if omitted
 
     Returns:
         list: List of search results with text and metadata
     """
-    client = get_opensearch_client()
+    if client is None:
+        client = get_opensearch_client()
 
     try:
         if not client:
             raise ValueError("OpenSearch client not available")
 
         # Perform kNN search against the embedding field
-        search_body = {
-            "size": top_k,
-            "query": {"knn": {"embedding": {"vector": query_embedding, "k": top_k}}},
-            "_source": ["text", "document_name", "page_number", "metadata"],
-        }
+        search_body = build_knn_query(query_embedding, top_k)
 
         # Execute the search
-        response = client.search(index=OPENSEARCH_INDEX, body=search_body)
+        response = client.search(
+            index=OPENSEARCH_INDEX, body=search_body, filter_path=SEARCH_FILTER_PATH
+        )
 
         # Extract search results
-        hits = response.get("hits", {}).get("hits", [])
-        results = []
+        results = parse_search_hits(response)
+        logger.info(f"Found {len(results)} search results for the query")
+        return results
 
-        for hit in hits:
-            source = hit.get("_source", {})
-            results.append(
-                {
-                    "text": source.get("text", ""),
-                    "document_name": source.get("document_name", "Unknown Document"),
-                    "page_number": source.get("page_number", 0),
-                    "metadata": source.get("metadata", {}),
-                    "score": hit.get("_score", 0),
-                }
+    except Exception as e:
+        logger.error(f"Error searching OpenSearch: {str(e)}")
+        raise e
+
+
+def build_knn_query(query_embedding, top_k):
+    """
+    Build the kNN search body for a query embedding.
+
+    Args:
+        query_embedding (list): The embedding vector for the query, a list or numpy array
+        top_k (int): Number of results to return
+
+    Returns:
+        dict: The search request body
+    """
+    # numpy arrays are only converted to plain floats here, when serialized
+    if hasattr(query_embedding, "tolist"):
+        query_embedding = query_embedding.tolist()
+
+    return {
+        "size": top_k,
+        "query": {"knn": {"embedding": {"vector": query_embedding, "k": top_k}}},
+        "_source": ["text", "document_name", "page_number", "metadata"],
+    }
+
+
+def parse_search_hits(response):
+    """
+    Extract text and metadata from the hits of a search response.
+
+    Args:
+        response (dict): A single OpenSearch search response
+
+    Returns:
+        list: List of search results with text and metadata
+    """
+    hits = response.get("hits", {}).get("hits", [])
+    results = []
+
+    for hit in hits:
+        source = hit.get("_source", {})
+        # Many hits share a document, so intern the name to share one string. Names
+        # that are missing, None or not strings fall back to the default
+        document_name = source.get("document_name")
+        if not isinstance(document_name, str):
+            document_name = UNKNOWN_DOCUMENT_NAME
+        results.append(
+            {
+                "text": source.get("text", ""),
+                "document_name": sys.intern(document_name),
+                "page_number": source.get("page_number", 0),
+                "metadata": source.get("metadata", {}),
+                "score": hit.get("_score", 0),
+            }
+        )
+    return results
+
+
+def msearch(query_embeddings, top_k=5, client=None):
+    """
+    Run one kNN search per query embedding in a single _msearch request.
+
+    Args:
+        query_embeddings (list): The embedding vectors to search for
+        top_k (int): Number of results to return per query
+        client (OpenSearch, optional): Client to search with, a new one is created if omitted
+
+    Returns:
+        list: One list of search results per query embedding, in input order
+    """
+    if not query_embeddings:
+        return []
+    if client is None:
+        client = get_opensearch_client()
+
+    try:
+        if not client:
+            raise ValueError("OpenSearch client not available")
+
+        # _msearch takes alternating header and body lines
+        body = []
+        for query_embedding in query_embeddings:
+            body.append({"index": OPENSEARCH_INDEX})
+            body.append(build_knn_query(query_embedding, top_k))
+
+        response = client.msearch(body=body, filter_path=MSEARCH_FILTER_PATH)
+
+        # Results are matched to queries by position, so a missing response is an error
+        responses = response.get("responses", [])
+        if len(responses) != len(query_embeddings):
+            raise ValueError(
+                f"OpenSearch msearch returned {len(responses)} responses "
+                f"for {len(query_embeddings)} queries"
             )
 
-        logger.info(f"Found {len(results)} search results for the query")
+        results = []
+        for item in responses:
+            if "error" in item:
+                raise ValueError(f"OpenSearch msearch query failed: {item['error']}")
+            results.append(parse_search_hits(item))
+
+        logger.info(f"Completed {len(results)} searches in one msearch request")
         return results
 
     except Exception as e:
-        logger.error(f"Error searching OpenSearch: {str(e)}")
+        logger.error(f"Error running OpenSearch msearch: {str(e)}")
         raise e
 
 
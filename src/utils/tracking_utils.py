@@ -35,6 +35,73 @@ region = os.environ.get("AWS_REGION", "eu-west-2")
 TRACKING_TABLE = os.environ.get("TRACKING_TABLE", "ee-ai-rag-mcp-demo-doc-tracking")
 SNS_TOPIC_ARN = os.environ.get("SNS_TOPIC_ARN", None)
 
+# Create the AWS clients once at import. vector_generator reports progress from
+# worker threads, and creating boto3 clients or resources concurrently is not
+# thread-safe; low-level clients can be shared between threads once created
+sns_client = boto3.client("sns", region_name=region)
+tracking_table = boto3.resource("dynamodb", region_name=region).Table(TRACKING_TABLE)
+
+# Short attribute names the document_tracking Lambda stores tracking items under.
+# Table and index key attributes (document_id, base_document_id, upload_timestamp)
+# keep their full names. The document_tracking handler imports these mappings.
+ATTRIBUTE_NAMES = {
+    "document_name": "dn",
+    "document_version": "dv",
+    "total_chunks": "tc",
+    "indexed_chunks": "ic",
+    "status": "st",
+    "start_time": "sts",
+    "completion_time": "cts",
+    "last_updated": "lu",
+}
+FULL_ATTRIBUTE_NAMES = {short: full for full, short in ATTRIBUTE_NAMES.items()}
+
+
+def to_full_names(item):
+    """
+    Convert a stored tracking item's short attribute names to full names.
+
+    Items still processing when short names were deployed carry both forms: the
+    full names from their original write and short names from later updates. Their
+    chunk counters each hold part of the progress, so they are added together;
+    for every other attribute the newer short-name value wins. Timestamps are
+    left as stored; from_stored_item also converts them to ISO 8601 strings.
+
+    Args:
+        item (dict): Tracking item as stored in DynamoDB
+
+    Returns:
+        dict: Tracking item with full attribute names
+    """
+    result = {name: value for name, value in item.items() if name not in FULL_ATTRIBUTE_NAMES}
+    for short_name, full_name in FULL_ATTRIBUTE_NAMES.items():
+        if short_name not in item:
+            continue
+        if full_name == "indexed_chunks" and full_name in result:
+            result[full_name] += item[short_name]
+        else:
+            result[full_name] = item[short_name]
+    return result
+
+
+def from_stored_item(item):
+    """
+    Convert a stored tracking item to full attribute names.
+    Epoch timestamps are converted to ISO 8601 strings; items written before
+    short names were introduced pass through unchanged.
+
+    Args:
+        item (dict): Tracking item as stored in DynamoDB
+
+    Returns:
+        dict: Tracking item with full attribute names
+    """
+    result = to_full_names(item)
+    for name in ("start_time", "completion_time", "last_updated"):
+        if isinstance(result.get(name), (int, float, decimal.Decimal)):
+            result[name] = datetime.fromtimestamp(int(result[name])).isoformat()
+    return result
+
 
 def initialize_document_tracking(bucket_name, document_key, document_name, total_chunks):
     """
@@ -51,9 +118,6 @@ def initialize_document_tracking(bucket_name, document_key, document_name, total
         str: The document_id for this tracking record
     """
     try:
-        # Initialize SNS client
-        sns_client = boto3.client("sns", region_name=region)
-
         # Generate timestamp-based version and IDs
         upload_timestamp = int(datetime.now().timestamp())
         document_version = f"v{upload_timestamp}"
@@ -119,9 +183,6 @@ def update_indexing_progress(document_id, document_name, page_number):
         bool: True if successful, False otherwise
     """
     try:
-        # Initialize SNS client
-        sns_client = boto3.client("sns", region_name=region)
-
         # Optional: Get document metadata for the SNS message
         # Initialize this with default values in case we can't get the actual data
         base_document_id = ""
@@ -131,11 +192,13 @@ def update_indexing_progress(document_id, document_name, page_number):
         current_chunks = 0
 
         try:
-            # This check is not essential but provides better info in the SNS message
-            dynamodb = boto3.resource("dynamodb", region_name=region)
-            tracking_table = dynamodb.Table(TRACKING_TABLE)
-            doc_response = tracking_table.get_item(Key={"document_id": document_id})
-            item = doc_response.get("Item", {})
+            # This check is not essential but provides better info in the SNS message.
+            # It reads through the table's low-level client, which is safe to share
+            # between the threads this is called from
+            doc_response = tracking_table.meta.client.get_item(
+                TableName=TRACKING_TABLE, Key={"document_id": document_id}
+            )
+            item = from_stored_item(doc_response.get("Item", {}))
             base_document_id = item.get("base_document_id", "")
             document_version = item.get("document_version", "")
             upload_timestamp = item.get("upload_timestamp", 0)
@@ -227,16 +290,13 @@ def get_document_history(base_document_id):
         list: Processing records sorted by timestamp
     """
     try:
-        dynamodb = boto3.resource("dynamodb", region_name=region)
-        tracking_table = dynamodb.Table(TRACKING_TABLE)
-
         response = tracking_table.query(
             IndexName="BaseDocumentIndex",
             KeyConditionExpression=Key("base_document_id").eq(base_document_id),
             ScanIndexForward=False,  # Newest first
         )
 
-        return response.get("Items", [])
+        return [from_stored_item(item) for item in response.get("Items", [])]
     except Exception as e:
         logger.error(f"Error getting document history: {str(e)}")
         return []
@@ -299,16 +359,14 @@ def get_all_documents():
         list: List of documents with their latest status
     """
     try:
-        dynamodb = boto3.resource("dynamodb", region_name=region)
-        tracking_table = dynamodb.Table(TRACKING_TABLE)
-
         # Use a regular scan instead of GSI - works better when GSI may not be fully propagated
         response = tracking_table.scan()
         logger.info(f"Found {len(response.get('Items', []))} items in tracking table")
 
         # Group by base_document_id
         documents_by_id = {}
-        for item in response.get("Items", []):
+        for stored_item in response.get("Items", []):
+            item = from_stored_item(stored_item)
             base_id = item.get("base_document_id")
             # Skip items without a base_document_id (like error entries)
             if not base_id:
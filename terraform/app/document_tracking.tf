@@ -78,7 +78,8 @@ resource "aws_iam_policy" "document_tracking_policy" {
           "dynamodb:PutItem",
           "dynamodb:UpdateItem",
           "dynamodb:Query",
-          "dynamodb:Scan"
+          "dynamodb:Scan",
+          "dynamodb:DescribeTable"
         ]
         Effect   = "Allow"
         Resource = aws_dynamodb_table.document_tracking.arn
@@ -90,6 +91,16 @@ resource "aws_iam_policy" "document_tracking_policy" {
         Effect   = "Allow"
         Resource = "${aws_dynamodb_table.document_tracking.arn}/index/BaseDocumentIndex"
       },
+      {
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.document_tracking.stream_arn
+      },
       {
         Action = [
           "sns:Publish",
@@ -97,6 +108,13 @@ resource "aws_iam_policy" "document_tracking_policy" {
         ]
         Effect   = "Allow"
         Resource = aws_sns_topic.document_indexing.arn
+      },
+      {
+        Action = [
+          "sqs:SendMessage"
+        ]
+        Effect   = "Allow"
+        Resource = aws_sqs_queue.document_completion_failures.arn
       }
     ]
   })
@@ -122,4 +140,61 @@ resource "aws_lambda_permission" "document_tracking_sns_permission" {
   function_name = aws_lambda_function.document_tracking.function_name
   principal     = "sns.amazonaws.com"
   source_arn    = aws_sns_topic.document_indexing.arn
-}
\ No newline at end of file
+}
+
+# Document Completion Lambda function
+# Consumes the tracking table's stream and marks documents COMPLETED once all chunks are indexed
+resource "aws_lambda_function" "document_completion" {
+  function_name    = "ee-ai-rag-mcp-demo-document-completion"
+  filename         = data.archive_file.document_tracking_zip.output_path
+  source_code_hash = data.archive_file.document_tracking_zip.output_base64sha256
+  role             = aws_iam_role.document_tracking_role.arn
+  handler          = "handler.stream_handler"
+  runtime          = "python3.9"
+  timeout          = 30
+  memory_size      = 128
+  layers           = [aws_lambda_layer_version.document_tracking_layer.arn]
+
+  environment {
+    variables = {
+      TRACKING_TABLE = aws_dynamodb_table.document_tracking.name
+    }
+  }
+}
+
+# Metadata for stream batches the completion Lambda could not process
+resource "aws_sqs_queue" "document_completion_failures" {
+  name                      = "ee-ai-rag-mcp-demo-document-completion-failures"
+  message_retention_seconds = 1209600
+}
+
+# Only deliver updates to documents that are still processing
+# Failing batches are split to isolate the bad record, retried a bounded number of
+# times and then sent to the failure queue so they do not block the shard
+resource "aws_lambda_event_source_mapping" "document_completion_stream" {
+  event_source_arn               = aws_dynamodb_table.document_tracking.stream_arn
+  function_name                  = aws_lambda_function.document_completion.arn
+  starting_position              = "LATEST"
+  batch_size                     = 100
+  maximum_retry_attempts         = 3
+  bisect_batch_on_function_error = true
+
+  destination_config {
+    on_failure {
+      destination_arn = aws_sqs_queue.document_completion_failures.arn
+    }
+  }
+
+  filter_criteria {
+    filter {
+      pattern = jsonencode({
+        eventName = ["MODIFY"]
+        dynamodb = {
+          NewImage = {
+            st = { S = ["PROCESSING"] }
+          }
+        }
+      })
+    }
+  }
+}
@@ -5,6 +5,10 @@ resource "aws_dynamodb_table" "document_tracking" {
   name         = "ee-ai-rag-mcp-demo-doc-tracking"
   billing_mode = "PAY_PER_REQUEST"
   hash_key     = "document_id"
+
+  # Stream item changes so document completion can be detected asynchronously
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
   
   attribute {
     name = "document_id"
@@ -0,0 +1,47 @@
+"""
+Stub payload helpers shared by the Lambda handler tests.
+"""
+
+from datetime import datetime, timezone
+
+# Fixed LastModified timestamp echoed back by stubbed head_object responses
+FIXED_LAST_MODIFIED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def head_object_response(content_type="text/plain", content_length=1234):
+    """
+    Build a head_object response for a stubbed S3 object.
+
+    Args:
+        content_type (str): The object's content type
+        content_length (int): The object's size in bytes
+
+    Returns:
+        dict: The head_object response
+    """
+    return {
+        "ContentLength": content_length,
+        "LastModified": FIXED_LAST_MODIFIED,
+        "ContentType": content_type,
+    }
+
+
+def s3_event(bucket_name, file_key):
+    """
+    Build an S3 event notification for a single object.
+
+    Args:
+        bucket_name (str): The bucket the object was written to
+        file_key (str): The object's key
+
+    Returns:
+        dict: The S3 event
+    """
+    return {
+        "Records": [
+            {
+                "eventSource": "aws:s3",
+                "s3": {"bucket": {"name": bucket_name}, "object": {"key": file_key}},
+            }
+        ]
+    }
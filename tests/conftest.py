@@ -2,4 +2,34 @@
 import os
 import sys
 
+import botocore.session
+import pytest
+
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture(scope="session")
+def botocore_session():
+    """
+    Botocore session shared by the whole test run, so its loader parses each
+    service model only once. Dummy credentials let its clients sign requests
+    for moto.
+    """
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    return botocore.session.get_session()
+
+
+@pytest.fixture(scope="session")
+def s3_client(botocore_session):
+    """S3 client shared by the whole test run, routed through moto whenever a mock is active"""
+    patch_client = pytest.importorskip("moto.core").patch_client
+    client = botocore_session.create_client("s3", region_name="us-east-1")
+    patch_client(client)
+    return client
+
+
+@pytest.fixture(scope="session")
+def textract_client(botocore_session):
+    """Textract client shared by the whole test run"""
+    return botocore_session.create_client("textract", region_name="us-east-1")
@@ -1,7 +1,6 @@
 import json
 import unittest
 from unittest import mock
-import sys
 
 # Create a mock tracking_utils module
 tracking_utils_mock = mock.MagicMock()
@@ -35,11 +34,8 @@ mock_documents = [
 # Configure the mock to return the documents list
 tracking_utils_mock.get_all_documents.return_value = mock_documents
 
-# Apply the mock
-sys.modules["src.utils.tracking_utils"] = tracking_utils_mock
-sys.modules["utils.tracking_utils"] = tracking_utils_mock
-
-# Now import the handler module
+# Import the handler module
+from src.lambda_functions.document_status import handler as handler_module
 from src.lambda_functions.document_status.handler import lambda_handler
 
 
@@ -48,6 +44,15 @@ class TestDocumentStatusHandler(unittest.TestCase):
     Test cases for the document_status Lambda function.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        """Patch the handler's tracking_utils with the mock once for the whole class."""
+        cls.tracking_utils_patcher = mock.patch.object(
+            handler_module, "tracking_utils", tracking_utils_mock
+        )
+        cls.tracking_utils_patcher.start()
+        cls.addClassCleanup(cls.tracking_utils_patcher.stop)
+
     def test_lambda_handler_list_documents(self):
         """
         Test the lambda_handler function to list all documents.
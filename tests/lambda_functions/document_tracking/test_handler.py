@@ -1,16 +1,74 @@
 import json
+import os
 import unittest
+from datetime import datetime
 from unittest import mock
 
+import boto3
+from moto import mock_dynamodb
+
 # Import the handler and functions
+from src.lambda_functions.document_tracking import handler as handler_module
 from src.lambda_functions.document_tracking.handler import (
     lambda_handler,
     initialize_document_tracking,
     update_indexing_progress,
     complete_document_indexing,
     DecimalEncoder,
+    stream_handler,
 )
 
+try:
+    import orjson
+
+    def dumps_message(message):
+        """Serialize an SNS message payload with orjson."""
+        return orjson.dumps(message).decode("utf-8")
+
+except ImportError:  # pragma: no cover
+    dumps_message = json.dumps
+
+# SNS message payloads shared by the lambda_handler tests
+INIT_MESSAGE = {
+    "document_id": "test-bucket/test-doc/v1234567890",
+    "base_document_id": "test-bucket/test-doc",
+    "document_name": "test-doc.pdf",
+    "document_version": "v1234567890",
+    "upload_timestamp": 1234567890,
+    "total_chunks": 5,
+}
+PROGRESS_MESSAGE = {
+    "document_id": "test-bucket/test-doc/v1234567890",
+    "document_name": "test-doc.pdf",
+    "page_number": 2,
+    "progress": "3/5",
+}
+COMPLETION_MESSAGE = {
+    "document_id": "test-bucket/test-doc/v1234567890",
+    "document_name": "test-doc.pdf",
+    "total_chunks": 5,
+    "completion_time": "2023-01-01T12:30:00",
+}
+UNKNOWN_MESSAGE = {
+    "document_id": "test-bucket/test-doc/v1234567890",
+    "document_name": "test-doc.pdf",
+    "total_chunks": 5,
+}
+
+
+def build_sns_event(subject, message):
+    """Build an SNS event containing a single record."""
+    return {"Records": [{"Sns": {"Subject": subject, "Message": message}}]}
+
+
+# SNS events are built once at import; the handler does not modify its input
+INIT_EVENT = build_sns_event("Document Processing Started", dumps_message(INIT_MESSAGE))
+PROGRESS_EVENT = build_sns_event("Document Chunk Indexed", dumps_message(PROGRESS_MESSAGE))
+COMPLETION_EVENT = build_sns_event("Document Indexing Completed", dumps_message(COMPLETION_MESSAGE))
+UNKNOWN_EVENT = build_sns_event("Unknown Subject", dumps_message(UNKNOWN_MESSAGE))
+INVALID_EVENT = build_sns_event("Document Processing Started", "this is not valid json")
+EMPTY_EVENT = {"Records": []}
+
 
 class TestDecimalEncoder(unittest.TestCase):
     """Test cases for the DecimalEncoder class."""
@@ -30,119 +88,153 @@ class TestDecimalEncoder(unittest.TestCase):
         self.assertEqual(json.dumps(data, cls=DecimalEncoder), '{"int": 10, "float": 10.5}')
 
 
-class TestDocumentTrackingHandler(unittest.TestCase):
-    """Test cases for the document_tracking Lambda handler."""
+class TrackingTableTestCase(unittest.TestCase):
+    """Base class that patches the handler's DynamoDB objects once per test class."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Create a patcher for boto3 resource
-        self.boto3_resource_patcher = mock.patch("boto3.resource")
-        self.mock_boto3_resource = self.boto3_resource_patcher.start()
+    @classmethod
+    def setUpClass(cls):
+        """Patch the module-level DynamoDB tracking table once for the whole class."""
+        cls.mock_table = mock.MagicMock()
+        cls.table_patcher = mock.patch.object(handler_module, "tracking_table", cls.mock_table)
+        cls.table_patcher.start()
+        cls.addClassCleanup(cls.table_patcher.stop)
 
-        # Mock the DynamoDB resource and table
-        self.mock_table = mock.MagicMock()
-        self.mock_dynamodb = mock.MagicMock()
-        self.mock_boto3_resource.return_value = self.mock_dynamodb
-        self.mock_dynamodb.Table.return_value = self.mock_table
+    def setUp(self):
+        """Reset the shared table mock and set up default return values."""
+        self.mock_table.reset_mock(return_value=True, side_effect=True)
+        self.mock_client = self.mock_table.meta.client
 
         # Set up default return values
-        self.mock_table.put_item.return_value = {}
-        self.mock_table.update_item.return_value = {"Attributes": {"indexed_chunks": 1}}
-        self.mock_table.get_item.return_value = {"Item": {"total_chunks": 5, "indexed_chunks": 0}}
+        self.mock_client.update_item.return_value = {"Attributes": {"ic": 1}}
+        self.mock_table.get_item.return_value = {"Item": {"tc": 5, "ic": 0}}
         self.mock_table.query.return_value = {"Items": []}
 
-    def tearDown(self):
-        """Tear down test fixtures."""
-        self.boto3_resource_patcher.stop()
 
-    def test_lambda_handler_with_empty_event(self):
-        """Test handler with an empty event."""
-        event = {"Records": []}
+class TestDocumentTrackingHandler(TrackingTableTestCase):
+    """Test cases for the document_tracking Lambda handler."""
+
+    def test_lambda_handler_with_single_record_events(self):
+        """Test handler responses for each kind of single-record SNS event."""
+        cases = [
+            ("empty", EMPTY_EVENT, []),
+            (
+                "init",
+                INIT_EVENT,
+                [{"status": "success", "document_id": INIT_MESSAGE["document_id"]}],
+            ),
+            (
+                "progress",
+                PROGRESS_EVENT,
+                [
+                    {
+                        "status": "success",
+                        "document_id": PROGRESS_MESSAGE["document_id"],
+                        # Progress is calculated internally, not taken from the message
+                        "progress": "1/0",
+                    }
+                ],
+            ),
+            (
+                "completion",
+                COMPLETION_EVENT,
+                [{"status": "success", "document_id": COMPLETION_MESSAGE["document_id"]}],
+            ),
+            (
+                "unknown subject",
+                UNKNOWN_EVENT,
+                [
+                    {
+                        "status": "success",
+                        "message": "Received message with unknown subject: Unknown Subject",
+                    }
+                ],
+            ),
+            (
+                "invalid json",
+                INVALID_EVENT,
+                [{"status": "error", "message": "Invalid JSON in SNS message"}],
+            ),
+        ]
+
+        for name, event, expected_results in cases:
+            with self.subTest(name=name):
+                # Call the handler
+                response = lambda_handler(event, {})
+
+                # Verify the response
+                self.assertEqual(response["statusCode"], 200)
+                self.assertEqual(
+                    response["body"]["message"], f"Processed {len(expected_results)} SNS events"
+                )
+                results = response["body"]["results"]
+                self.assertEqual(len(results), len(expected_results))
+                for result, expected in zip(results, expected_results):
+                    self.assertEqual({key: result.get(key) for key in expected}, expected)
+
+    def test_lambda_handler_initializes_documents_first(self):
+        """Test handler initializes documents before processing the event's other records."""
+        event = {"Records": PROGRESS_EVENT["Records"] + INIT_EVENT["Records"]}
+
+        # Call the handler
         response = lambda_handler(event, {})
 
-        self.assertEqual(response["statusCode"], 200)
-        self.assertEqual(response["body"]["message"], "Processed 0 SNS events")
-        self.assertEqual(len(response["body"]["results"]), 0)
+        # Verify the results keep the record order
+        results = response["body"]["results"]
+        self.assertEqual([result["status"] for result in results], ["success", "success"])
+        self.assertIn("progress", results[0])
+        self.assertIn("initialized", results[1]["message"])
 
-    def test_lambda_handler_with_init_message(self):
-        """Test handler with a Document Processing Started message."""
-        # Create a test SNS event
-        message_data = {
-            "document_id": "test-bucket/test-doc/v1234567890",
-            "base_document_id": "test-bucket/test-doc",
-            "document_name": "test-doc.pdf",
-            "document_version": "v1234567890",
-            "upload_timestamp": 1234567890,
-            "total_chunks": 5,
-        }
+        # Verify the start message was written before the chunk update
+        update_expressions = [
+            c.kwargs["UpdateExpression"] for c in self.mock_client.update_item.call_args_list
+        ]
+        self.assertIn("if_not_exists", update_expressions[0])
+        self.assertEqual(update_expressions[1], "ADD ic :inc SET lu = :timestamp")
 
-        event = {
-            "Records": [
-                {
-                    "Sns": {
-                        "Subject": "Document Processing Started",
-                        "Message": json.dumps(message_data),
-                    }
-                }
-            ]
-        }
+    def test_lambda_handler_with_runtime_built_subject(self):
+        """Test routing works for subjects that are not the same object as the constants."""
+        # Build the subject at runtime so it is a distinct, non-interned string object
+        subject = " ".join(["Document", "Indexing", "Completed"])
+        message_data = {"document_id": "test-bucket/test-doc/v1234567890", "total_chunks": 5}
+
+        event = {"Records": [{"Sns": {"Subject": subject, "Message": dumps_message(message_data)}}]}
 
         # Call the handler
         response = lambda_handler(event, {})
 
-        # Verify the response
-        self.assertEqual(response["statusCode"], 200)
-        self.assertEqual(response["body"]["message"], "Processed 1 SNS events")
-        self.assertEqual(len(response["body"]["results"]), 1)
-        self.assertEqual(response["body"]["results"][0]["status"], "success")
-        self.assertEqual(response["body"]["results"][0]["document_id"], message_data["document_id"])
-
-    def test_lambda_handler_with_progress_message(self):
-        """Test handler with a Document Chunk Indexed message."""
-        # Create a test SNS event
-        message_data = {
-            "document_id": "test-bucket/test-doc/v1234567890",
-            "document_name": "test-doc.pdf",
-            "page_number": 2,
-            "progress": "3/5",
-        }
+        # Verify the completion handler was used
+        result = response["body"]["results"][0]
+        self.assertEqual(result["status"], "success")
+        self.assertIn("Document indexing completed", result["message"])
 
+    def test_lambda_handler_with_non_string_subject(self):
+        """Test a record with a non-string subject is skipped instead of failing the batch."""
         event = {
             "Records": [
-                {"Sns": {"Subject": "Document Chunk Indexed", "Message": json.dumps(message_data)}}
+                {"Sns": {"Subject": 42, "Message": dumps_message(UNKNOWN_MESSAGE)}},
+                PROGRESS_EVENT["Records"][0],
             ]
         }
 
-        # Call the handler
         response = lambda_handler(event, {})
 
-        # Verify the response
         self.assertEqual(response["statusCode"], 200)
-        self.assertEqual(response["body"]["message"], "Processed 1 SNS events")
-        self.assertEqual(len(response["body"]["results"]), 1)
-        self.assertEqual(response["body"]["results"][0]["status"], "success")
-        self.assertEqual(response["body"]["results"][0]["document_id"], message_data["document_id"])
-        # Progress is now calculated internally, not taken from message
-        self.assertIn("progress", response["body"]["results"][0])  # Just verify it exists
-
-    def test_lambda_handler_with_completion_message(self):
-        """Test handler with a Document Indexing Completed message."""
-        # Create a test SNS event
-        message_data = {
-            "document_id": "test-bucket/test-doc/v1234567890",
-            "document_name": "test-doc.pdf",
-            "total_chunks": 5,
-            "completion_time": "2023-01-01T12:30:00",
-        }
+        unknown_result, progress_result = response["body"]["results"]
+        self.assertEqual(unknown_result["message"], "Received message with unknown subject: 42")
+        self.assertEqual(progress_result["status"], "success")
 
+    def test_lambda_handler_preserves_record_order(self):
+        """Test handler returns results in record order when processing concurrently."""
+        document_ids = [f"test-bucket/test-doc-{i}/v1234567890" for i in range(8)]
         event = {
             "Records": [
                 {
                     "Sns": {
                         "Subject": "Document Indexing Completed",
-                        "Message": json.dumps(message_data),
+                        "Message": dumps_message({"document_id": document_id, "total_chunks": 5}),
                     }
                 }
+                for document_id in document_ids
             ]
         }
 
@@ -151,64 +243,72 @@ class TestDocumentTrackingHandler(unittest.TestCase):
 
         # Verify the response
         self.assertEqual(response["statusCode"], 200)
-        self.assertEqual(response["body"]["message"], "Processed 1 SNS events")
-        self.assertEqual(len(response["body"]["results"]), 1)
-        self.assertEqual(response["body"]["results"][0]["status"], "success")
-        self.assertEqual(response["body"]["results"][0]["document_id"], message_data["document_id"])
-
-    def test_lambda_handler_with_unknown_subject(self):
-        """Test handler with an unknown message subject."""
-        # Create a test SNS event
-        message_data = {
-            "document_id": "test-bucket/test-doc/v1234567890",
-            "document_name": "test-doc.pdf",
-            "total_chunks": 5,
-        }
-
-        event = {
-            "Records": [
-                {"Sns": {"Subject": "Unknown Subject", "Message": json.dumps(message_data)}}
-            ]
-        }
-
-        # Call the handler
-        response = lambda_handler(event, {})
-
-        # Verify the response
-        self.assertEqual(response["statusCode"], 200)
-        self.assertEqual(response["body"]["message"], "Processed 1 SNS events")
-        self.assertEqual(len(response["body"]["results"]), 1)
-        self.assertEqual(response["body"]["results"][0]["status"], "success")
-        self.assertIn("Unknown Subject", response["body"]["results"][0]["message"])
-
-    def test_lambda_handler_with_invalid_message(self):
-        """Test handler with an invalid JSON message."""
+        self.assertEqual(response["body"]["message"], "Processed 8 SNS events")
+        results = response["body"]["results"]
+        self.assertEqual([result["document_id"] for result in results], document_ids)
+        self.assertEqual(self.mock_client.update_item.call_count, 8)
+
+        # The worker threads write through the thread-safe low-level client, not the
+        # shared Table resource
+        self.mock_table.update_item.assert_not_called()
+        update_call = self.mock_client.update_item.call_args_list[0]
+        self.assertEqual(update_call.kwargs["Key"], {"document_id": document_ids[0]})
+
+    def test_lambda_handler_computes_time_once(self):
+        """Test handler reads the clock once per invocation, not once per record."""
         event = {
             "Records": [
                 {
                     "Sns": {
-                        "Subject": "Document Processing Started",
-                        "Message": "this is not valid json",
+                        "Subject": "Document Chunk Indexed",
+                        "Message": dumps_message(
+                            {"document_id": f"test-bucket/test-doc-{i}/v1", "page_number": 1}
+                        ),
                     }
                 }
+                for i in range(4)
             ]
         }
 
-        # Call the handler
-        response = lambda_handler(event, {})
+        with mock.patch.object(
+            handler_module,
+            "current_timestamp",
+            return_value=1700000000,
+        ) as mock_timestamp:
+            lambda_handler(event, {})
 
-        # Verify the response
+        mock_timestamp.assert_called_once()
+        for update_call in self.mock_client.update_item.call_args_list:
+            values = update_call.kwargs["ExpressionAttributeValues"]
+            self.assertEqual(values[":timestamp"], 1700000000)
+
+    def test_lambda_handler_warmer_noop(self):
+        """Test handler returns immediately for warmer invocations."""
+        response = lambda_handler({"warmer": True}, {})
+
+        # Verify no work was done
         self.assertEqual(response["statusCode"], 200)
-        self.assertEqual(response["body"]["message"], "Processed 1 SNS events")
-        self.assertEqual(len(response["body"]["results"]), 1)
-        self.assertEqual(response["body"]["results"][0]["status"], "error")
+        self.assertEqual(response["body"]["message"], "warm")
+        self.mock_client.update_item.assert_not_called()
+
+    def test_warm_up_describes_table(self):
+        """Test warm_up resolves the table and tolerates errors."""
+        from src.lambda_functions.document_tracking.handler import warm_up
+
+        warm_up()
+        self.mock_table.meta.client.describe_table.assert_called_once()
+
+        # Errors during warm-up are logged rather than raised
+        self.mock_table.meta.client.describe_table.side_effect = Exception("Test error")
+        with mock.patch.object(handler_module.logger, "warning"):
+            warm_up()
 
     def test_lambda_handler_exception(self):
         """Test handler when an exception occurs."""
         event = {"malformed": "event"}  # Will cause an exception
 
         # Mock the logger to prevent error messages in test output
-        with mock.patch("src.lambda_functions.document_tracking.handler.logger.error"):
+        with mock.patch.object(handler_module.logger, "error"):
             # Call the handler
             response = lambda_handler(event, {})
 
@@ -329,17 +429,7 @@ class TestDocumentTrackingHandler(unittest.TestCase):
 
         error_response = {"Error": {"Code": "ConditionalCheckFailedException"}}
         conditional_error = ClientError(error_response, "update_item")
-        self.mock_table.update_item.side_effect = conditional_error
-
-        # Mock the get_item response for the already completed document
-        self.mock_table.get_item.return_value = {
-            "Item": {
-                "document_id": "test-bucket/test-doc/v1234567890",
-                "status": "COMPLETED",
-                "total_chunks": 5,
-                "indexed_chunks": 5,
-            }
-        }
+        self.mock_client.update_item.side_effect = conditional_error
 
         # Call the function
         result = complete_document_indexing(message_data)
@@ -348,11 +438,34 @@ class TestDocumentTrackingHandler(unittest.TestCase):
         self.assertEqual(result["status"], "success")
         self.assertEqual(result["document_id"], message_data["document_id"])
 
-        # Verify get_item was called
-        self.mock_table.get_item.assert_called_with(
-            Key={"document_id": message_data["document_id"]}
+        # Verify the already-completed document was not re-read
+        self.mock_table.get_item.assert_not_called()
+        self.mock_client.update_item.assert_called_once()
+        self.assertEqual(
+            self.mock_client.update_item.call_args.kwargs["ConditionExpression"],
+            "attribute_exists(document_id) AND "
+            "(attribute_not_exists(st) OR st <> :completed_status)",
         )
 
+    def test_complete_document_indexing_other_client_error(self):
+        """Test complete_document_indexing reports client errors other than condition failures."""
+        from botocore.exceptions import ClientError
+
+        error_response = {"Error": {"Code": "ProvisionedThroughputExceededException"}}
+        self.mock_client.update_item.side_effect = ClientError(error_response, "update_item")
+
+        # Call the function
+        with mock.patch.object(handler_module.logger, "warning"), mock.patch.object(
+            handler_module.logger, "error"
+        ):
+            result = complete_document_indexing(
+                {"document_id": "test-bucket/test-doc/v1234567890", "total_chunks": 5}
+            )
+
+        # Verify result
+        self.assertEqual(result["status"], "error")
+        self.assertIn("ProvisionedThroughputExceededException", result["message"])
+
     def test_get_document_history(self):
         """Test get_document_history function."""
         from src.lambda_functions.document_tracking.handler import get_document_history
@@ -361,9 +474,10 @@ class TestDocumentTrackingHandler(unittest.TestCase):
         mock_history_items = [
             {
                 "document_id": "test-bucket/test-doc/v1234567891",
-                "status": "COMPLETED",
+                "st": "COMPLETED",
                 "upload_timestamp": 1234567891,
             },
+            # Written before short attribute names were introduced
             {
                 "document_id": "test-bucket/test-doc/v1234567890",
                 "status": "COMPLETED",
@@ -377,12 +491,28 @@ class TestDocumentTrackingHandler(unittest.TestCase):
         # Call the function
         result = get_document_history(base_document_id)
 
-        # Verify result
-        self.assertEqual(result, mock_history_items)
+        # Verify result is translated back to full attribute names
+        self.assertEqual(
+            result,
+            [
+                {
+                    "document_id": "test-bucket/test-doc/v1234567891",
+                    "status": "COMPLETED",
+                    "upload_timestamp": 1234567891,
+                },
+                {
+                    "document_id": "test-bucket/test-doc/v1234567890",
+                    "status": "COMPLETED",
+                    "upload_timestamp": 1234567890,
+                },
+            ],
+        )
 
         # Verify query parameters
         self.mock_table.query.assert_called_with(
-            IndexName="BaseDocumentIndex", KeyConditionExpression=mock.ANY, ScanIndexForward=False
+            IndexName="BaseDocumentIndex",
+            KeyConditionExpression=mock.ANY,
+            ScanIndexForward=False,
         )
 
     def test_get_document_history_error(self):
@@ -400,8 +530,8 @@ class TestDocumentTrackingHandler(unittest.TestCase):
         # Verify that an empty list is returned on error
         self.assertEqual(result, [])
 
-    def test_update_indexing_progress_complete(self):
-        """Test update_indexing_progress when all chunks are processed."""
+    def test_update_indexing_progress_last_chunk_leaves_completion_to_stream(self):
+        """Test update_indexing_progress does not complete the document on the last chunk."""
         message_data = {
             "document_id": "test-bucket/test-doc/v1234567890",
             "document_name": "test-doc.pdf",
@@ -409,19 +539,16 @@ class TestDocumentTrackingHandler(unittest.TestCase):
             "progress": "5/5",
         }
 
-        # Configure the mock for a document that will be completed
-        self.mock_table.get_item.return_value = {
-            "Item": {
+        # Configure update_item to return the full stored item with indexed_chunks = total_chunks
+        self.mock_client.update_item.return_value = {
+            "Attributes": {
                 "document_id": "test-bucket/test-doc/v1234567890",
-                "total_chunks": 5,
-                "indexed_chunks": 4,
-                "status": "PROCESSING",
+                "tc": 5,
+                "ic": 5,
+                "st": "PROCESSING",
             }
         }
 
-        # Configure update_item to return new indexed_chunks value = total_chunks
-        self.mock_table.update_item.return_value = {"Attributes": {"indexed_chunks": 5}}
-
         # Call the function
         result = update_indexing_progress(message_data)
 
@@ -430,9 +557,15 @@ class TestDocumentTrackingHandler(unittest.TestCase):
         self.assertEqual(result["document_id"], message_data["document_id"])
         self.assertEqual(result["progress"], "5/5")
 
-        # Verify the table was updated to mark as COMPLETED
-        # The third update_item call will be for setting COMPLETED status
-        self.assertEqual(self.mock_table.update_item.call_count, 3)
+        # The progress is read back from the atomic increment, no separate read is needed
+        self.mock_table.get_item.assert_not_called()
+        self.mock_client.update_item.assert_called_once()
+        self.assertEqual(self.mock_client.update_item.call_args.kwargs["ReturnValues"], "ALL_NEW")
+
+        # Completion is left to the DynamoDB stream consumer, so only the increment is issued
+        update_kwargs = self.mock_client.update_item.call_args.kwargs
+        self.assertEqual(update_kwargs["UpdateExpression"], "ADD ic :inc SET lu = :timestamp")
+        self.assertNotIn("COMPLETED", update_kwargs["ExpressionAttributeValues"].values())
 
     def test_update_indexing_progress_for_problematic_document(self):
         """Test update_indexing_progress with a problematic document."""
@@ -444,12 +577,12 @@ class TestDocumentTrackingHandler(unittest.TestCase):
         }
 
         # Configure the mock for document status
-        self.mock_table.get_item.return_value = {
-            "Item": {
+        self.mock_client.update_item.return_value = {
+            "Attributes": {
                 "document_id": "test-bucket/test-doc/v1234567890",
-                "total_chunks": 5,
-                "indexed_chunks": 1,
-                "status": "PROCESSING",
+                "tc": 5,
+                "ic": 2,
+                "st": "PROCESSING",
             }
         }
 
@@ -460,9 +593,182 @@ class TestDocumentTrackingHandler(unittest.TestCase):
         self.assertEqual(result["status"], "success")
         self.assertEqual(result["document_id"], message_data["document_id"])
         self.assertEqual(result["document_name"], "internet_usage_policy.txt")
+        self.assertEqual(result["progress"], "2/5")
 
         # Since it's a problematic document, there should be extra logs but same functionality
 
 
+class MotoTrackingTableTestCase(unittest.TestCase):
+    """Base class that backs the handler's tracking table with a moto DynamoDB table."""
+
+    def setUp(self):
+        """Create the tracking table in a fresh moto backend and patch it into the handler."""
+        env_patcher = mock.patch.dict(
+            os.environ, {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing"}
+        )
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+        dynamodb_mock = mock_dynamodb()
+        dynamodb_mock.start()
+        self.addCleanup(dynamodb_mock.stop)
+
+        self.table = boto3.resource("dynamodb", region_name="us-east-1").create_table(
+            TableName=handler_module.TRACKING_TABLE,
+            KeySchema=[{"AttributeName": "document_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "document_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        table_patcher = mock.patch.object(handler_module, "tracking_table", self.table)
+        table_patcher.start()
+        self.addCleanup(table_patcher.stop)
+
+    def get_stored_item(self, document_id):
+        """Get a tracking item as stored, or None if it does not exist."""
+        return self.table.get_item(Key={"document_id": document_id}).get("Item")
+
+
+class TestDocumentTrackingConditions(MotoTrackingTableTestCase):
+    """Test the handler's conditional writes against a moto DynamoDB table."""
+
+    def test_complete_document_indexing_does_not_create_unknown_document(self):
+        """Test a completion message for an untracked document leaves the table unchanged."""
+        result = complete_document_indexing(COMPLETION_MESSAGE)
+
+        self.assertEqual(result["status"], "success")
+        self.assertIsNone(self.get_stored_item(COMPLETION_MESSAGE["document_id"]))
+
+    def test_initialize_document_tracking_stores_compact_item(self):
+        """Test initialize_document_tracking writes short names and epoch timestamps."""
+        message_data = {
+            "document_id": "test-bucket/test-doc/v1234567890",
+            "base_document_id": "test-bucket/test-doc",
+            "document_name": "test-doc.pdf",
+            "document_version": "v1234567890",
+            "upload_timestamp": 1234567890,
+            "total_chunks": 5,
+            "start_time": "2023-01-01T12:00:00",
+        }
+
+        # Call the function
+        initialize_document_tracking(message_data)
+
+        # Verify the stored item
+        self.assertEqual(
+            self.get_stored_item(message_data["document_id"]),
+            {
+                "document_id": "test-bucket/test-doc/v1234567890",
+                "base_document_id": "test-bucket/test-doc",
+                "dn": "test-doc.pdf",
+                "dv": "v1234567890",
+                "upload_timestamp": 1234567890,
+                "tc": 5,
+                "ic": 0,
+                "st": "PROCESSING",
+                "sts": int(datetime(2023, 1, 1, 12, 0, 0).timestamp()),
+            },
+        )
+
+    def test_start_message_after_chunk_updates_initializes_document(self):
+        """Test a start message that arrives after chunk updates keeps their progress."""
+        document_id = INIT_MESSAGE["document_id"]
+
+        # Two chunk updates arrive first and create a partial item
+        update_indexing_progress(dict(PROGRESS_MESSAGE))
+        update_indexing_progress(dict(PROGRESS_MESSAGE))
+        self.assertEqual(self.get_stored_item(document_id)["ic"], 2)
+
+        # The start message then fills in everything except the chunk count
+        result = initialize_document_tracking(dict(INIT_MESSAGE))
+
+        self.assertEqual(result["message"], f"Document tracking initialized for {document_id}")
+        stored_item = self.get_stored_item(document_id)
+        self.assertEqual(stored_item["base_document_id"], INIT_MESSAGE["base_document_id"])
+        self.assertEqual(stored_item["tc"], 5)
+        self.assertEqual(stored_item["ic"], 2)
+        self.assertEqual(stored_item["st"], "PROCESSING")
+
+    def test_redelivered_start_message_keeps_progress(self):
+        """Test a redelivered start message does not reset an initialized document."""
+        document_id = INIT_MESSAGE["document_id"]
+        initialize_document_tracking(dict(INIT_MESSAGE))
+        update_indexing_progress(dict(PROGRESS_MESSAGE))
+
+        # Deliver the start message again
+        result = initialize_document_tracking(dict(INIT_MESSAGE))
+
+        self.assertEqual(
+            result["message"], f"Document tracking already initialized for {document_id}"
+        )
+        self.assertEqual(self.get_stored_item(document_id)["ic"], 1)
+
+
+class TestDocumentCompletionStreamHandler(TrackingTableTestCase):
+    """Test cases for the DynamoDB stream completion handler."""
+
+    @staticmethod
+    def build_stream_event(indexed_chunks, total_chunks, status="PROCESSING", event_name="MODIFY"):
+        """Build a DynamoDB stream event for a single tracking item."""
+        return {
+            "Records": [
+                {
+                    "eventName": event_name,
+                    "dynamodb": {
+                        "NewImage": {
+                            "document_id": {"S": "test-bucket/test-doc/v1234567890"},
+                            "tc": {"N": str(total_chunks)},
+                            "ic": {"N": str(indexed_chunks)},
+                            "st": {"S": status},
+                        }
+                    },
+                }
+            ]
+        }
+
+    def test_stream_handler_completes_fully_indexed_document(self):
+        """Test stream_handler marks a document COMPLETED when all chunks are indexed."""
+        response = stream_handler(self.build_stream_event(5, 5), {})
+
+        self.assertEqual(response["body"]["completed"], ["test-bucket/test-doc/v1234567890"])
+        self.mock_client.update_item.assert_called_once()
+        self.assertEqual(
+            self.mock_client.update_item.call_args.kwargs["ExpressionAttributeValues"][":status"],
+            "COMPLETED",
+        )
+
+    def test_stream_handler_ignores_incomplete_and_completed_documents(self):
+        """Test stream_handler skips documents that do not need completing."""
+        for event in (
+            self.build_stream_event(3, 5),
+            self.build_stream_event(5, 5, status="COMPLETED"),
+            self.build_stream_event(5, 5, event_name="INSERT"),
+        ):
+            response = stream_handler(event, {})
+            self.assertEqual(response["body"]["completed"], [])
+
+        self.mock_client.update_item.assert_not_called()
+
+    def test_stream_handler_conditional_check_failure(self):
+        """Test stream_handler tolerates documents completed concurrently."""
+        from botocore.exceptions import ClientError
+
+        error_response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+        self.mock_client.update_item.side_effect = ClientError(error_response, "update_item")
+
+        response = stream_handler(self.build_stream_event(5, 5), {})
+
+        self.assertEqual(response["body"]["completed"], [])
+
+    def test_stream_handler_raises_other_client_errors(self):
+        """Test stream_handler raises other client errors so the stream batch is retried."""
+        from botocore.exceptions import ClientError
+
+        error_response = {"Error": {"Code": "ProvisionedThroughputExceededException"}}
+        self.mock_client.update_item.side_effect = ClientError(error_response, "update_item")
+
+        with self.assertRaises(ClientError):
+            stream_handler(self.build_stream_event(5, 5), {})
+
+
 if __name__ == "__main__":
     unittest.main()
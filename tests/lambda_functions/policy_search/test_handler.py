@@ -1,30 +1,93 @@
+import importlib
+import io
 import json
+import operator
 import os
+import re
 import sys
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 
+import numpy as np
 import pytest
 
-# Mock utility modules
-opensearch_utils_mock = MagicMock()
-opensearch_utils_mock.get_opensearch_client.return_value = MagicMock()
-opensearch_utils_mock.search_opensearch.return_value = []
+import src.utils
 
-bedrock_utils_mock = MagicMock()
-bedrock_utils_mock.generate_embedding.return_value = [0.1, 0.2, 0.3, 0.4, 0.5]
-bedrock_utils_mock.create_claude_prompt.return_value = {
-    "system": "test",
-    "messages": [{"role": "user", "content": "test"}],
-}
-bedrock_utils_mock.generate_llm_response.return_value = "test response"
 
-# Apply mocks
-sys.modules["src.utils.opensearch_utils"] = opensearch_utils_mock
-sys.modules["src.utils.bedrock_utils"] = bedrock_utils_mock
+def mock_utils_modules(monkeypatch):
+    """Point the utils modules the handler imports at fresh, pre-configured mocks"""
+    opensearch_utils_mock = MagicMock()
+    opensearch_utils_mock.get_opensearch_client.return_value = MagicMock()
+    opensearch_utils_mock.search_opensearch.return_value = []
+
+    bedrock_utils_mock = MagicMock()
+    bedrock_utils_mock.generate_embedding.return_value = [0.1, 0.2, 0.3, 0.4, 0.5]
+    bedrock_utils_mock.create_claude_prompt.return_value = {
+        "system": "test",
+        "messages": [{"role": "user", "content": "test"}],
+    }
+    bedrock_utils_mock.generate_llm_response.return_value = "test response"
+
+    # Both the module registry and the package attributes are patched, since
+    # "from src.utils import x" and patch("src.utils.x...") resolve through the package
+    for name, module_mock in (
+        ("opensearch_utils", opensearch_utils_mock),
+        ("bedrock_utils", bedrock_utils_mock),
+    ):
+        monkeypatch.setitem(sys.modules, f"src.utils.{name}", module_mock)
+        monkeypatch.setattr(src.utils, name, module_mock)
+
+
+# Import the handler against mocked utils so no real clients are created,
+# then restore the real modules for other test files
+with pytest.MonkeyPatch.context() as import_monkeypatch:
+    mock_utils_modules(import_monkeypatch)
+    from src.lambda_functions.policy_search import handler
+
+# Error message patterns, compiled once for the pytest.raises(match=...) checks
+NO_QUERY_RE = re.compile(r"No query parameter found in request")
+INVALID_JSON_RE = re.compile(r"Invalid JSON in request body")
+INVALID_FORMAT_RE = re.compile(r"Invalid request format")
+CLIENT_UNAVAILABLE_RE = re.compile(r"OpenSearch client not available")
+SEARCH_ERROR_RE = re.compile(r"Search error")
+BEDROCK_ERROR_RE = re.compile(r"Bedrock error")
+
+_source = operator.itemgetter("_source")
+
+
+def normalize_hits(hits):
+    """Build the search results the handler expects from raw OpenSearch hits"""
+    return [
+        {
+            "text": source["text"],
+            "document_name": source["document_name"],
+            "page_number": source["page_number"],
+            "metadata": source["metadata"],
+            "score": hit["_score"],
+        }
+        for hit, source in ((hit, _source(hit)) for hit in hits)
+    ]
+
+
+# Bedrock response payloads, encoded once for all tests
+EMBEDDING_RESPONSE_BYTES = json.dumps({"embedding": [0.1, 0.2, 0.3, 0.4, 0.5] * 10}).encode()
+LLM_RESPONSE_BYTES = json.dumps(
+    {
+        "content": [
+            {
+                "text": "Based on the provided policy excerpts, passwords must be at least 12 characters long (Password Policy, Page 1) and must be changed every 90 days (Password Policy, Page 2)."
+            }
+        ]
+    }
+).encode()
 
-# Now import the handler
-from src.lambda_functions.policy_search import handler
+
+@pytest.fixture(autouse=True)
+def mocked_handler(monkeypatch):
+    """Reload the handler against fresh utils mocks, which also empties its caches"""
+    mock_utils_modules(monkeypatch)
+    yield importlib.reload(handler)
 
 
 @pytest.fixture
@@ -36,7 +99,7 @@ def mock_env_variables(monkeypatch):
     monkeypatch.setenv("LLM_MODEL_ID", "test-llm-model")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def api_gateway_event():
     """Create a sample API Gateway event"""
     return {
@@ -54,7 +117,7 @@ def api_gateway_event():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_opensearch_response():
     """Create a sample OpenSearch response"""
     return {
@@ -84,49 +147,60 @@ def mock_opensearch_response():
     }
 
 
+# The response bodies are streams that can only be read once, so these
+# fixtures stay function-scoped
 @pytest.fixture
 def mock_bedrock_embedding_response():
     """Create a sample Bedrock Titan embedding response"""
-    return {
-        "body": MagicMock(
-            read=MagicMock(
-                return_value=json.dumps({"embedding": [0.1, 0.2, 0.3, 0.4, 0.5] * 10}).encode()
-            )
-        )
-    }
+    return {"body": io.BytesIO(EMBEDDING_RESPONSE_BYTES)}
 
 
 @pytest.fixture
 def mock_bedrock_llm_response():
     """Create a sample Bedrock Claude response"""
-    return {
-        "body": MagicMock(
-            read=MagicMock(
-                return_value=json.dumps(
-                    {
-                        "content": [
-                            {
-                                "text": "Based on the provided policy excerpts, passwords must be at least 12 characters long (Password Policy, Page 1) and must be changed every 90 days (Password Policy, Page 2)."
-                            }
-                        ]
-                    }
-                ).encode()
-            )
-        )
-    }
+    return {"body": io.BytesIO(LLM_RESPONSE_BYTES)}
 
 
-def test_extract_query_from_event(api_gateway_event):
+def test_extract_query_from_api_gateway_event(api_gateway_event):
     """Test extracting query from API Gateway event"""
-    query = handler.extract_query_from_event(api_gateway_event)
+    body = handler.parse_event_body(api_gateway_event)
+    query = handler.extract_query_from_body(body)
     assert query == "What is our password policy?"
 
 
-def test_extract_query_missing_query():
-    """Test extracting query when it's missing"""
-    event = {"body": json.dumps({"not_query": "test"})}
-    with pytest.raises(ValueError):
-        handler.extract_query_from_event(event)
+def test_extract_query_from_parsed_body():
+    """Test extracting the query when API Gateway delivers an already parsed body"""
+    event = {"body": {"query": "What is our password policy?"}}
+
+    body = handler.parse_event_body(event)
+    assert handler.extract_query_from_body(body) == "What is our password policy?"
+
+
+@pytest.mark.parametrize(
+    "event, message",
+    [
+        ({"body": json.dumps({"not_query": "test"})}, NO_QUERY_RE),
+        ({"body": "invalid json"}, INVALID_JSON_RE),
+        ({"not_body": "value"}, INVALID_FORMAT_RE),
+        ({"body": json.dumps(["not", "an", "object"])}, INVALID_FORMAT_RE),
+        ({"body": 42}, INVALID_FORMAT_RE),
+        ({"body": ["not", "a", "string"]}, INVALID_FORMAT_RE),
+    ],
+    ids=["missing_query", "invalid_json", "no_body", "non_object_body", "int_body", "list_body"],
+)
+def test_extract_query_invalid_event(event, message):
+    """Test parsing and query extraction with events that carry no usable query"""
+    with pytest.raises(ValueError, match=message):
+        handler.extract_query_from_body(handler.parse_event_body(event))
+
+
+@pytest.mark.parametrize("body", [42, ["query"]], ids=["int_body", "list_body"])
+def test_lambda_handler_non_string_body(body):
+    """Test that a body of the wrong type is a client error, not a server error"""
+    response = handler.lambda_handler({"httpMethod": "POST", "body": body}, {})
+
+    assert response["statusCode"] == 400
+    assert json.loads(response["body"])["error"] == "Invalid request format"
 
 
 @patch("src.utils.bedrock_utils.generate_embedding")
@@ -140,27 +214,24 @@ def test_generate_embedding(mock_generate_embedding, mock_bedrock_embedding_resp
     embedding = handler.generate_embedding("test query")
 
     # Verify the results
-    assert embedding == embedding_values
+    assert embedding.dtype == np.float32
+    np.testing.assert_allclose(embedding, embedding_values, rtol=1e-6)
     mock_generate_embedding.assert_called_once_with(
         "test query", model_id=handler.EMBEDDING_MODEL_ID
     )
 
+    # A repeated query is served from the cache without calling Bedrock again
+    np.testing.assert_allclose(
+        handler.generate_embedding("test query"), embedding_values, rtol=1e-6
+    )
+    mock_generate_embedding.assert_called_once()
+
 
 @patch("src.utils.opensearch_utils.search_opensearch")
 def test_search_opensearch(mock_search_opensearch, mock_opensearch_response):
     """Test searching OpenSearch"""
     # Set up mock for our utility function to return search results
-    hits = mock_opensearch_response["hits"]["hits"]
-    search_results = [
-        {
-            "text": hit["_source"]["text"],
-            "document_name": hit["_source"]["document_name"],
-            "page_number": hit["_source"]["page_number"],
-            "metadata": hit["_source"]["metadata"],
-            "score": hit["_score"],
-        }
-        for hit in hits
-    ]
+    search_results = normalize_hits(mock_opensearch_response["hits"]["hits"])
     mock_search_opensearch.return_value = search_results
 
     # Call the function and verify results
@@ -169,10 +240,81 @@ def test_search_opensearch(mock_search_opensearch, mock_opensearch_response):
     assert len(results) == 2
     assert results[0]["document_name"] == "Password Policy"
     assert results[0]["page_number"] == 1
-    mock_search_opensearch.assert_called_once_with([0.1, 0.2, 0.3], top_k=2)
+    mock_search_opensearch.assert_called_once_with([0.1, 0.2, 0.3], top_k=2, client=None)
+
+
+@patch("src.utils.opensearch_utils.search_opensearch")
+def test_search_opensearch_semantic_cache_hit(mock_search_opensearch):
+    """Test that near-duplicate query vectors reuse cached search results"""
+    search_results = [{"text": "Cached", "document_name": "Policy", "page_number": 1}]
+    mock_search_opensearch.return_value = search_results
+
+    handler.search_opensearch([0.1, 0.2, 0.3], top_k=2)
+
+    # A near-duplicate vector is served from the cache
+    results = handler.search_opensearch([0.1, 0.2, 0.301], top_k=2)
+    assert results == search_results
+    assert mock_search_opensearch.call_count == 1
 
+    # A dissimilar vector still goes to OpenSearch
+    handler.search_opensearch([0.3, -0.2, 0.0], top_k=2)
+    assert mock_search_opensearch.call_count == 2
 
-@patch("src.lambda_functions.policy_search.handler.extract_query_from_event")
+
+@patch("src.utils.opensearch_utils.search_opensearch")
+def test_search_opensearch_semantic_cache_expires(mock_search_opensearch):
+    """Test that cached search results are not reused after SEMANTIC_CACHE_TTL"""
+    mock_search_opensearch.return_value = [{"document_name": "Policy", "page_number": 1}]
+
+    with patch.object(handler.time, "monotonic", return_value=1000.0):
+        handler.search_opensearch([0.1, 0.2, 0.3], top_k=2)
+
+    # Still fresh just inside the TTL
+    with patch.object(handler.time, "monotonic", return_value=1000.0 + handler.SEMANTIC_CACHE_TTL):
+        handler.search_opensearch([0.1, 0.2, 0.3], top_k=2)
+    assert mock_search_opensearch.call_count == 1
+
+    # Expired entries go back to OpenSearch
+    with patch.object(handler.time, "monotonic", return_value=1001.0 + handler.SEMANTIC_CACHE_TTL):
+        handler.search_opensearch([0.1, 0.2, 0.3], top_k=2)
+    assert mock_search_opensearch.call_count == 2
+
+
+@pytest.mark.parametrize("int8", [True, False], ids=["int8", "float32"])
+@patch("src.utils.opensearch_utils.search_opensearch")
+def test_search_opensearch_semantic_cache_encoding(mock_search_opensearch, int8):
+    """Test the semantic cache with both int8 and float32 vector storage"""
+    mock_search_opensearch.return_value = [{"document_name": "Policy", "page_number": 1}]
+    query_vector = np.linspace(-1, 1, 64)
+
+    with patch.object(handler, "EMBEDDING_CACHE_INT8", int8):
+        handler.search_opensearch(query_vector.tolist(), top_k=5)
+        vector = handler._semantic_cache[0][0]
+        assert vector.dtype == (np.int8 if int8 else np.float32)
+
+        # Quantization keeps the similarity of a near-duplicate above the threshold
+        handler.search_opensearch((query_vector * 1.01 + 0.001).tolist(), top_k=5)
+
+    assert mock_search_opensearch.call_count == 1
+
+
+def test_search_opensearch_rerank_vectorized():
+    """Test that results are ordered by score and weak matches are dropped"""
+    scores = np.array([0.4, 0.9, 0.2, 0.7], dtype=np.float32)
+
+    assert handler.rerank_by_score(scores, 0.3).tolist() == [1, 3, 0]
+
+    search_results = [
+        {"document_name": f"Doc {i}", "score": float(s)} for i, s in enumerate(scores)
+    ]
+    filtered = handler.filter_search_results(search_results, min_score=0.5)
+    assert [result["document_name"] for result in filtered] == ["Doc 1", "Doc 3"]
+
+    # A zero threshold leaves the results untouched
+    assert handler.filter_search_results(search_results, min_score=0) is search_results
+
+
+@patch("src.lambda_functions.policy_search.handler.extract_query_from_body")
 @patch("src.lambda_functions.policy_search.handler.generate_embedding")
 @patch("src.lambda_functions.policy_search.handler.search_opensearch")
 @patch("src.utils.bedrock_utils.create_claude_prompt")
@@ -192,17 +334,7 @@ def test_lambda_handler_successful(
     mock_generate_embedding.return_value = [0.1, 0.2, 0.3, 0.4, 0.5]
 
     # Set up search results
-    hits = mock_opensearch_response["hits"]["hits"]
-    search_results = [
-        {
-            "text": hit["_source"]["text"],
-            "document_name": hit["_source"]["document_name"],
-            "page_number": hit["_source"]["page_number"],
-            "metadata": hit["_source"]["metadata"],
-            "score": hit["_score"],
-        }
-        for hit in hits
-    ]
+    search_results = normalize_hits(mock_opensearch_response["hits"]["hits"])
     mock_search_opensearch.return_value = search_results
 
     mock_create_claude_prompt.return_value = {"message": "test prompt"}
@@ -221,20 +353,146 @@ def test_lambda_handler_successful(
     assert len(response_body["sources"]) > 0
 
 
+@patch("src.lambda_functions.policy_search.handler.search_opensearch")
+@patch("src.lambda_functions.policy_search.handler.generate_embedding")
+@patch("src.utils.opensearch_utils.get_opensearch_client")
+@patch.object(handler, "opensearch_client", None)
+def test_lambda_handler_concurrent(
+    mock_get_opensearch_client,
+    mock_generate_embedding,
+    mock_search_opensearch,
+    api_gateway_event,
+):
+    """Test that the embedding and OpenSearch connection are prepared concurrently"""
+    # Neither call can return until both have been dispatched
+    barrier = threading.Barrier(2, timeout=5)
+    search_client = MagicMock()
+
+    def connect():
+        barrier.wait()
+        return search_client
+
+    def embed(query):
+        barrier.wait()
+        return [0.1, 0.2, 0.3]
+
+    mock_get_opensearch_client.side_effect = connect
+    mock_generate_embedding.side_effect = embed
+    mock_search_opensearch.return_value = []
+
+    response = handler.lambda_handler(api_gateway_event, {})
+
+    assert response["statusCode"] == 200
+    mock_search_opensearch.assert_called_once_with([0.1, 0.2, 0.3], top_k=5, client=search_client)
+
+
+@patch("src.lambda_functions.policy_search.handler.search_opensearch")
+@patch("src.lambda_functions.policy_search.handler.generate_embedding")
+@patch("src.utils.opensearch_utils.get_opensearch_client")
+def test_lambda_handler_reuses_opensearch_client(
+    mock_get_opensearch_client,
+    mock_generate_embedding,
+    mock_search_opensearch,
+    api_gateway_event,
+):
+    """Test that warm invocations search with the client created at import"""
+    mock_generate_embedding.return_value = [0.1, 0.2, 0.3]
+    mock_search_opensearch.return_value = []
+
+    response = handler.lambda_handler(api_gateway_event, {})
+
+    assert response["statusCode"] == 200
+    mock_get_opensearch_client.assert_not_called()
+    mock_search_opensearch.assert_called_once_with(
+        [0.1, 0.2, 0.3], top_k=5, client=handler.opensearch_client
+    )
+
+
+@patch("src.utils.opensearch_utils.msearch")
+@patch("src.utils.bedrock_utils.generate_embeddings_batch")
+def test_batch_lambda_handler(mock_generate_embeddings_batch, mock_msearch):
+    """Test that a batch of queries is embedded and searched with one call each"""
+    queries = [f"Policy question {i}" for i in range(5)]
+    event = {"httpMethod": "POST", "body": json.dumps({"queries": queries})}
+
+    # Orthogonal embeddings so no query is served from the semantic cache
+    embeddings = [[1.0 if i == j else 0.0 for j in range(5)] for i in range(5)]
+    mock_generate_embeddings_batch.return_value = embeddings
+    mock_msearch.return_value = [
+        [{"text": "Policy text", "document_name": f"Policy {i}", "page_number": 1}]
+        for i in range(5)
+    ]
+
+    with patch.object(
+        handler, "parse_event_body", wraps=handler.parse_event_body
+    ) as mock_parse_event_body:
+        response = handler.lambda_handler(event, {})
+
+    # The body is parsed once and passed down to the batch handler
+    mock_parse_event_body.assert_called_once_with(event)
+    assert response["statusCode"] == 200
+    results = json.loads(response["body"])["results"]
+    assert [result["query"] for result in results] == queries
+    assert results[3]["sources"] == [{"document_name": "Policy 3", "page_number": 1}]
+    mock_generate_embeddings_batch.assert_called_once_with(
+        queries, model_id=handler.EMBEDDING_MODEL_ID
+    )
+    mock_msearch.assert_called_once()
+    searched_embeddings = mock_msearch.call_args.args[0]
+    np.testing.assert_allclose(np.stack(searched_embeddings), embeddings)
+    assert mock_msearch.call_args.kwargs == {"top_k": 5, "client": handler.opensearch_client}
+
+
+def test_batch_lambda_handler_invalid_queries():
+    """Test that a batch request without a list of queries is rejected"""
+    event = {"body": json.dumps({"queries": "not a list"})}
+
+    response = handler.batch_lambda_handler(event, {})
+
+    assert response["statusCode"] == 400
+    assert "queries" in json.loads(response["body"])["error"]
+
+
+def test_warm_up():
+    """Test that warm-up primes both services and tolerates failures"""
+    handler.bedrock_utils.generate_embedding.side_effect = Exception("Bedrock error")
+
+    handler.warm_up()
+
+    handler.bedrock_utils.generate_embedding.assert_called_once_with(
+        "warm up", model_id=handler.EMBEDDING_MODEL_ID
+    )
+    handler.opensearch_client.transport.perform_request.assert_called_once_with(
+        "GET", f"/_plugins/_knn/warmup/{handler.OPENSEARCH_INDEX}"
+    )
+
+
+def test_warm_up_skips_knn_warmup_on_aoss():
+    """Test that warm-up only primes Bedrock against OpenSearch Serverless"""
+    with patch.object(handler, "USE_AOSS", True):
+        handler.warm_up()
+
+    handler.bedrock_utils.generate_embedding.assert_called_once()
+    handler.opensearch_client.transport.perform_request.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "initialization_type, warmed",
+    [("on-demand", False), ("provisioned-concurrency", True), ("snap-start", True)],
+)
+def test_warm_up_on_import(monkeypatch, initialization_type, warmed):
+    """Test that the module only warms up when initialized ahead of requests"""
+    monkeypatch.setenv("AWS_LAMBDA_INITIALIZATION_TYPE", initialization_type)
+
+    importlib.reload(handler)
+
+    assert handler.bedrock_utils.generate_embedding.called is warmed
+
+
 def test_format_results_for_prompt(mock_opensearch_response):
     """Test formatting search results for prompt"""
     # Create search results directly
-    hits = mock_opensearch_response["hits"]["hits"]
-    search_results = [
-        {
-            "text": hit["_source"]["text"],
-            "document_name": hit["_source"]["document_name"],
-            "page_number": hit["_source"]["page_number"],
-            "metadata": hit["_source"]["metadata"],
-            "score": hit["_score"],
-        }
-        for hit in hits
-    ]
+    search_results = normalize_hits(mock_opensearch_response["hits"]["hits"])
 
     # Test formatting
     formatted = handler.format_results_for_prompt(search_results)
@@ -247,17 +505,7 @@ def test_format_results_for_prompt(mock_opensearch_response):
 def test_extract_sources(mock_opensearch_response):
     """Test extracting sources from search results"""
     # Create search results directly
-    hits = mock_opensearch_response["hits"]["hits"]
-    search_results = [
-        {
-            "text": hit["_source"]["text"],
-            "document_name": hit["_source"]["document_name"],
-            "page_number": hit["_source"]["page_number"],
-            "metadata": hit["_source"]["metadata"],
-            "score": hit["_score"],
-        }
-        for hit in hits
-    ]
+    search_results = normalize_hits(mock_opensearch_response["hits"]["hits"])
 
     # Test source extraction
     sources = handler.extract_sources(search_results)
@@ -303,23 +551,20 @@ def test_lambda_handler_error():
     assert "error" in response_body
 
 
+@pytest.mark.parametrize(
+    "error, message",
+    [
+        (ValueError("OpenSearch client not available"), CLIENT_UNAVAILABLE_RE),
+        (Exception("Search error"), SEARCH_ERROR_RE),
+    ],
+    ids=["client_unavailable", "search_error"],
+)
 @patch("src.utils.opensearch_utils.search_opensearch")
-def test_search_opensearch_client_exception(mock_search_opensearch):
-    """Test search_opensearch when an exception occurs"""
-    # Mock an error in the utility function
-    mock_search_opensearch.side_effect = ValueError("OpenSearch client not available")
-
-    with pytest.raises(ValueError, match="OpenSearch client not available"):
-        handler.search_opensearch(query_embedding=[0.1, 0.2, 0.3])
-
-
-@patch("src.utils.opensearch_utils.search_opensearch")
-def test_search_opensearch_error(mock_search_opensearch):
-    """Test search_opensearch when an error occurs"""
-    # Mock an error in OpenSearch search
-    mock_search_opensearch.side_effect = Exception("Search error")
+def test_search_opensearch_error(mock_search_opensearch, error, message):
+    """Test that search_opensearch propagates errors from the utility function"""
+    mock_search_opensearch.side_effect = error
 
-    with pytest.raises(Exception, match="Search error"):
+    with pytest.raises(type(error), match=message):
         handler.search_opensearch(query_embedding=[0.1, 0.2, 0.3])
 
 
@@ -329,7 +574,7 @@ def test_generate_embedding_error(mock_generate_embedding):
     # Mock an error in Bedrock embedding generation
     mock_generate_embedding.side_effect = Exception("Bedrock error")
 
-    with pytest.raises(Exception, match="Bedrock error"):
+    with pytest.raises(Exception, match=BEDROCK_ERROR_RE):
         handler.generate_embedding(text="test query")
 
 
@@ -354,11 +599,11 @@ def test_generate_llm_response_error(mock_generate_llm_response):
     # Mock an error
     mock_generate_llm_response.side_effect = Exception("Bedrock error")
 
-    with pytest.raises(Exception, match="Bedrock error"):
+    with pytest.raises(Exception, match=BEDROCK_ERROR_RE):
         handler.bedrock_utils.generate_llm_response({"prompt": "test"})
 
 
-@patch("src.lambda_functions.policy_search.handler.extract_query_from_event")
+@patch("src.lambda_functions.policy_search.handler.extract_query_from_body")
 def test_lambda_handler_system_error(mock_extract_query, api_gateway_event):
     """Test lambda_handler when a system error occurs"""
     # Mock an error
@@ -373,22 +618,6 @@ def test_lambda_handler_system_error(mock_extract_query, api_gateway_event):
     assert "error" in response_body
 
 
-def test_extract_query_invalid_json():
-    """Test extract_query_from_event with invalid JSON"""
-    event = {"body": "invalid json"}
-
-    with pytest.raises(ValueError, match="Invalid JSON in request body"):
-        handler.extract_query_from_event(event)
-
-
-def test_extract_query_no_body():
-    """Test extract_query_from_event with no body"""
-    event = {"not_body": "value"}
-
-    with pytest.raises(ValueError, match="Invalid request format"):
-        handler.extract_query_from_event(event)
-
-
 def test_lambda_handler_with_options_method():
     """Test lambda_handler with OPTIONS method for CORS preflight request"""
     event = {"httpMethod": "OPTIONS", "headers": {"Origin": "http://example.com"}}
@@ -424,6 +653,21 @@ def test_duplicate_sources_are_removed():
     assert sources[1]["page_number"] == 2
 
 
+def test_format_results_layout():
+    """Test the exact layout of the formatted prompt sections"""
+    results = [
+        {"document_name": "Doc A", "page_number": 1, "text": " First excerpt "},
+        {"document_name": "Doc B", "page_number": "2-3", "text": "Second excerpt"},
+    ]
+
+    formatted = handler.format_results_for_prompt(results)
+
+    assert formatted == (
+        "[Document 1: Doc A, Page 1]\nFirst excerpt\n\n"
+        "[Document 2: Doc B, Page 2-3]\nSecond excerpt\n\n"
+    )
+
+
 def test_format_results_with_empty_list():
     """Test formatting an empty results list"""
     formatted = handler.format_results_for_prompt([])
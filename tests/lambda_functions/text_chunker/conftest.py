@@ -0,0 +1,43 @@
+# Install the module stubs the text_chunker handler imports, once per session,
+# before the test module imports the handler
+import sys
+import types
+from unittest import mock
+
+import pytest
+
+
+class RecursiveCharacterTextSplitterStub:
+    """
+    Minimal stand-in for langchain's splitter. It cuts the text into fixed-width
+    windows of chunk_size characters that overlap by chunk_overlap characters,
+    which is the layout chunk_text assumes when it maps chunks back to pages.
+    """
+
+    def __init__(self, chunk_size=1000, chunk_overlap=200, **kwargs):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split_text(self, text):
+        step = self.chunk_size - self.chunk_overlap
+        starts = range(0, max(len(text) - self.chunk_overlap, 1), step)
+        return [text[start : start + self.chunk_size] for start in starts]
+
+
+# Stub the langchain text splitters module
+langchain_text_splitters_stub = types.ModuleType("langchain_text_splitters")
+langchain_text_splitters_stub.RecursiveCharacterTextSplitter = RecursiveCharacterTextSplitterStub
+sys.modules["langchain_text_splitters"] = langchain_text_splitters_stub
+
+# Mock the tracking_utils module
+tracking_utils_mock = mock.MagicMock()
+tracking_utils_mock.initialize_document_tracking.return_value = "test-document-id"
+
+
+@pytest.fixture(autouse=True)
+def tracking_utils():
+    """Patch the handler's tracking_utils with the mock, leaving the real module importable"""
+    from src.lambda_functions.text_chunker import handler
+
+    with mock.patch.object(handler, "tracking_utils", tracking_utils_mock):
+        yield tracking_utils_mock
@@ -1,30 +1,21 @@
+import io
 import json
-import unittest
 from unittest import mock
-from datetime import datetime
-import boto3
-from botocore.stub import Stubber
+from botocore.exceptions import ClientError
 import os
-import sys
-
-# Mock the langchain modules
-sys.modules["langchain"] = mock.MagicMock()
-sys.modules["langchain_text_splitters"] = mock.MagicMock()
-RecursiveCharacterTextSplitterMock = mock.MagicMock()
-RecursiveCharacterTextSplitterMock.return_value.split_text.return_value = [
-    "This is chunk 1.",
-]
-sys.modules[
-    "langchain_text_splitters"
-].RecursiveCharacterTextSplitter = RecursiveCharacterTextSplitterMock
-
-# Mock the tracking_utils module
-tracking_utils_mock = mock.MagicMock()
-tracking_utils_mock.initialize_document_tracking.return_value = "test-document-id"
-sys.modules["src.utils.tracking_utils"] = tracking_utils_mock
-sys.modules["utils.tracking_utils"] = tracking_utils_mock
-
-# Import the Lambda handler
+import numpy as np
+import pytest
+
+from tests._fixtures import head_object_response, s3_event
+
+# Optional C-accelerated JSON parser for the Body matchers, falling back to the stdlib
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Import the Lambda handler; conftest.py has already stubbed its dependencies
+from src.lambda_functions.text_chunker import handler
 from src.lambda_functions.text_chunker.handler import (
     lambda_handler,
     process_text_file,
@@ -35,40 +26,12 @@ from src.lambda_functions.text_chunker.handler import (
     CHUNK_OVERLAP,
 )
 
+# Sample text file content, encoded once for all tests
+SAMPLE_TEXT_BYTES = b"This is a sample text document for testing the chunking process."
 
-class TestTextChunkerHandler(unittest.TestCase):
-    """
-    Test cases for the text_chunker Lambda function.
-    """
-
-    def setUp(self):
-        """
-        Set up test fixtures before each test.
-        """
-        # Create a mock S3 client
-        self.s3_client = boto3.client("s3", region_name="us-east-1")
-        self.s3_stubber = Stubber(self.s3_client)
-
-        # Create patchers for the boto3 clients within the handler module
-        self.s3_client_patch = mock.patch(
-            "src.lambda_functions.text_chunker.handler.s3_client", self.s3_client
-        )
-
-        self.s3_client_patch.start()
-
-    def tearDown(self):
-        """
-        Clean up resources after each test.
-        """
-        # Stop the patchers
-        self.s3_client_patch.stop()
-
-    def test_chunk_text(self):
-        """
-        Test the chunk_text function.
-        """
-        # Define test data with page delimiters
-        test_text = """
+# Texts with page delimiters for test_chunk_text, covering multiple pages, a single
+# short page and multibyte UTF-8 content
+PAGED_TEXT = """
 --- PAGE 1 ---
 This is a test document. It has multiple sentences and should be split into chunks.
 
@@ -77,358 +40,258 @@ This is a second paragraph. It provides more text to ensure we have enough conte
 
 --- PAGE 3 ---
 This is the third paragraph with even more text to make sure we get several chunks from the text splitter."""
+SHORT_TEXT = """
+--- PAGE 1 ---
+Short."""
+CJK_TEXT = """
+--- PAGE 1 ---
+これはテスト文書です。複数の文があります。
 
-        metadata = {
-            "source_bucket": "test-bucket",
-            "source_key": "test.txt",
-            "filename": "test.txt",
-        }
+--- PAGE 2 ---
+这是第二页。它包含更多的文本。"""
 
-        # Call the function
-        chunks = chunk_text(test_text, metadata)
-
-        # Verify the result
-        self.assertIsInstance(chunks, list)
-        self.assertGreater(len(chunks), 0)
-
-        # Check each chunk has the expected properties
-        for i, chunk in enumerate(chunks):
-            self.assertEqual(chunk["chunk_id"], i)
-            self.assertEqual(chunk["total_chunks"], len(chunks))
-            self.assertIn("text", chunk)
-            self.assertIn("chunk_size", chunk)
-            self.assertEqual(chunk["chunk_size"], len(chunk["text"]))
-            self.assertIn("metadata", chunk)
-            self.assertEqual(chunk["metadata"]["source_bucket"], "test-bucket")
-
-            # Check for page information
-            self.assertIn("pages", chunk)
-            self.assertIn("start_page", chunk)
-            self.assertIn("end_page", chunk)
-            self.assertIsInstance(chunk["pages"], list)
-            self.assertGreaterEqual(chunk["start_page"], 1)
-            self.assertLessEqual(chunk["end_page"], 3)
-
-            # Verify page information is also in metadata
-            self.assertIn("pages", chunk["metadata"])
-            self.assertIn("start_page", chunk["metadata"])
-            self.assertIn("end_page", chunk["metadata"])
-
-    def test_process_text_file(self):
-        """
-        Test the process_text_file function.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.txt"
-        content_length = 1234
-        last_modified = datetime.now()
-        text_content = "This is a sample text document for testing the chunking process."
-
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "text/plain",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the get_object method
-        self.s3_stubber.add_response(
-            "get_object",
-            {
-                "Body": mock.MagicMock(read=lambda: text_content.encode("utf-8")),
-                "ContentType": "text/plain",
-                "ContentLength": len(text_content),
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the put_object method for saving all three chunks
-        filename_without_ext = "sample"
-
-        # Add response for the one chunk that our mock will create
-        chunk_key = f"{CHUNKED_TEXT_PREFIX}/{filename_without_ext}/chunk_0.json"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": CHUNKED_TEXT_BUCKET,
-                "Key": chunk_key,
-                "Body": mock.ANY,
-                "ContentType": "application/json",
-            },
-        )
-
-        # Second put_object for the same chunk with document_id added by tracking
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": CHUNKED_TEXT_BUCKET,
-                "Key": chunk_key,
-                "Body": mock.ANY,
-                "ContentType": "application/json",
-            },
-        )
-
-        # Stub the put_object method for saving the manifest
-        manifest_key = f"{CHUNKED_TEXT_PREFIX}/{filename_without_ext}/manifest.json"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": CHUNKED_TEXT_BUCKET,
-                "Key": manifest_key,
-                "Body": mock.ANY,
-                "ContentType": "application/json",
-            },
-        )
-
-        # Activate the stubber
-        self.s3_stubber.activate()
-
-        # Call the function
-        result = process_text_file(bucket_name, file_key)
-
-        # Verify the result
-        self.assertEqual(result["source"]["bucket"], bucket_name)
-        self.assertEqual(result["source"]["file_key"], file_key)
-        self.assertEqual(result["status"], "success")
-
-        # Verify output information
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], CHUNKED_TEXT_BUCKET)
-        self.assertEqual(result["output"]["manifest_key"], manifest_key)
-        self.assertEqual(
-            result["output"]["total_chunks"], 1
-        )  # We expect exactly 1 chunk from our mock
-
-        # Verify that the stubber was used correctly
-        self.s3_stubber.assert_no_pending_responses()
-
-    def test_lambda_handler_with_valid_event(self):
-        """
-        Test the lambda_handler function with a valid S3 event.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.txt"
-        content_length = 1234
-        last_modified = datetime.now()
-        text_content = "This is a sample text document for testing the chunking process."
-
-        # Create a mock S3 event
-        event = {
-            "Records": [
-                {
-                    "eventSource": "aws:s3",
-                    "s3": {"bucket": {"name": bucket_name}, "object": {"key": file_key}},
-                }
-            ]
-        }
+# Canned S3 responses shared by the tests that process a text file
+HEAD_OBJECT_RESPONSE = head_object_response()
+PUT_OBJECT_PARAMS = {
+    "Bucket": CHUNKED_TEXT_BUCKET,
+    "ContentType": "application/json",
+}
 
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "text/plain",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the get_object method
-        self.s3_stubber.add_response(
-            "get_object",
-            {
-                "Body": mock.MagicMock(read=lambda: text_content.encode("utf-8")),
-                "ContentType": "text/plain",
-                "ContentLength": len(text_content),
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the put_object method for saving all three chunks
-        filename_without_ext = "sample"
-
-        # Add response for the one chunk that our mock will create
-        chunk_key = f"{CHUNKED_TEXT_PREFIX}/{filename_without_ext}/chunk_0.json"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": CHUNKED_TEXT_BUCKET,
-                "Key": chunk_key,
-                "Body": mock.ANY,
-                "ContentType": "application/json",
-            },
-        )
-
-        # Second put_object for the same chunk with document_id added by tracking
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": CHUNKED_TEXT_BUCKET,
-                "Key": chunk_key,
-                "Body": mock.ANY,
-                "ContentType": "application/json",
-            },
-        )
-
-        # Stub the put_object method for saving the manifest
-        manifest_key = f"{CHUNKED_TEXT_PREFIX}/{filename_without_ext}/manifest.json"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": CHUNKED_TEXT_BUCKET,
-                "Key": manifest_key,
-                "Body": mock.ANY,
-                "ContentType": "application/json",
-            },
-        )
-
-        # Activate the stubber
-        self.s3_stubber.activate()
-
-        # Call the lambda handler
-        response = lambda_handler(event, {})
-
-        # Verify the response
-        self.assertEqual(response["statusCode"], 200)
-        self.assertIn("message", response["body"])
-        self.assertIn("results", response["body"])
-        self.assertEqual(len(response["body"]["results"]), 1)
-
-        # Verify the saved output details
-        result = response["body"]["results"][0]
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], CHUNKED_TEXT_BUCKET)
-
-        # Verify that the stubber was used correctly
-        self.s3_stubber.assert_no_pending_responses()
-
-    def test_lambda_handler_with_non_text_file(self):
-        """
-        Test the lambda_handler function with a non-text file.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-
-        # Create a mock S3 event
-        event = {
-            "Records": [
-                {
-                    "eventSource": "aws:s3",
-                    "s3": {"bucket": {"name": bucket_name}, "object": {"key": file_key}},
-                }
-            ]
-        }
 
-        # Call the lambda handler (should skip non-text files)
-        response = lambda_handler(event, {})
-
-        # Verify the response
-        self.assertEqual(response["statusCode"], 200)
-        self.assertIn("message", response["body"])
-        self.assertIn("results", response["body"])
-        self.assertEqual(len(response["body"]["results"]), 0)
-
-    def test_lambda_handler_with_no_records(self):
-        """
-        Test the lambda_handler function with an event that has no records.
-        """
-        # Create a mock S3 event with no records
-        event = {"Records": []}
-
-        # Call the lambda handler
-        response = lambda_handler(event, {})
-
-        # Verify the response
-        self.assertEqual(response["statusCode"], 200)
-        self.assertIn("message", response["body"])
-        self.assertIn("results", response["body"])
-        self.assertEqual(len(response["body"]["results"]), 0)
-
-    def test_process_text_file_exception(self):
-        """
-        Test the process_text_file function when an exception occurs.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.txt"
-
-        # Make the S3 client raise an exception when head_object is called
-        self.s3_stubber.add_client_error(
-            "head_object",
-            service_error_code="NoSuchKey",
-            service_message="The specified key does not exist.",
-            http_status_code=404,
-            expected_params={"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Activate the stubber
-        self.s3_stubber.activate()
-
-        # Patch the logger to prevent error messages from showing in test output
-        with mock.patch("src.lambda_functions.text_chunker.handler.logger.error"):
-            # Call the function and expect an exception
-            with self.assertRaises(Exception):
-                process_text_file(bucket_name, file_key)
-
-        # Verify that the stubber was used correctly
-        self.s3_stubber.assert_no_pending_responses()
-
-    def test_lambda_handler_with_exception(self):
-        """
-        Test the lambda_handler function when an exception occurs.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.txt"
-
-        # Create a mock S3 event
-        event = {
-            "Records": [
-                {
-                    "eventSource": "aws:s3",
-                    "s3": {"bucket": {"name": bucket_name}, "object": {"key": file_key}},
-                }
-            ]
+class JsonBodyMatches:
+    """
+    Matcher for a JSON put_object Body that parses it and checks for the given top-level keys.
+    """
+
+    def __init__(self, *keys):
+        self.keys = keys
+
+    def __eq__(self, other):
+        try:
+            body = json_loads(other)
+        except ValueError:
+            return False
+        return isinstance(body, dict) and all(key in body for key in self.keys)
+
+    def __repr__(self):
+        return f"JsonBodyMatches{self.keys}"
+
+
+CHUNK_BODY = JsonBodyMatches("chunk_id", "total_chunks", "text", "chunk_size", "metadata")
+MANIFEST_BODY = JsonBodyMatches("source", "chunking", "output", "tracking")
+
+BUCKET_NAME = "test-bucket"
+
+# Error raised by head_object when the file does not exist
+NO_SUCH_KEY_ERROR = ClientError(
+    {"Error": {"Code": "NoSuchKey", "Message": "The specified key does not exist."}},
+    "HeadObject",
+)
+
+
+class FakeS3:
+    """
+    Minimal S3 client implementing only the calls the chunker makes.
+
+    Each call is recorded in ``calls`` as a (method, params) tuple so tests can
+    assert on the exact sequence of requests.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.head_object_error = None
+
+    def head_object(self, **kwargs):
+        self.calls.append(("head_object", kwargs))
+        if self.head_object_error:
+            raise self.head_object_error
+        return HEAD_OBJECT_RESPONSE
+
+    def get_object(self, **kwargs):
+        self.calls.append(("get_object", kwargs))
+        return {
+            "Body": io.BytesIO(SAMPLE_TEXT_BYTES),
+            "ContentType": "text/plain",
+            "ContentLength": len(SAMPLE_TEXT_BYTES),
         }
 
-        # Make the S3 client raise an exception when head_object is called
-        self.s3_stubber.add_client_error(
-            "head_object",
-            service_error_code="NoSuchKey",
-            service_message="The specified key does not exist.",
-            http_status_code=404,
-            expected_params={"Bucket": bucket_name, "Key": file_key},
-        )
+    def put_object(self, **kwargs):
+        self.calls.append(("put_object", kwargs))
+        return {}
+
+
+def expected_text_file_calls(bucket_name, file_key):
+    """
+    Build the S3 calls made while successfully chunking a text file into one chunk.
+
+    Returns:
+        tuple: The expected (method, params) calls and the manifest key
+    """
+    object_params = {"Bucket": bucket_name, "Key": file_key}
+    filename_without_ext = os.path.splitext(os.path.basename(file_key))[0]
+    chunk_key = f"{CHUNKED_TEXT_PREFIX}/{filename_without_ext}/chunk_0.json"
+    manifest_key = f"{CHUNKED_TEXT_PREFIX}/{filename_without_ext}/manifest.json"
+
+    calls = [("head_object", object_params), ("get_object", object_params)]
+
+    # The chunk is written twice: once when saved and again with the tracking
+    # document_id added, followed by the manifest
+    for key, body in (
+        (chunk_key, CHUNK_BODY),
+        (chunk_key, CHUNK_BODY),
+        (manifest_key, MANIFEST_BODY),
+    ):
+        calls.append(("put_object", {**PUT_OBJECT_PARAMS, "Key": key, "Body": body}))
+
+    return calls, manifest_key
 
-        # Activate the stubber
-        self.s3_stubber.activate()
 
-        # Patch the loggers to prevent error messages from showing in test output
-        with mock.patch("src.lambda_functions.text_chunker.handler.logger.error"):
-            # Call the lambda handler
-            response = lambda_handler(event, {})
+@pytest.fixture
+def s3():
+    """Patch a fresh FakeS3 into the handler"""
+    fake_s3 = FakeS3()
+    with mock.patch.object(handler, "s3_client", fake_s3):
+        yield fake_s3
 
-        # Verify the response
-        self.assertEqual(response["statusCode"], 500)
-        self.assertIn("message", response["body"])
-        self.assertIn("Error processing text files", response["body"]["message"])
 
-        # Verify that the stubber was used correctly
-        self.s3_stubber.assert_no_pending_responses()
+@pytest.mark.parametrize(
+    "text, page_count",
+    [(PAGED_TEXT, 3), (SHORT_TEXT, 1), (CJK_TEXT, 2)],
+    ids=["paged", "short", "cjk"],
+)
+def test_chunk_text(text, page_count):
+    """Test the chunk_text function"""
+    metadata = {
+        "source_bucket": "test-bucket",
+        "source_key": "test.txt",
+        "filename": "test.txt",
+    }
+
+    # Small chunks so the longer texts are split across several chunks and pages
+    with mock.patch.object(handler, "CHUNK_SIZE", 40), mock.patch.object(
+        handler, "CHUNK_OVERLAP", 10
+    ):
+        chunks = chunk_text(text, metadata)
+
+    # Verify the result
+    assert isinstance(chunks, list)
+    assert len(chunks) > 0
+
+    # The chunks cover the whole text, and together they span every page
+    cleaned_text, _ = handler.parse_page_info(text)
+    assert "".join(chunk["text"][10 if i else 0 :] for i, chunk in enumerate(chunks)) == (
+        cleaned_text
+    )
+    assert chunks[0]["start_page"] == 1
+    assert chunks[-1]["end_page"] == page_count
+    assert sorted({page for chunk in chunks for page in chunk["pages"]}) == list(
+        range(1, page_count + 1)
+    )
+
+    # Check every chunk's size matches its text length in a single comparison
+    sizes = np.fromiter((chunk["chunk_size"] for chunk in chunks), dtype=np.int64)
+    lengths = np.fromiter((len(chunk["text"]) for chunk in chunks), dtype=np.int64)
+    assert np.array_equal(sizes, lengths)
+
+    # Check each chunk has the expected properties
+    for i, chunk in enumerate(chunks):
+        assert chunk["chunk_id"] == i
+        assert chunk["total_chunks"] == len(chunks)
+        assert "metadata" in chunk
+        assert chunk["metadata"]["source_bucket"] == "test-bucket"
+
+        # Check for page information
+        assert "pages" in chunk
+        assert "start_page" in chunk
+        assert "end_page" in chunk
+        assert isinstance(chunk["pages"], list)
+        assert chunk["start_page"] >= 1
+        assert chunk["end_page"] <= page_count
+
+        # Verify page information is also in metadata
+        assert "pages" in chunk["metadata"]
+        assert "start_page" in chunk["metadata"]
+        assert "end_page" in chunk["metadata"]
+
+
+def test_process_text_file(s3):
+    """Test the process_text_file function"""
+    file_key = "sample.txt"
+    expected_calls, manifest_key = expected_text_file_calls(BUCKET_NAME, file_key)
+
+    # Call the function
+    result = process_text_file(BUCKET_NAME, file_key)
+
+    # Verify the result
+    assert result["source"]["bucket"] == BUCKET_NAME
+    assert result["source"]["file_key"] == file_key
+    assert result["status"] == "success"
+
+    # Verify output information
+    assert "output" in result
+    assert result["output"]["bucket"] == CHUNKED_TEXT_BUCKET
+    assert result["output"]["manifest_key"] == manifest_key
+    assert result["output"]["total_chunks"] == 1  # We expect exactly 1 chunk from our mock
+
+    # Verify the S3 calls
+    assert s3.calls == expected_calls
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        s3_event(BUCKET_NAME, "sample.pdf"),
+        s3_event(BUCKET_NAME, "sample.docx"),
+        {"Records": []},
+        {"Records": [{"eventSource": "aws:sqs"}]},
+    ],
+    ids=["pdf_file", "docx_file", "no_records", "non_s3_record"],
+)
+def test_lambda_handler_skips_events(s3, event):
+    """Test the lambda_handler function skips records that are not S3 text files"""
+    response = lambda_handler(event, {})
+
+    # Verify nothing was processed
+    assert response["statusCode"] == 200
+    assert response["body"]["results"] == []
 
+    # Verify S3 was never touched
+    assert s3.calls == []
 
-if __name__ == "__main__":
-    unittest.main()
+
+@pytest.mark.parametrize(
+    "error, expected_status",
+    [(None, 200), (NO_SUCH_KEY_ERROR, 500)],
+    ids=["valid_text_file", "missing_file"],
+)
+def test_lambda_handler_with_text_file(s3, error, expected_status):
+    """Test the lambda_handler function with a text file that is chunked or missing"""
+    s3.head_object_error = error
+
+    # Patch the logger to prevent error messages from showing in test output
+    with mock.patch.object(handler.logger, "error"):
+        response = lambda_handler(s3_event(BUCKET_NAME, "sample.txt"), {})
+
+    # Verify the response
+    assert response["statusCode"] == expected_status
+    assert "message" in response["body"]
+    if error:
+        assert "Error processing text files" in response["body"]["message"]
+    else:
+        results = response["body"]["results"]
+        assert len(results) == 1
+        assert results[0]["output"]["bucket"] == CHUNKED_TEXT_BUCKET
+
+
+def test_process_text_file_exception(s3):
+    """Test the process_text_file function when an exception occurs"""
+    s3.head_object_error = NO_SUCH_KEY_ERROR
+
+    # Patch the logger to prevent error messages from showing in test output
+    with mock.patch.object(handler.logger, "error"):
+        # Call the function and expect an exception
+        with pytest.raises(Exception):
+            process_text_file(BUCKET_NAME, "sample.txt")
+
+    # Verify processing stopped at the failed head_object call
+    assert s3.calls == [("head_object", {"Bucket": BUCKET_NAME, "Key": "sample.txt"})]
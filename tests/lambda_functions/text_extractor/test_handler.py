@@ -1,1547 +1,792 @@
-import json
-import unittest
+import contextlib
+from functools import lru_cache
+from types import MappingProxyType, SimpleNamespace
 from unittest import mock
-from datetime import datetime
-import boto3
-from botocore.stub import Stubber
-import os
+from botocore.exceptions import ClientError
+import pytest
+
+from tests._fixtures import s3_event
+
+# moto is only a dev dependency; skip this module where it isn't installed
+mock_s3 = pytest.importorskip("moto").mock_s3
 
 # Import the Lambda handler
+from src.lambda_functions.text_extractor import handler
 from src.lambda_functions.text_extractor.handler import (
     lambda_handler,
     extract_text_from_pdf,
     process_document_async,
+    TextractJobFailedException,
+    TEXTRACT_POLL_MAX_DELAY,
+    TEXTRACT_POLL_TIMEOUT,
     EXTRACTED_TEXT_BUCKET,
     EXTRACTED_TEXT_PREFIX,
-    DELETE_ORIGINAL_PDF,
 )
 
+BUCKET_NAME = "test-bucket"
 
-class TestTextExtractorHandler(unittest.TestCase):
-    """
-    Test cases for the text_extractor Lambda function.
+# The sample PDF most tests extract, and the text its Textract job returns
+SAMPLE_PDF_KEY = "sample.pdf"
+SAMPLE_PDF_SIZE = 12345
+SAMPLE_JOB_ID = "test-job-id"
+SAMPLE_TEXT = "Sample text from PDF."
+
+# Read-only Textract job status responses, built once and shared by the tests
+JOB_IN_PROGRESS_RESPONSE = MappingProxyType({"JobStatus": "IN_PROGRESS"})
+JOB_FAILED_RESPONSE = MappingProxyType({"JobStatus": "FAILED"})
+
+
+# The only block fields the handler reads; tests add the Text and any later Page
+LINE_BLOCK = MappingProxyType({"BlockType": "LINE", "Page": 1})
+
+
+@lru_cache(maxsize=None)
+def job_succeeded_response(page_count):
     """
+    Build the read-only job status response for a finished job, once per page count.
 
-    def setUp(self):
-        """
-        Set up test fixtures before each test.
-        """
-        # Create a mock S3 client
-        self.s3_client = boto3.client("s3", region_name="us-east-1")
-        self.s3_stubber = Stubber(self.s3_client)
-
-        # Create a mock Textract client
-        self.textract_client = boto3.client("textract", region_name="us-east-1")
-        self.textract_stubber = Stubber(self.textract_client)
-
-        # Create patchers for the boto3 clients within the handler module
-        self.s3_client_patch = mock.patch(
-            "src.lambda_functions.text_extractor.handler.s3_client", self.s3_client
-        )
-        self.textract_client_patch = mock.patch(
-            "src.lambda_functions.text_extractor.handler.textract_client", self.textract_client
-        )
-
-        self.s3_client_patch.start()
-        self.textract_client_patch.start()
-
-    def tearDown(self):
-        """
-        Clean up resources after each test.
-        """
-        # Stop the patchers
-        self.s3_client_patch.stop()
-        self.textract_client_patch.stop()
-
-    def test_extract_text_from_pdf(self):
-        """
-        Test the extract_text_from_pdf function.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-        content_length = 12345
-        last_modified = datetime.now()
-        job_id = "test-job-id"
-        extracted_text = "Sample text from PDF."
-
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "application/pdf",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the async Textract API responses
-        # 1. Start async job
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
+    Returns:
+        MappingProxyType: The job status response
+    """
+    return MappingProxyType(
+        {"JobStatus": "SUCCEEDED", "DocumentMetadata": MappingProxyType({"Pages": page_count})}
+    )
 
-        # 2. Check job status
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}},
-            {"JobId": job_id},
-        )
 
-        # 3. Get results
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 1},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": extracted_text,
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-            },
-            {"JobId": job_id},
-        )
-
-        # Stub the put_object method for saving the extracted text
-        txt_filename = "sample.txt"
-        target_key = f"{EXTRACTED_TEXT_PREFIX}/{txt_filename}"
-        page_delimited_text = f"\n--- PAGE 1 ---\n{extracted_text}\n"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": EXTRACTED_TEXT_BUCKET,
-                "Key": target_key,
-                "Body": page_delimited_text,
-                "ContentType": "text/plain",
-            },
-        )
-
-        # Stub the delete_object method for the original PDF if DELETE_ORIGINAL_PDF is True
-        if DELETE_ORIGINAL_PDF:
-            self.s3_stubber.add_response(
-                "delete_object",
-                {},
-                {"Bucket": bucket_name, "Key": file_key},
-            )
-
-        # Activate the stubbers
-        self.s3_stubber.activate()
-        self.textract_stubber.activate()
+@lru_cache(maxsize=None)
+def job_results_response(text, page_count=1):
+    """
+    Build the read-only results response for a finished job with a single line of
+    text on page 1, once per text and page count.
 
-        # Call the function
-        result = extract_text_from_pdf(bucket_name, file_key)
-
-        # Verify the result
-        self.assertEqual(result["source"]["bucket"], bucket_name)
-        self.assertEqual(result["source"]["file_key"], file_key)
-        self.assertEqual(result["source"]["size_bytes"], content_length)
-        self.assertIn("extracted_text", result)
-        self.assertIn("Sample text from PDF.", result["extracted_text"])
-        self.assertEqual(result["status"], "success")
-
-        # Verify output information
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], EXTRACTED_TEXT_BUCKET)
-        self.assertEqual(result["output"]["file_key"], target_key)
-        self.assertEqual(result["output"]["content_type"], "text/plain")
-
-        # Verify deletion status
-        # After the update, original_deleted is based on actual deletion verification
-        # rather than just the environment setting
-        self.assertIn("original_deleted", result)
-
-        # Verify that the stubbers were used correctly
-        self.s3_stubber.assert_no_pending_responses()
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_lambda_handler_with_valid_event(self):
-        """
-        Test the lambda_handler function with a valid S3 event.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-        content_length = 12345
-        last_modified = datetime.now()
-        job_id = "test-job-id"
-        extracted_text = "Sample text from PDF."
-
-        # Create a mock S3 event
-        event = {
-            "Records": [
-                {
-                    "eventSource": "aws:s3",
-                    "s3": {"bucket": {"name": bucket_name}, "object": {"key": file_key}},
-                }
-            ]
+    Returns:
+        MappingProxyType: The results response
+    """
+    return MappingProxyType(
+        {
+            "JobStatus": "SUCCEEDED",
+            "DocumentMetadata": MappingProxyType({"Pages": page_count}),
+            "Blocks": (MappingProxyType({**LINE_BLOCK, "Text": text}),),
         }
+    )
 
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "application/pdf",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the async Textract API responses
-        # 1. Start async job
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
 
-        # 2. Check job status
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}},
-            {"JobId": job_id},
-        )
+def page_delimited_text(*pages):
+    """
+    Build the text the handler extracts from one line of text per page.
 
-        # 3. Get results
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 1},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": extracted_text,
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-            },
-            {"JobId": job_id},
-        )
-
-        # Stub the put_object method for saving the extracted text
-        txt_filename = "sample.txt"
-        target_key = f"{EXTRACTED_TEXT_PREFIX}/{txt_filename}"
-        page_delimited_text = f"\n--- PAGE 1 ---\n{extracted_text}\n"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": EXTRACTED_TEXT_BUCKET,
-                "Key": target_key,
-                "Body": page_delimited_text,
-                "ContentType": "text/plain",
-            },
-        )
-
-        # Stub the delete_object method for the original PDF if DELETE_ORIGINAL_PDF is True
-        if DELETE_ORIGINAL_PDF:
-            self.s3_stubber.add_response(
-                "delete_object",
-                {},
-                {"Bucket": bucket_name, "Key": file_key},
-            )
-
-        # Activate the stubbers
-        self.s3_stubber.activate()
-        self.textract_stubber.activate()
+    Returns:
+        str: The page-delimited text
+    """
+    return "".join(f"\n--- PAGE {page_num} ---\n{text}\n" for page_num, text in enumerate(pages, 1))
 
-        # Call the lambda handler
-        response = lambda_handler(event, {})
 
-        # Verify the response
-        self.assertEqual(response["statusCode"], 200)
-        self.assertIn("message", response["body"])
-        self.assertIn("results", response["body"])
-        self.assertEqual(len(response["body"]["results"]), 1)
-
-        # Verify the saved output details
-        result = response["body"]["results"][0]
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], EXTRACTED_TEXT_BUCKET)
-        self.assertEqual(result["output"]["file_key"], target_key)
-
-        # Verify deletion status
-        # After the update, original_deleted is based on actual deletion verification
-        # rather than just the environment setting
-        self.assertIn("original_deleted", result)
-
-        # Verify that the stubbers were used correctly
-        self.s3_stubber.assert_no_pending_responses()
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_lambda_handler_with_non_pdf_file(self):
-        """
-        Test the lambda_handler function with a non-PDF file.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.txt"
-
-        # Create a mock S3 event
-        event = {
-            "Records": [
-                {
-                    "eventSource": "aws:s3",
-                    "s3": {"bucket": {"name": bucket_name}, "object": {"key": file_key}},
-                }
-            ]
-        }
+# The text the handler saves for the sample PDF
+SAMPLE_PAGE_TEXT = page_delimited_text(SAMPLE_TEXT)
 
-        # Call the lambda handler
-        response = lambda_handler(event, {})
 
-        # Verify the response
-        self.assertEqual(response["statusCode"], 200)
-        self.assertIn("message", response["body"])
-        self.assertIn("results", response["body"])
-        self.assertEqual(len(response["body"]["results"]), 0)
+def s3_error(code, message, operation_name):
+    """
+    Build the ClientError S3 raises for an error code.
 
-    def test_lambda_handler_with_no_records(self):
-        """
-        Test the lambda_handler function with an event that has no records.
-        """
-        # Create a mock S3 event with no records
-        event = {"Records": []}
+    Returns:
+        ClientError: The S3 error
+    """
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation_name)
 
-        # Call the lambda handler
-        response = lambda_handler(event, {})
 
-        # Verify the response
-        self.assertEqual(response["statusCode"], 200)
-        self.assertIn("message", response["body"])
-        self.assertIn("results", response["body"])
-        self.assertEqual(len(response["body"]["results"]), 0)
-
-    def test_extract_text_from_pdf_exception(self):
-        """
-        Test the extract_text_from_pdf function when an exception occurs.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-
-        # Make the S3 client raise an exception when head_object is called
-        self.s3_stubber.add_client_error(
-            "head_object",
-            service_error_code="NoSuchKey",
-            service_message="The specified key does not exist.",
-            http_status_code=404,
-            expected_params={"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Activate the stubber
-        self.s3_stubber.activate()
-
-        # Call the function and expect an exception
-        with self.assertRaises(Exception):
-            extract_text_from_pdf(bucket_name, file_key)
-
-        # Verify that the stubber was used correctly
-        self.s3_stubber.assert_no_pending_responses()
-
-    def test_extract_text_with_delete_error(self):
-        """
-        Test the extract_text_from_pdf function when deletion fails.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-        content_length = 12345
-        last_modified = datetime.now()
-        job_id = "test-job-id"
-        extracted_text = "Sample text from PDF."
-
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "application/pdf",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the async Textract API responses
-        # 1. Start async job
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
+def textract_error(textract, code, message, operation_name):
+    """
+    Build the modeled Textract exception for an error code, so the handler's
+    textract_client.exceptions handlers catch it.
 
-        # 2. Check job status
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}},
-            {"JobId": job_id},
-        )
+    Returns:
+        ClientError: The Textract error
+    """
+    error_class = textract.exceptions.from_code(code)
+    return error_class({"Error": {"Code": code, "Message": message}}, operation_name)
 
-        # 3. Get results
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 1},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": extracted_text,
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-            },
-            {"JobId": job_id},
-        )
-
-        # Stub the put_object method for saving the extracted text
-        txt_filename = "sample.txt"
-        target_key = f"{EXTRACTED_TEXT_PREFIX}/{txt_filename}"
-        page_delimited_text = f"\n--- PAGE 1 ---\n{extracted_text}\n"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": EXTRACTED_TEXT_BUCKET,
-                "Key": target_key,
-                "Body": page_delimited_text,
-                "ContentType": "text/plain",
-            },
-        )
-
-        # Add an error when trying to delete the object
-        self.s3_stubber.add_client_error(
-            "delete_object",
-            service_error_code="AccessDenied",
-            service_message="Access Denied",
-            http_status_code=403,
-            expected_params={"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Activate the stubbers
-        self.s3_stubber.activate()
-        self.textract_stubber.activate()
-
-        # Set DELETE_ORIGINAL_PDF to True for this test
-        with mock.patch("src.lambda_functions.text_extractor.handler.DELETE_ORIGINAL_PDF", True):
-            # Call the function
-            result = extract_text_from_pdf(bucket_name, file_key)
-
-        # Verify the result
-        self.assertEqual(result["source"]["bucket"], bucket_name)
-        self.assertEqual(result["source"]["file_key"], file_key)
-        self.assertEqual(result["source"]["size_bytes"], content_length)
-        self.assertIn("extracted_text", result)
-        self.assertIn("Sample text from PDF.", result["extracted_text"])
-        self.assertEqual(result["status"], "success")
-
-        # Verify output information
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], EXTRACTED_TEXT_BUCKET)
-        self.assertEqual(result["output"]["file_key"], target_key)
-        self.assertEqual(result["output"]["content_type"], "text/plain")
-
-        # Verify deletion status - should be False because delete failed
-        self.assertIn("original_deleted", result)
-        self.assertFalse(result["original_deleted"])
-
-        # Verify that the stubbers were used correctly
-        self.s3_stubber.assert_no_pending_responses()
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_extract_text_with_verification_failed(self):
-        """
-        Test the extract_text_from_pdf function when verification after deletion fails.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-        content_length = 12345
-        last_modified = datetime.now()
-        job_id = "test-job-id"
-        extracted_text = "Sample text from PDF."
-
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "application/pdf",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the async Textract API responses
-        # 1. Start async job
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
 
-        # 2. Check job status
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}},
-            {"JobId": job_id},
-        )
+def rate_limit_error(textract, operation_name):
+    """
+    Build the error Textract raises when its provisioned throughput is exceeded.
 
-        # 3. Get results
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 1},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": extracted_text,
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-            },
-            {"JobId": job_id},
-        )
-
-        # Stub the put_object method for saving the extracted text
-        txt_filename = "sample.txt"
-        target_key = f"{EXTRACTED_TEXT_PREFIX}/{txt_filename}"
-        page_delimited_text = f"\n--- PAGE 1 ---\n{extracted_text}\n"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": EXTRACTED_TEXT_BUCKET,
-                "Key": target_key,
-                "Body": page_delimited_text,
-                "ContentType": "text/plain",
-            },
-        )
-
-        # Delete operation succeeds
-        self.s3_stubber.add_response(
-            "delete_object",
-            {},
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # But when we check if the file still exists, it does (verification fails)
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "application/pdf",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Activate the stubbers
-        self.s3_stubber.activate()
-        self.textract_stubber.activate()
-
-        # Set DELETE_ORIGINAL_PDF to True for this test
-        with mock.patch("src.lambda_functions.text_extractor.handler.DELETE_ORIGINAL_PDF", True):
-            # Call the function
-            result = extract_text_from_pdf(bucket_name, file_key)
-
-        # Verify the result
-        self.assertEqual(result["source"]["bucket"], bucket_name)
-        self.assertEqual(result["source"]["file_key"], file_key)
-        self.assertEqual(result["source"]["size_bytes"], content_length)
-        self.assertIn("extracted_text", result)
-        self.assertIn("Sample text from PDF.", result["extracted_text"])
-        self.assertEqual(result["status"], "success")
-
-        # Verify output information
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], EXTRACTED_TEXT_BUCKET)
-        self.assertEqual(result["output"]["file_key"], target_key)
-        self.assertEqual(result["output"]["content_type"], "text/plain")
-
-        # Verify deletion status - should be False because verification failed
-        self.assertIn("original_deleted", result)
-        self.assertFalse(result["original_deleted"])
-
-        # Verify that the stubbers were used correctly
-        self.s3_stubber.assert_no_pending_responses()
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_extract_text_with_verification_error(self):
-        """
-        Test the extract_text_from_pdf function when verification throws an unexpected error.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-        content_length = 12345
-        last_modified = datetime.now()
-        job_id = "test-job-id"
-        extracted_text = "Sample text from PDF."
-
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "application/pdf",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the async Textract API responses
-        # 1. Start async job
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
+    Returns:
+        ClientError: The rate limit error
+    """
+    return textract_error(
+        textract,
+        "ProvisionedThroughputExceededException",
+        "The request was rejected because provisioned throughput capacity limit was exceeded.",
+        operation_name,
+    )
+
+
+@pytest.fixture
+def s3(s3_client, monkeypatch):
+    """Serve the handler's S3 calls from a fresh moto backend with both buckets created"""
+    monkeypatch.setattr(handler, "s3_client", s3_client)
+    with mock_s3():
+        s3_client.create_bucket(Bucket=BUCKET_NAME)
+        s3_client.create_bucket(Bucket=EXTRACTED_TEXT_BUCKET)
+        yield s3_client
+
+
+@pytest.fixture
+def textract(textract_client, monkeypatch):
+    """Patch the handler's Textract client's async text detection calls, which moto can't run"""
+    monkeypatch.setattr(handler, "textract_client", textract_client)
+    with mock.patch.multiple(
+        textract_client,
+        start_document_text_detection=mock.DEFAULT,
+        get_document_text_detection=mock.DEFAULT,
+    ):
+        yield textract_client
+
+
+@pytest.fixture
+def sample_pdf(s3, textract):
+    """Upload the sample PDF and mock a Textract job that extracts its single page of text"""
+    put_pdf(s3, SAMPLE_PDF_KEY, SAMPLE_PDF_SIZE)
+    stub_text_detection(textract, SAMPLE_JOB_ID, SAMPLE_TEXT)
+
+
+@pytest.fixture(autouse=True)
+def sleep(monkeypatch):
+    """
+    Skip the handler's polling and rate limit backoff waits, advancing a fake
+    monotonic clock by each wait instead.
+    """
+    clock = [0.0]
 
-        # 2. Check job status
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}},
-            {"JobId": job_id},
-        )
+    def advance(seconds):
+        clock[0] += seconds
 
-        # 3. Get results
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 1},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": extracted_text,
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-            },
-            {"JobId": job_id},
-        )
-
-        # Stub the put_object method for saving the extracted text
-        txt_filename = "sample.txt"
-        target_key = f"{EXTRACTED_TEXT_PREFIX}/{txt_filename}"
-        page_delimited_text = f"\n--- PAGE 1 ---\n{extracted_text}\n"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": EXTRACTED_TEXT_BUCKET,
-                "Key": target_key,
-                "Body": page_delimited_text,
-                "ContentType": "text/plain",
-            },
-        )
-
-        # Delete operation succeeds
-        self.s3_stubber.add_response(
-            "delete_object",
-            {},
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # But when we check if the file still exists, we get an unexpected error
-        self.s3_stubber.add_client_error(
-            "head_object",
-            service_error_code="InternalError",
-            service_message="Internal Server Error",
-            http_status_code=500,
-            expected_params={"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Activate the stubbers
-        self.s3_stubber.activate()
-        self.textract_stubber.activate()
-
-        # Set DELETE_ORIGINAL_PDF to True for this test
-        with mock.patch("src.lambda_functions.text_extractor.handler.DELETE_ORIGINAL_PDF", True):
-            # Call the function
-            result = extract_text_from_pdf(bucket_name, file_key)
-
-        # Verify the result
-        self.assertEqual(result["source"]["bucket"], bucket_name)
-        self.assertEqual(result["source"]["file_key"], file_key)
-        self.assertEqual(result["source"]["size_bytes"], content_length)
-        self.assertIn("extracted_text", result)
-        self.assertIn("Sample text from PDF.", result["extracted_text"])
-        self.assertEqual(result["status"], "success")
-
-        # Verify output information
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], EXTRACTED_TEXT_BUCKET)
-        self.assertEqual(result["output"]["file_key"], target_key)
-        self.assertEqual(result["output"]["content_type"], "text/plain")
-
-        # Verify deletion status - should be False because verification errored
-        self.assertIn("original_deleted", result)
-        self.assertFalse(result["original_deleted"])
-
-        # Verify that the stubbers were used correctly
-        self.s3_stubber.assert_no_pending_responses()
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_extract_text_with_successful_deletion(self):
-        """
-        Test the extract_text_from_pdf function with successful deletion and verification.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-        content_length = 12345
-        last_modified = datetime.now()
-        job_id = "test-job-id"
-        extracted_text = "Sample text from PDF."
-
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "application/pdf",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the async Textract API responses
-        # 1. Start async job
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
+    sleep = mock.Mock(side_effect=advance)
+    monkeypatch.setattr(handler, "time", SimpleNamespace(monotonic=lambda: clock[0], sleep=sleep))
+    return sleep
 
-        # 2. Check job status
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}},
-            {"JobId": job_id},
-        )
 
-        # 3. Get results
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 1},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": extracted_text,
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-            },
-            {"JobId": job_id},
-        )
-
-        # Stub the put_object method for saving the extracted text
-        txt_filename = "sample.txt"
-        target_key = f"{EXTRACTED_TEXT_PREFIX}/{txt_filename}"
-        page_delimited_text = f"\n--- PAGE 1 ---\n{extracted_text}\n"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": EXTRACTED_TEXT_BUCKET,
-                "Key": target_key,
-                "Body": page_delimited_text,
-                "ContentType": "text/plain",
-            },
-        )
-
-        # Delete operation succeeds
-        self.s3_stubber.add_response(
-            "delete_object",
-            {},
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # When we check if the file still exists, we get a 404 (success)
-        self.s3_stubber.add_client_error(
-            "head_object",
-            service_error_code="NoSuchKey",
-            service_message="The specified key does not exist.",
-            http_status_code=404,
-            expected_params={"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Activate the stubbers
-        self.s3_stubber.activate()
-        self.textract_stubber.activate()
-
-        # Set DELETE_ORIGINAL_PDF to True for this test
-        with mock.patch("src.lambda_functions.text_extractor.handler.DELETE_ORIGINAL_PDF", True):
-            # Call the function
-            result = extract_text_from_pdf(bucket_name, file_key)
-
-        # Verify the result
-        self.assertEqual(result["source"]["bucket"], bucket_name)
-        self.assertEqual(result["source"]["file_key"], file_key)
-        self.assertEqual(result["source"]["size_bytes"], content_length)
-        self.assertIn("extracted_text", result)
-        self.assertIn("Sample text from PDF.", result["extracted_text"])
-        self.assertEqual(result["status"], "success")
-
-        # Verify output information
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], EXTRACTED_TEXT_BUCKET)
-        self.assertEqual(result["output"]["file_key"], target_key)
-        self.assertEqual(result["output"]["content_type"], "text/plain")
-
-        # Verify deletion status - should be True because deletion and verification succeeded
-        self.assertIn("original_deleted", result)
-        self.assertTrue(result["original_deleted"])
-
-        # Verify that the stubbers were used correctly
-        self.s3_stubber.assert_no_pending_responses()
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_extract_text_from_pdf_large_document(self):
-        """
-        Test the extract_text_from_pdf function with a large document.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "large-sample.pdf"
-        content_length = 54321
-        last_modified = datetime.now()
-        job_id = "large-doc-job-id"
-        extracted_text = "Large document text from multiple pages."
-
-        # Stub the head_object method to return our test data
-        self.s3_stubber.add_response(
-            "head_object",
-            {
-                "ContentLength": content_length,
-                "LastModified": last_modified,
-                "ContentType": "application/pdf",
-            },
-            {"Bucket": bucket_name, "Key": file_key},
-        )
-
-        # Stub the async Textract API responses
-        # 1. Start async job
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
+def put_pdf(s3, file_key, content_length):
+    """
+    Upload a placeholder PDF of the given size to the source bucket.
+    """
+    s3.put_object(
+        Bucket=BUCKET_NAME,
+        Key=file_key,
+        Body=b"\0" * content_length,
+        ContentType="application/pdf",
+    )
 
-        # 2. Check job status
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 6}},
-            {"JobId": job_id},
-        )
 
+def read_extracted_text(s3, target_key):
+    """
+    Read back the text the handler saved to the destination bucket.
+
+    Returns:
+        str: The saved text
+    """
+    response = s3.get_object(Bucket=EXTRACTED_TEXT_BUCKET, Key=target_key)
+    return response["Body"].read().decode("utf-8")
+
+
+def stub_text_detection(textract, job_id, extracted_text, page_count=1):
+    """
+    Mock a Textract job that succeeds with a single line of text on page 1.
+    """
+    # 1. Start async job
+    textract.start_document_text_detection.return_value = {"JobId": job_id}
+    textract.get_document_text_detection.side_effect = [
+        # 2. Check job status
+        job_succeeded_response(page_count),
         # 3. Get results
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 6},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": extracted_text,
-                        "Id": "1",
-                        "Confidence": 95.0,
-                        "Page": 1,
-                    }
-                ]
-                # No NextToken since we're simplifying the test
-            },
-            {"JobId": job_id},
-        )
-
-        # Stub the put_object method for saving the extracted text
-        txt_filename = "large-sample.txt"
-        target_key = f"{EXTRACTED_TEXT_PREFIX}/{txt_filename}"
-        page_delimited_text = f"\n--- PAGE 1 ---\n{extracted_text}\n"
-        self.s3_stubber.add_response(
-            "put_object",
-            {},
-            {
-                "Bucket": EXTRACTED_TEXT_BUCKET,
-                "Key": target_key,
-                "Body": page_delimited_text,
-                "ContentType": "text/plain",
-            },
-        )
-
-        # Stub the delete_object method for the original PDF if DELETE_ORIGINAL_PDF is True
-        if DELETE_ORIGINAL_PDF:
-            self.s3_stubber.add_response(
-                "delete_object",
-                {},
-                {"Bucket": bucket_name, "Key": file_key},
-            )
-
-        # Activate the stubbers
-        self.s3_stubber.activate()
-        self.textract_stubber.activate()
+        job_results_response(extracted_text, page_count),
+    ]
 
-        # Call the function
-        result = extract_text_from_pdf(bucket_name, file_key)
-
-        # Verify the result
-        self.assertEqual(result["source"]["bucket"], bucket_name)
-        self.assertEqual(result["source"]["file_key"], file_key)
-        self.assertEqual(result["source"]["size_bytes"], content_length)
-        self.assertIn("extracted_text", result)
-        self.assertIn("Large document text from multiple pages.", result["extracted_text"])
-        self.assertEqual(result["status"], "success")
-        self.assertEqual(result["page_count"], 6)  # Should get the page count from async process
-
-        # Verify output information
-        self.assertIn("output", result)
-        self.assertEqual(result["output"]["bucket"], EXTRACTED_TEXT_BUCKET)
-        self.assertEqual(result["output"]["file_key"], target_key)
-        self.assertEqual(result["output"]["content_type"], "text/plain")
-
-        # Verify deletion status
-        # After the update, original_deleted is based on actual deletion verification
-        # rather than just the environment setting
-        self.assertIn("original_deleted", result)
-
-        # Verify that the stubbers were used correctly
-        self.s3_stubber.assert_no_pending_responses()
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_process_document_async(self):
-        """
-        Test the process_document_async function.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "large-sample.pdf"
-        job_id = "123456789"
-
-        # Mock the start_document_text_detection response
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
-
-        # Mock the get_document_text_detection response for job status check
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 3}},
-            {"JobId": job_id},
-        )
-
-        # Mock the get_document_text_detection response for first page
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 3},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": "First page text.",
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-                "NextToken": "page2token",
-            },
-            {"JobId": job_id},
-        )
-
-        # Mock the get_document_text_detection response for second page
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": "Second page text.",
-                        "Id": "2",
-                        "Confidence": 98.0,
-                        "Page": 2,
-                    }
-                ],
-                "NextToken": "page3token",
-            },
-            {"JobId": job_id, "NextToken": "page2token"},
-        )
-
-        # Mock the get_document_text_detection response for third page
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": "Third page text.",
-                        "Id": "3",
-                        "Confidence": 97.0,
-                        "Page": 3,
-                    }
-                ]
-                # No NextToken means this is the last page
-            },
-            {"JobId": job_id, "NextToken": "page3token"},
-        )
-
-        # Activate the stubber
-        self.textract_stubber.activate()
 
-        # Call the function
-        extracted_text, page_count = process_document_async(bucket_name, file_key)
-
-        # Verify results
-        self.assertEqual(page_count, 3)
-        self.assertIn("--- PAGE 1 ---", extracted_text)
-        self.assertIn("First page text.", extracted_text)
-        self.assertIn("--- PAGE 2 ---", extracted_text)
-        self.assertIn("Second page text.", extracted_text)
-        self.assertIn("--- PAGE 3 ---", extracted_text)
-        self.assertIn("Third page text.", extracted_text)
-
-        # Verify that the stubber was used correctly
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_process_document_async_timeout(self):
-        """
-        Test the process_document_async function when the job times out.
-        """
-        # Instead of running the full process, just check that our timeout calculation is correct
-        # This approach avoids any timing issues in tests
-
-        # The current implementation in handler.py uses:
-        # max_tries = 30  # 30 tries
-        # wait_seconds = 5  # 5 seconds each
-        # Total timeout = 30 * 5 = 150 seconds
-
-        # Create a sample Exception that matches what's raised in the timeout case
-        expected_timeout_seconds = 150
-        timeout_exception = Exception(
-            f"Textract job timed out after {30 * 5} seconds (max timeout: 150 seconds)"
-        )
-
-        # Verify the exception message contains both "timed out" and "150 seconds"
-        self.assertIn("timed out", str(timeout_exception))
-        self.assertIn("150 seconds", str(timeout_exception))
-
-        # This test is now simple and doesn't rely on mocking or actual timeouts
-        # It verifies that the timeout logic is correctly implemented but doesn't execute it
-
-        # We're not using stubbers for this test, so no need to verify stubber state
-
-    def test_process_document_async_failed(self):
-        """
-        Test the process_document_async function when the job fails.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "failed-sample.pdf"
-        job_id = "failed-job"
-
-        # Mock the start_document_text_detection response
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
-
-        # Mock a FAILED response
-        self.textract_stubber.add_response(
-            "get_document_text_detection", {"JobStatus": "FAILED"}, {"JobId": job_id}
-        )
-
-        # Activate the stubber
-        self.textract_stubber.activate()
-
-        # Call the function and expect a failure exception
-        with self.assertRaises(Exception) as context:
-            process_document_async(bucket_name, file_key)
-
-        # Verify the exception message contains "failed"
-        self.assertIn("failed", str(context.exception))
-
-        # Verify that the stubber was used correctly
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_process_document_async_rate_limiting(self):
-        """
-        Test the process_document_async function when rate limiting occurs.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "rate-limited-sample.pdf"
-        job_id = "rate-limited-job"
-
-        # Create a client error for ProvisionedThroughputExceededException
-        self.textract_stubber.add_client_error(
-            "start_document_text_detection",
-            service_error_code="ProvisionedThroughputExceededException",
-            service_message="The request was rejected because provisioned throughput capacity limit was exceeded.",
-            http_status_code=400,
-            expected_params={
-                "DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}
-            },
-        )
-
-        # For the retry attempt, return success
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
+def assert_extraction_result(result, file_key, content_length, extracted_text):
+    """
+    Assert the source, status and output details of a successful extraction.
 
-        # Mock successful job status
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}},
-            {"JobId": job_id},
-        )
+    Returns:
+        str: The key the extracted text was saved under
+    """
+    target_key = f"{EXTRACTED_TEXT_PREFIX}/{file_key[:-len('.pdf')]}.txt"
+    expected_text = page_delimited_text(extracted_text)
+    expected_source = {"bucket": BUCKET_NAME, "file_key": file_key, "size_bytes": content_length}
+
+    # The source also carries the object's last_modified and content_type
+    assert result["source"].items() >= expected_source.items()
+    assert result["output"] == {
+        "bucket": EXTRACTED_TEXT_BUCKET,
+        "file_key": target_key,
+        "size_bytes": len(expected_text),
+        "content_type": "text/plain",
+    }
+    assert result["extracted_text"] == expected_text
+    assert result["status"] == "success"
+    return target_key
+
+
+def assert_pdf_exists(s3, file_key, exists):
+    """
+    Assert whether the source PDF is still in the source bucket.
+    """
+    response = s3.list_objects_v2(Bucket=BUCKET_NAME, Prefix=file_key)
+    assert (response["KeyCount"] == 1) == exists
 
-        # Mock successful result with content
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 1},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": "Rate limited but successful text.",
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-            },
-            {"JobId": job_id},
-        )
-
-        # Activate the stubber
-        self.textract_stubber.activate()
-
-        # Call the function - should retry and eventually succeed
-        extracted_text, page_count = process_document_async(bucket_name, file_key)
-
-        # Verify the results
-        self.assertEqual(page_count, 1)
-        self.assertIn("Rate limited but successful text.", extracted_text)
-
-        # Verify all expected API calls were made
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_process_document_async_job_status_rate_limiting(self):
-        """
-        Test the process_document_async function when rate limiting occurs during job status check.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "status-rate-limited.pdf"
-        job_id = "status-rate-limited-job"
-
-        # Start the job successfully
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
 
-        # First attempt to check job status is rate limited
-        self.textract_stubber.add_client_error(
-            "get_document_text_detection",
-            service_error_code="ProvisionedThroughputExceededException",
-            service_message="The request was rejected because provisioned throughput capacity limit was exceeded.",
-            http_status_code=400,
-            expected_params={"JobId": job_id},
-        )
+def assert_textract_calls(textract, file_key, get_calls):
+    """
+    Assert the job was started for the file and results were fetched with the given calls.
+    """
+    textract.start_document_text_detection.assert_called_once_with(
+        DocumentLocation={"S3Object": {"Bucket": BUCKET_NAME, "Name": file_key}}
+    )
+    assert textract.get_document_text_detection.call_args_list == get_calls
 
-        # Second attempt to check job status succeeds
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}},
-            {"JobId": job_id},
-        )
 
-        # Get results succeeds
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 1},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": "Text after status rate limiting.",
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-            },
-            {"JobId": job_id},
-        )
-
-        # Activate the stubber
-        self.textract_stubber.activate()
-
-        # Call the function - should retry and eventually succeed
-        extracted_text, page_count = process_document_async(bucket_name, file_key)
-
-        # Verify the results
-        self.assertEqual(page_count, 1)
-        self.assertIn("Text after status rate limiting.", extracted_text)
-        self.assertIn("--- PAGE 1 ---", extracted_text)
-
-        # Verify all expected API calls were made
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_process_document_async_get_results_rate_limiting(self):
-        """
-        Test the process_document_async function when rate limiting occurs during results retrieval.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "rate-limited-results.pdf"
-        job_id = "rate-limited-results-job"
-
-        # Start the job successfully
-        self.textract_stubber.add_response(
-            "start_document_text_detection",
-            {"JobId": job_id},
-            {"DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}},
-        )
+def patch_delete_outcome(s3, outcome):
+    """
+    Patch the S3 client so deleting the original PDF ends in the given outcome.
 
-        # Job status check succeeds
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 2}},
-            {"JobId": job_id},
-        )
+    Args:
+        s3: The moto-backed S3 client
+        outcome (str): One of "delete_error", "verify_found", "verify_error" or
+            "verify_not_found"
 
-        # First attempt to get results is rate limited
-        self.textract_stubber.add_client_error(
-            "get_document_text_detection",
-            service_error_code="ProvisionedThroughputExceededException",
-            service_message="The request was rejected because provisioned throughput capacity limit was exceeded.",
-            http_status_code=400,
-            expected_params={"JobId": job_id},
-        )
+    Returns:
+        contextlib.AbstractContextManager: The patch to apply around the extraction
+    """
+    if outcome == "delete_error":
+        # The delete itself is rejected
+        delete_error = s3_error("AccessDenied", "Access Denied", "DeleteObject")
+        return mock.patch.object(s3, "delete_object", side_effect=delete_error)
+
+    if outcome == "verify_found":
+        # The delete succeeds without removing the object, so when we check if the
+        # file still exists, it does (verification fails)
+        return mock.patch.object(s3, "delete_object", return_value={})
+
+    if outcome == "verify_error":
+        # The existing-extraction check finds nothing and the PDF's metadata is read
+        # from moto, but when we check if the file still exists after the delete, we
+        # get an unexpected error
+        head_object_responses = [
+            s3_error("404", "Not Found", "HeadObject"),
+            s3.head_object(Bucket=BUCKET_NAME, Key=SAMPLE_PDF_KEY),
+            s3_error("InternalError", "Internal Server Error", "HeadObject"),
+        ]
+        return mock.patch.object(s3, "head_object", side_effect=head_object_responses)
+
+    # moto deletes the object, so the verification head_object gets a 404 (success)
+    return contextlib.nullcontext()
+
+
+@pytest.mark.parametrize(
+    "file_key, content_length, job_id, extracted_text, page_count",
+    [
+        ("sample.pdf", 12345, "test-job-id", "Sample text from PDF.", 1),
+        (
+            "large-sample.pdf",
+            54321,
+            "large-doc-job-id",
+            "Large document text from multiple pages.",
+            6,
+        ),
+    ],
+    ids=["small_document", "large_document"],
+)
+def test_extract_text_from_pdf(
+    s3, textract, file_key, content_length, job_id, extracted_text, page_count
+):
+    """
+    Test the extract_text_from_pdf function with a small and a large document.
+    """
+    put_pdf(s3, file_key, content_length)
 
-        # Second attempt succeeds
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "DocumentMetadata": {"Pages": 2},
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": "Page one text after rate limiting.",
-                        "Id": "1",
-                        "Confidence": 99.0,
-                        "Page": 1,
-                    }
-                ],
-                "NextToken": "page2token",
-            },
-            {"JobId": job_id},
-        )
+    # Mock the async Textract job, returning a single page of text
+    stub_text_detection(textract, job_id, extracted_text, page_count)
 
-        # Getting second page results is also rate limited
-        self.textract_stubber.add_client_error(
-            "get_document_text_detection",
-            service_error_code="ProvisionedThroughputExceededException",
-            service_message="The request was rejected because provisioned throughput capacity limit was exceeded.",
-            http_status_code=400,
-            expected_params={"JobId": job_id, "NextToken": "page2token"},
-        )
+    # Call the function
+    result = extract_text_from_pdf(BUCKET_NAME, file_key)
 
-        # Retry for second page succeeds
-        self.textract_stubber.add_response(
-            "get_document_text_detection",
-            {
-                "JobStatus": "SUCCEEDED",
-                "Blocks": [
-                    {
-                        "BlockType": "LINE",
-                        "Text": "Page two text after rate limiting.",
-                        "Id": "2",
-                        "Confidence": 98.0,
-                        "Page": 2,
-                    }
-                ],
-                # No NextToken since this is the last page
-            },
-            {"JobId": job_id, "NextToken": "page2token"},
-        )
-
-        # Activate the stubber
-        self.textract_stubber.activate()
-
-        # Call the function - should retry and eventually succeed
-        extracted_text, page_count = process_document_async(bucket_name, file_key)
-
-        # Verify the results
-        self.assertEqual(page_count, 2)
-        self.assertIn("Page one text after rate limiting.", extracted_text)
-        self.assertIn("Page two text after rate limiting.", extracted_text)
-        self.assertIn("--- PAGE 1 ---", extracted_text)
-        self.assertIn("--- PAGE 2 ---", extracted_text)
-
-        # Verify all expected API calls were made
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_process_document_async_max_retries_exceeded(self):
-        """
-        Test the process_document_async function when max retries are exceeded for rate limiting.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "max-retries-exceeded.pdf"
-
-        # Get the actual max retries from the handler
-        max_retries = 10  # This should match what's in the handler.py file
-
-        # Simulate multiple rate limit errors that exceed the retry count
-        for _ in range(max_retries):
-            self.textract_stubber.add_client_error(
-                "start_document_text_detection",
-                service_error_code="ProvisionedThroughputExceededException",
-                service_message="The request was rejected because provisioned throughput capacity limit was exceeded.",
-                http_status_code=400,
-                expected_params={
-                    "DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}
-                },
-            )
-
-        # Activate the stubber
-        self.textract_stubber.activate()
-
-        # Mock sleep to make the test run faster
-        with mock.patch("time.sleep"):
-            # Call the function - should retry and eventually fail with an exception
-            with self.assertRaises(Exception) as context:
-                process_document_async(bucket_name, file_key)
-
-        # Verify the exception message
-        # It can be either a rate limit message or a stub message (both indicate the right flow path)
-        exception_msg = str(context.exception).lower()
-        self.assertTrue(
-            "rate limit" in exception_msg
-            or "throughput" in exception_msg
-            or "textract" in exception_msg
-        )
-
-        # Verify all expected API calls were made
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_lambda_handler_with_exception(self):
-        """
-        Test the lambda_handler function when an exception occurs.
-        """
-        # Define test data
-        bucket_name = "test-bucket"
-        file_key = "sample.pdf"
-
-        # Create a mock S3 event
-        event = {
-            "Records": [
-                {
-                    "eventSource": "aws:s3",
-                    "s3": {"bucket": {"name": bucket_name}, "object": {"key": file_key}},
-                }
-            ]
-        }
+    # Verify the result, taking the page count from the async process
+    target_key = assert_extraction_result(result, file_key, content_length, extracted_text)
+    assert result["page_count"] == page_count
+
+    # Verify deletion status
+    # After the update, original_deleted is based on actual deletion verification
+    # rather than just the environment setting
+    assert "original_deleted" in result
+
+    # Verify the extracted text was saved and Textract was called as expected
+    assert read_extracted_text(s3, target_key) == page_delimited_text(extracted_text)
+    assert_textract_calls(textract, file_key, [mock.call(JobId=job_id)] * 2)
 
-        # Make the S3 client raise an exception when head_object is called
-        self.s3_stubber.add_client_error(
-            "head_object",
-            service_error_code="NoSuchKey",
-            service_message="The specified key does not exist.",
-            http_status_code=404,
-            expected_params={"Bucket": bucket_name, "Key": file_key},
-        )
 
-        # Activate the stubber
-        self.s3_stubber.activate()
+def test_lambda_handler_with_valid_event():
+    """
+    Test the lambda_handler function passes each PDF in a valid S3 event to
+    extract_text_from_pdf and wraps the results in its response.
+    """
+    # Create a mock S3 event
+    event = s3_event(BUCKET_NAME, SAMPLE_PDF_KEY)
+    extraction_result = {"status": "success", "original_deleted": True}
+
+    # Call the lambda handler with the extraction itself mocked out
+    with mock.patch.object(
+        handler, "extract_text_from_pdf", return_value=extraction_result
+    ) as mock_extract:
+        response = lambda_handler(event, {})
 
+    # Verify the PDF was extracted and its result returned
+    mock_extract.assert_called_once_with(BUCKET_NAME, SAMPLE_PDF_KEY)
+    assert response == {
+        "statusCode": 200,
+        "body": {
+            "message": "Extracted text from 1 PDF files",
+            "results": [extraction_result],
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "event",
+    [s3_event(BUCKET_NAME, "sample.txt"), {"Records": []}],
+    ids=["non_pdf_file", "no_records"],
+)
+def test_lambda_handler_skips_events(event):
+    """
+    Test the lambda_handler function skips events without PDFs.
+    """
+    # Replace the clients with bare mocks so any AWS call would be recorded
+    with mock.patch.multiple(
+        handler, s3_client=mock.DEFAULT, textract_client=mock.DEFAULT
+    ) as clients:
         # Call the lambda handler
         response = lambda_handler(event, {})
 
-        # Verify the response
-        self.assertEqual(response["statusCode"], 500)
-        self.assertIn("message", response["body"])
-        self.assertIn("Error extracting text from PDFs", response["body"]["message"])
+    # Verify the response
+    assert response["statusCode"] == 200
+    assert "message" in response["body"]
+    assert "results" in response["body"]
+    assert len(response["body"]["results"]) == 0
 
-        # Verify that the stubber was used correctly
-        self.s3_stubber.assert_no_pending_responses()
+    # Verify neither client was touched
+    assert clients["s3_client"].mock_calls == []
+    assert clients["textract_client"].mock_calls == []
 
-    def test_check_for_existing_extraction_found(self):
-        """Test check_for_existing_extraction when extraction already exists."""
-        from src.lambda_functions.text_extractor.handler import check_for_existing_extraction
 
-        # Setup test data
-        file_key = "sample.pdf"
-        expected_txt_key = f"{EXTRACTED_TEXT_PREFIX}/sample.txt"
+def test_extract_text_from_pdf_exception(s3, textract):
+    """
+    Test the extract_text_from_pdf function when an exception occurs.
+    """
+    # The PDF is never uploaded, so head_object raises a 404
+    with pytest.raises(ClientError):
+        extract_text_from_pdf(BUCKET_NAME, "sample.pdf")
+
+    # Verify Textract was never called
+    textract.start_document_text_detection.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "outcome, original_deleted, pdf_exists",
+    [
+        ("delete_error", False, True),
+        ("verify_found", False, True),
+        ("verify_error", False, False),
+        ("verify_not_found", True, False),
+    ],
+)
+def test_extract_text_with_deletion(s3, sample_pdf, outcome, original_deleted, pdf_exists):
+    """
+    Test the extract_text_from_pdf function reports whether deleting the original PDF
+    was verified, whatever happens during the delete.
+    """
+    # Set DELETE_ORIGINAL_PDF to True for this test
+    with mock.patch(
+        "src.lambda_functions.text_extractor.handler.DELETE_ORIGINAL_PDF", True
+    ), patch_delete_outcome(s3, outcome):
+        # Call the function
+        result = extract_text_from_pdf(BUCKET_NAME, SAMPLE_PDF_KEY)
 
-        # Configure stub to find the file
-        self.s3_stubber.add_response(
-            "head_object",
-            {"ContentLength": 1000, "ContentType": "text/plain"},
-            {"Bucket": EXTRACTED_TEXT_BUCKET, "Key": expected_txt_key},
-        )
+    # Verify the result and output information
+    target_key = assert_extraction_result(result, SAMPLE_PDF_KEY, SAMPLE_PDF_SIZE, SAMPLE_TEXT)
 
-        # Activate stubber
-        self.s3_stubber.activate()
+    # Verify deletion status is only True when deletion and verification succeeded
+    assert result["original_deleted"] is original_deleted
+    assert_pdf_exists(s3, SAMPLE_PDF_KEY, pdf_exists)
 
-        # Call the function
-        exists, txt_key = check_for_existing_extraction(file_key)
+    # Verify the extracted text was saved regardless
+    assert read_extracted_text(s3, target_key) == SAMPLE_PAGE_TEXT
 
-        # Verify results
-        self.assertTrue(exists)
-        self.assertEqual(txt_key, expected_txt_key)
 
-        # Verify stubber was used correctly
-        self.s3_stubber.assert_no_pending_responses()
+def test_process_document_async(textract):
+    """
+    Test the process_document_async function.
+    """
+    # Define test data
+    file_key = "large-sample.pdf"
+    job_id = "123456789"
+
+    # (text, next_token) for each page of results; no NextToken marks the last page
+    pages = [
+        ("First page text.", "page2token"),
+        ("Second page text.", "page3token"),
+        ("Third page text.", None),
+    ]
+
+    # Mock the start_document_text_detection response and the job status check
+    textract.start_document_text_detection.return_value = {"JobId": job_id}
+    responses = [job_succeeded_response(len(pages))]
+    expected_calls = [mock.call(JobId=job_id)]
+
+    # Mock a get_document_text_detection response for each page, each fetched
+    # with the previous page's NextToken
+    previous_token = None
+    for page_num, (text, next_token) in enumerate(pages, 1):
+        response = {
+            "JobStatus": "SUCCEEDED",
+            "Blocks": [{**LINE_BLOCK, "Text": text, "Page": page_num}],
+        }
+        if page_num == 1:
+            response["DocumentMetadata"] = {"Pages": len(pages)}
+        if next_token:
+            response["NextToken"] = next_token
+        responses.append(response)
 
-    def test_check_for_existing_extraction_not_found(self):
-        """Test check_for_existing_extraction when extraction doesn't exist."""
-        from src.lambda_functions.text_extractor.handler import check_for_existing_extraction
+        if previous_token:
+            expected_calls.append(mock.call(JobId=job_id, NextToken=previous_token))
+        else:
+            expected_calls.append(mock.call(JobId=job_id))
+        previous_token = next_token
 
-        # Setup test data
-        file_key = "new_sample.pdf"
-        expected_txt_key = f"{EXTRACTED_TEXT_PREFIX}/new_sample.txt"
+    textract.get_document_text_detection.side_effect = responses
 
-        # Configure stub to not find the file
-        self.s3_stubber.add_client_error(
-            "head_object",
-            service_error_code="NoSuchKey",
-            service_message="The specified key does not exist.",
-            http_status_code=404,
-            expected_params={"Bucket": EXTRACTED_TEXT_BUCKET, "Key": expected_txt_key},
-        )
+    # Call the function
+    extracted_text, page_count = process_document_async(BUCKET_NAME, file_key)
 
-        # Activate stubber
-        self.s3_stubber.activate()
+    # Verify results
+    assert page_count == len(pages)
+    assert extracted_text == page_delimited_text(*(text for text, _ in pages))
 
-        # Call the function
-        exists, txt_key = check_for_existing_extraction(file_key)
-
-        # Verify results
-        self.assertFalse(exists)
-        self.assertEqual(txt_key, expected_txt_key)
-
-        # Verify stubber was used correctly
-        self.s3_stubber.assert_no_pending_responses()
-
-    def test_start_textract_job_with_unexpected_error(self):
-        """Test start_textract_job with an unexpected error."""
-        from src.lambda_functions.text_extractor.handler import start_textract_job
-
-        # Setup test data
-        bucket_name = "test-bucket"
-        file_key = "error_sample.pdf"
-
-        # Configure stub to return an unexpected error
-        self.textract_stubber.add_client_error(
-            "start_document_text_detection",
-            service_error_code="InvalidParameterException",
-            service_message="Invalid parameter in request",
-            http_status_code=400,
-            expected_params={
-                "DocumentLocation": {"S3Object": {"Bucket": bucket_name, "Name": file_key}}
-            },
-        )
-
-        # Activate stubber
-        self.textract_stubber.activate()
-
-        # Call the function and expect an exception
-        with self.assertRaises(Exception) as context:
-            start_textract_job(bucket_name, file_key)
-
-        # Verify exception details
-        self.assertIn("Invalid parameter", str(context.exception))
-
-        # Verify stubber was used correctly
-        self.textract_stubber.assert_no_pending_responses()
-
-    def test_get_textract_response_with_retry_max_exceeded(self):
-        """Test get_textract_response_with_retry when max retries are exceeded."""
-        # Instead of directly testing the function, we'll check for the expected error message pattern
-        # based on the implementation in the handler
-        from src.lambda_functions.text_extractor.handler import TextractResponseExhaustedException
-
-        # Create a sample job ID for testing
-        job_id = "exhausted-job-id"
-        max_retries = 15  # This should match the handler implementation
-
-        # Create an expected exception with the correct message format
-        expected_exception = TextractResponseExhaustedException(
-            f"Failed to get Textract results for job {job_id} after {max_retries} retries"
-        )
-
-        # Verify the exception message format is correct
-        error_message = str(expected_exception)
-        self.assertIn("Failed to get Textract results", error_message)
-        self.assertIn(job_id, error_message)
-        self.assertIn(str(max_retries), error_message)
-        # This approach removes the dependency on mock behavior and still validates
-        # the code path we're trying to cover
-
-    def test_extract_text_from_blocks(self):
-        """Test extract_text_from_blocks function."""
-        from src.lambda_functions.text_extractor.handler import extract_text_from_blocks
-
-        # Setup test data
-        blocks = [
-            {"BlockType": "LINE", "Text": "This is line 1 on page 1", "Id": "1", "Page": 1},
-            {"BlockType": "LINE", "Text": "This is line 2 on page 1", "Id": "2", "Page": 1},
-            {"BlockType": "LINE", "Text": "This is line 1 on page 2", "Id": "3", "Page": 2},
-        ]
-        current_page = 1
-        page_delimiter = "\n--- PAGE {page_num} ---\n"
+    # Verify the job was polled once and every result page was fetched
+    assert_textract_calls(textract, file_key, expected_calls)
 
-        # Call the function
-        extracted_text, final_page = extract_text_from_blocks(blocks, current_page, page_delimiter)
 
-        # Verify results
-        self.assertEqual(final_page, 2)
-        self.assertIn("This is line 1 on page 1", extracted_text)
-        self.assertIn("This is line 2 on page 1", extracted_text)
-        self.assertIn("--- PAGE 2 ---", extracted_text)
-        self.assertIn("This is line 1 on page 2", extracted_text)
+def test_process_document_async_timeout(textract, sleep):
+    """
+    Test the process_document_async function when the job times out.
+    """
+    # Define test data
+    file_key = "timeout-sample.pdf"
+    job_id = "timeout-job"
+
+    # The job never leaves IN_PROGRESS
+    textract.start_document_text_detection.return_value = {"JobId": job_id}
+    textract.get_document_text_detection.return_value = JOB_IN_PROGRESS_RESPONSE
+
+    # Call the function without jitter - should give up and return a placeholder
+    # instead of raising
+    with mock.patch.object(handler.secrets, "randbelow", return_value=0):
+        extracted_text, page_count = process_document_async(BUCKET_NAME, file_key)
+
+    # Verify the placeholder records the unfinished job
+    assert page_count == 0
+    assert f"INCOMPLETE_TEXTRACT_JOB: {job_id}" in extracted_text
+    assert f"Timeout after {TEXTRACT_POLL_TIMEOUT:g} seconds" in extracted_text
+
+    # Verify the waits doubled up to the max delay, stopping at the timeout, with one
+    # more poll than waits
+    assert (
+        sleep.call_args_list
+        == [mock.call(delay) for delay in (1, 2, 4, 8)] + [mock.call(TEXTRACT_POLL_MAX_DELAY)] * 19
+    )
+    assert textract.get_document_text_detection.call_count == sleep.call_count + 1
+
+
+def test_process_document_async_failed(textract):
+    """
+    Test the process_document_async function when the job fails.
+    """
+    # Define test data
+    file_key = "failed-sample.pdf"
+    job_id = "failed-job"
+
+    # Mock the start_document_text_detection response and a FAILED status
+    textract.start_document_text_detection.return_value = {"JobId": job_id}
+    textract.get_document_text_detection.return_value = JOB_FAILED_RESPONSE
+
+    # Call the function and expect a failure exception mentioning "failed"
+    with pytest.raises(TextractJobFailedException, match="failed"):
+        process_document_async(BUCKET_NAME, file_key)
+
+    assert_textract_calls(textract, file_key, [mock.call(JobId=job_id)])
+
+
+def test_process_document_async_rate_limiting(textract):
+    """
+    Test the process_document_async function when rate limiting occurs.
+    """
+    # Define test data
+    file_key = "rate-limited-sample.pdf"
+    job_id = "rate-limited-job"
+
+    # The first start attempt is rate limited and the retry succeeds
+    textract.start_document_text_detection.side_effect = [
+        rate_limit_error(textract, "StartDocumentTextDetection"),
+        {"JobId": job_id},
+    ]
+    textract.get_document_text_detection.side_effect = [
+        # Mock successful job status
+        job_succeeded_response(1),
+        # Mock successful result with content
+        job_results_response("Rate limited but successful text."),
+    ]
+
+    # Call the function - should retry and eventually succeed
+    extracted_text, page_count = process_document_async(BUCKET_NAME, file_key)
+
+    # Verify the results
+    assert page_count == 1
+    assert extracted_text == page_delimited_text("Rate limited but successful text.")
+
+    # Verify all expected API calls were made
+    assert textract.start_document_text_detection.call_count == 2
+    assert textract.get_document_text_detection.call_count == 2
+
+
+def test_process_document_async_job_status_rate_limiting(textract):
+    """
+    Test the process_document_async function when rate limiting occurs during job status check.
+    """
+    # Define test data
+    file_key = "status-rate-limited.pdf"
+    job_id = "status-rate-limited-job"
+
+    # Start the job successfully
+    textract.start_document_text_detection.return_value = {"JobId": job_id}
+    textract.get_document_text_detection.side_effect = [
+        # First attempt to check job status is rate limited
+        rate_limit_error(textract, "GetDocumentTextDetection"),
+        # Second attempt to check job status succeeds
+        job_succeeded_response(1),
+        # Get results succeeds
+        job_results_response("Text after status rate limiting."),
+    ]
+
+    # Call the function - should retry and eventually succeed
+    extracted_text, page_count = process_document_async(BUCKET_NAME, file_key)
+
+    # Verify the results
+    assert page_count == 1
+    assert extracted_text == page_delimited_text("Text after status rate limiting.")
+
+    # Verify all expected API calls were made
+    assert_textract_calls(textract, file_key, [mock.call(JobId=job_id)] * 3)
+
+
+def test_process_document_async_get_results_rate_limiting(textract):
+    """
+    Test the process_document_async function when rate limiting occurs during results retrieval.
+    """
+    # Define test data
+    file_key = "rate-limited-results.pdf"
+    job_id = "rate-limited-results-job"
+
+    # Start the job successfully
+    textract.start_document_text_detection.return_value = {"JobId": job_id}
+    textract.get_document_text_detection.side_effect = [
+        # Job status check succeeds
+        job_succeeded_response(2),
+        # First attempt to get results is rate limited
+        rate_limit_error(textract, "GetDocumentTextDetection"),
+        # Second attempt succeeds
+        {
+            "JobStatus": "SUCCEEDED",
+            "DocumentMetadata": {"Pages": 2},
+            "Blocks": [{**LINE_BLOCK, "Text": "Page one text after rate limiting."}],
+            "NextToken": "page2token",
+        },
+        # Getting second page results is also rate limited
+        rate_limit_error(textract, "GetDocumentTextDetection"),
+        # Retry for second page succeeds
+        {
+            "JobStatus": "SUCCEEDED",
+            "Blocks": [{**LINE_BLOCK, "Text": "Page two text after rate limiting.", "Page": 2}],
+            # No NextToken since this is the last page
+        },
+    ]
+
+    # Call the function - should retry and eventually succeed
+    extracted_text, page_count = process_document_async(BUCKET_NAME, file_key)
+
+    # Verify the results
+    assert page_count == 2
+    assert extracted_text == page_delimited_text(
+        "Page one text after rate limiting.", "Page two text after rate limiting."
+    )
+
+    # Verify all expected API calls were made
+    assert_textract_calls(
+        textract,
+        file_key,
+        [mock.call(JobId=job_id)] * 3 + [mock.call(JobId=job_id, NextToken="page2token")] * 2,
+    )
+
+
+def test_process_document_async_max_retries_exceeded(textract):
+    """
+    Test the process_document_async function when max retries are exceeded for rate limiting.
+    """
+    # Define test data
+    file_key = "max-retries-exceeded.pdf"
+
+    # Get the actual max retries from the handler
+    max_retries = 10  # This should match what's in the handler.py file
+
+    # Simulate multiple rate limit errors that exceed the retry count
+    textract.start_document_text_detection.side_effect = [
+        rate_limit_error(textract, "StartDocumentTextDetection") for _ in range(max_retries)
+    ]
+
+    # Call the function - should retry and eventually re-raise the rate limit error
+    with pytest.raises(
+        textract.exceptions.ProvisionedThroughputExceededException,
+        match="provisioned throughput",
+    ):
+        process_document_async(BUCKET_NAME, file_key)
+
+    # Verify all expected API calls were made
+    assert textract.start_document_text_detection.call_count == max_retries
+    textract.get_document_text_detection.assert_not_called()
+
+
+def test_lambda_handler_with_exception(s3):
+    """
+    Test the lambda_handler function when an exception occurs.
+    """
+    # Create a mock S3 event for a PDF that was never uploaded, so head_object raises
+    event = s3_event(BUCKET_NAME, "sample.pdf")
+
+    # Call the lambda handler
+    response = lambda_handler(event, {})
+
+    # Verify the response
+    assert response["statusCode"] == 500
+    assert "message" in response["body"]
+    assert "Error extracting text from PDFs" in response["body"]["message"]
+
 
+def test_check_for_existing_extraction_found(s3):
+    """Test check_for_existing_extraction when extraction already exists."""
+    from src.lambda_functions.text_extractor.handler import check_for_existing_extraction
 
-if __name__ == "__main__":
-    unittest.main()
+    # Setup test data
+    file_key = "sample.pdf"
+    expected_txt_key = f"{EXTRACTED_TEXT_PREFIX}/sample.txt"
+
+    # Store a previous extraction for the file
+    s3.put_object(
+        Bucket=EXTRACTED_TEXT_BUCKET,
+        Key=expected_txt_key,
+        Body=b"x" * 1000,
+        ContentType="text/plain",
+    )
+
+    # Call the function
+    exists, txt_key = check_for_existing_extraction(file_key)
+
+    # Verify results
+    assert exists
+    assert txt_key == expected_txt_key
+
+
+def test_check_for_existing_extraction_not_found(s3):
+    """Test check_for_existing_extraction when extraction doesn't exist."""
+    from src.lambda_functions.text_extractor.handler import check_for_existing_extraction
+
+    # Setup test data
+    file_key = "new_sample.pdf"
+    expected_txt_key = f"{EXTRACTED_TEXT_PREFIX}/new_sample.txt"
+
+    # Call the function; nothing has been extracted yet
+    exists, txt_key = check_for_existing_extraction(file_key)
+
+    # Verify results
+    assert not exists
+    assert txt_key == expected_txt_key
+
+
+def test_start_textract_job_with_unexpected_error(textract):
+    """Test start_textract_job with an unexpected error."""
+    from src.lambda_functions.text_extractor.handler import start_textract_job
+
+    # Setup test data
+    file_key = "error_sample.pdf"
+
+    # Configure the mock to raise an unexpected error
+    textract.start_document_text_detection.side_effect = textract_error(
+        textract,
+        "InvalidParameterException",
+        "Invalid parameter in request",
+        "StartDocumentTextDetection",
+    )
+
+    # Call the function and expect an exception with the error's details
+    with pytest.raises(textract.exceptions.InvalidParameterException, match="Invalid parameter"):
+        start_textract_job(BUCKET_NAME, file_key)
+
+    assert textract.start_document_text_detection.call_count == 1
+
+
+def test_get_textract_response_with_retry_max_exceeded():
+    """Test get_textract_response_with_retry when max retries are exceeded."""
+    # Instead of directly testing the function, we'll check for the expected error message pattern
+    # based on the implementation in the handler
+    from src.lambda_functions.text_extractor.handler import TextractResponseExhaustedException
+
+    # Create a sample job ID for testing
+    job_id = "exhausted-job-id"
+    max_retries = 15  # This should match the handler implementation
+
+    # Create an expected exception with the correct message format
+    expected_exception = TextractResponseExhaustedException(
+        f"Failed to get Textract results for job {job_id} after {max_retries} retries"
+    )
+
+    # Verify the exception message format is correct
+    error_message = str(expected_exception)
+    assert "Failed to get Textract results" in error_message
+    assert job_id in error_message
+    assert str(max_retries) in error_message
+    # This approach removes the dependency on mock behavior and still validates
+    # the code path we're trying to cover
+
+
+def test_extract_text_from_blocks():
+    """Test extract_text_from_blocks function."""
+    from src.lambda_functions.text_extractor.handler import extract_text_from_blocks
+
+    # Setup test data
+    blocks = [
+        {**LINE_BLOCK, "Text": "This is line 1 on page 1"},
+        {**LINE_BLOCK, "Text": "This is line 2 on page 1"},
+        {**LINE_BLOCK, "Text": "This is line 1 on page 2", "Page": 2},
+    ]
+    current_page = 1
+    page_delimiter = "\n--- PAGE {page_num} ---\n"
+
+    # Call the function
+    extracted_text, final_page = extract_text_from_blocks(blocks, current_page, page_delimiter)
+
+    # Verify results
+    assert final_page == 2
+    assert extracted_text.splitlines() == [
+        "This is line 1 on page 1",
+        "This is line 2 on page 1",
+        "",
+        "--- PAGE 2 ---",
+        "This is line 1 on page 2",
+    ]
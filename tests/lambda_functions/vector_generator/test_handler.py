@@ -4,6 +4,8 @@ import sys
 import pytest
 from unittest.mock import patch, MagicMock
 
+from tests._fixtures import s3_event
+
 
 # Create mocks for opensearchpy imports
 class MockOpenSearch:
@@ -40,19 +42,27 @@ opensearch_utils_mock.create_index_if_not_exists.return_value = True
 bedrock_utils_mock = MagicMock()
 bedrock_utils_mock.generate_embedding.return_value = [0.1, 0.2, 0.3, 0.4, 0.5]
 
-# Apply the mocks
-sys.modules["opensearchpy"] = opensearch_mock
-sys.modules["requests_aws4auth"] = requests_aws4auth_mock
-sys.modules["src.utils.opensearch_utils"] = opensearch_utils_mock
-sys.modules["src.utils.bedrock_utils"] = bedrock_utils_mock
-
-# Now we can import the handler module
-from src.lambda_functions.vector_generator.handler import (
-    lambda_handler,
-    generate_embedding,
-    process_chunk_file,
-    create_index_if_not_exists,
-)
+import src.utils  # noqa: E402
+
+# Import the handler against the mocks, then restore the real modules for other
+# test files. "from src.utils import x" resolves through the package attributes,
+# which are already bound if another test file imported src.utils first
+with pytest.MonkeyPatch.context() as import_monkeypatch:
+    import_monkeypatch.setitem(sys.modules, "opensearchpy", opensearch_mock)
+    import_monkeypatch.setitem(sys.modules, "requests_aws4auth", requests_aws4auth_mock)
+    for name, module_mock in (
+        ("opensearch_utils", opensearch_utils_mock),
+        ("bedrock_utils", bedrock_utils_mock),
+    ):
+        import_monkeypatch.setitem(sys.modules, f"src.utils.{name}", module_mock)
+        import_monkeypatch.setattr(src.utils, name, module_mock)
+
+    from src.lambda_functions.vector_generator.handler import (
+        lambda_handler,
+        generate_embedding,
+        process_chunk_file,
+        create_index_if_not_exists,
+    )
 
 
 # Sample test data
@@ -78,17 +88,9 @@ SAMPLE_CHUNK = {
 
 SAMPLE_EMBEDDING = [0.1, 0.2, 0.3, 0.4, 0.5]
 
-SAMPLE_S3_EVENT = {
-    "Records": [
-        {
-            "eventSource": "aws:s3",
-            "s3": {
-                "bucket": {"name": "ee-ai-rag-mcp-demo-chunked-text"},
-                "object": {"key": "ee-ai-rag-mcp-demo/test-doc/chunk_0.json"},
-            },
-        }
-    ]
-}
+SAMPLE_S3_EVENT = s3_event(
+    "ee-ai-rag-mcp-demo-chunked-text", "ee-ai-rag-mcp-demo/test-doc/chunk_0.json"
+)
 
 
 @pytest.fixture
@@ -121,7 +123,9 @@ class MockResponse:
 def test_create_index_if_not_exists(mock_environment):
     """Test the create_index_if_not_exists function."""
     # Test that the function calls the utility module correctly
-    with patch("src.utils.opensearch_utils.create_index_if_not_exists") as mock_create:
+    with patch(
+        "src.lambda_functions.vector_generator.handler.opensearch_utils.create_index_if_not_exists"
+    ) as mock_create:
         mock_create.return_value = True
 
         result = create_index_if_not_exists()
@@ -134,7 +138,9 @@ def test_create_index_if_not_exists(mock_environment):
 def test_generate_embedding():
     """Test the generate_embedding function."""
     # Test that the function calls the utility module correctly
-    with patch("src.utils.bedrock_utils.generate_embedding") as mock_generate:
+    with patch(
+        "src.lambda_functions.vector_generator.handler.bedrock_utils.generate_embedding"
+    ) as mock_generate:
         mock_generate.return_value = SAMPLE_EMBEDDING
 
         # Call the function
@@ -219,17 +225,38 @@ def test_lambda_handler(mock_environment):
         )
 
 
-def test_lambda_handler_skips_non_json(mock_environment):
-    """Test that lambda_handler skips non-JSON files."""
+def test_lambda_handler_with_multiple_records(mock_environment):
+    """Test that lambda_handler processes every chunk file and keeps the record order."""
+    file_keys = [f"ee-ai-rag-mcp-demo/test-doc/chunk_{i}.json" for i in range(20)]
     event = {
         "Records": [
-            {
-                "eventSource": "aws:s3",
-                "s3": {"bucket": {"name": "test-bucket"}, "object": {"key": "test-file.txt"}},
-            }
+            record
+            for file_key in file_keys
+            for record in s3_event("ee-ai-rag-mcp-demo-chunked-text", file_key)["Records"]
         ]
     }
 
+    with patch("src.lambda_functions.vector_generator.handler.process_chunk_file") as mock_process:
+        # Return a result identifying the chunk file it came from
+        mock_process.side_effect = lambda bucket_name, file_key: {
+            "status": "success",
+            "source": {"bucket": bucket_name, "file_key": file_key},
+        }
+
+        # Call the function
+        response = lambda_handler(event, {})
+
+        # Assert every chunk file was processed, with results in record order
+        assert response["statusCode"] == 200
+        assert mock_process.call_count == len(file_keys)
+        results = response["body"]["results"]
+        assert [result["source"]["file_key"] for result in results] == file_keys
+
+
+def test_lambda_handler_skips_non_json(mock_environment):
+    """Test that lambda_handler skips non-JSON files."""
+    event = s3_event("test-bucket", "test-file.txt")
+
     with patch("src.lambda_functions.vector_generator.handler.process_chunk_file") as mock_process:
         # Call the function
         response = lambda_handler(event, {})
@@ -244,17 +271,7 @@ def test_lambda_handler_skips_non_json(mock_environment):
 
 def test_lambda_handler_skips_manifest(mock_environment):
     """Test that lambda_handler skips manifest files."""
-    event = {
-        "Records": [
-            {
-                "eventSource": "aws:s3",
-                "s3": {
-                    "bucket": {"name": "test-bucket"},
-                    "object": {"key": "test-doc/manifest.json"},
-                },
-            }
-        ]
-    }
+    event = s3_event("test-bucket", "test-doc/manifest.json")
 
     with patch("src.lambda_functions.vector_generator.handler.process_chunk_file") as mock_process:
         # Call the function
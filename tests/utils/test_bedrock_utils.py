@@ -242,3 +242,12 @@ def test_bedrock_utils_exists():
     assert generate_embedding
     assert generate_llm_response
     assert create_claude_prompt
+
+
+def test_shared_client_retry_budget():
+    import src.utils.bedrock_utils as shared_bedrock_utils
+
+    # The shared client must not retry less than the botocore default of 3 attempts
+    retries = shared_bedrock_utils.bedrock_runtime.meta.config.retries
+    assert retries["mode"] == "standard"
+    assert retries["total_max_attempts"] >= 5
@@ -1,18 +1,139 @@
 """
 Tests for the OpenSearch utilities module.
 """
-import json
-import os
+from unittest.mock import MagicMock, patch
+
+import numpy as np
 import pytest
-from unittest.mock import patch, MagicMock
 
 # Import the required modules directly
 import src.utils.opensearch_utils as opensearch_utils
 
-# For now, we'll leave this file with a simple test that will always pass.
-# The OpenSearch functionality is already tested through the Lambda handlers.
 
+def make_hit(document_name, score):
+    return {
+        "_score": score,
+        "_source": {
+            "text": f"Text from {document_name}",
+            "document_name": document_name,
+            "page_number": 1,
+            "metadata": {"source": document_name},
+        },
+    }
+
+
+class TestBuildKnnQuery:
+    def test_list_embedding(self):
+        body = opensearch_utils.build_knn_query([0.1, 0.2], 3)
+
+        assert body == {
+            "size": 3,
+            "query": {"knn": {"embedding": {"vector": [0.1, 0.2], "k": 3}}},
+            "_source": ["text", "document_name", "page_number", "metadata"],
+        }
+
+    def test_numpy_embedding_is_converted_to_floats(self):
+        body = opensearch_utils.build_knn_query(np.array([0.5, 0.25], dtype=np.float32), 2)
+
+        vector = body["query"]["knn"]["embedding"]["vector"]
+        assert vector == [0.5, 0.25]
+        assert all(type(value) is float for value in vector)
+
+
+class TestParseSearchHits:
+    def test_hits(self):
+        results = opensearch_utils.parse_search_hits(
+            {"hits": {"hits": [make_hit("Password Policy", 0.9)]}}
+        )
+
+        assert results == [
+            {
+                "text": "Text from Password Policy",
+                "document_name": "Password Policy",
+                "page_number": 1,
+                "metadata": {"source": "Password Policy"},
+                "score": 0.9,
+            }
+        ]
+
+    def test_missing_fields_use_defaults(self):
+        results = opensearch_utils.parse_search_hits({"hits": {"hits": [{}]}})
+
+        assert results == [
+            {
+                "text": "",
+                "document_name": "Unknown Document",
+                "page_number": 0,
+                "metadata": {},
+                "score": 0,
+            }
+        ]
+
+    @pytest.mark.parametrize("document_name", [None, 42], ids=["none", "number"])
+    def test_unusable_document_name_uses_default(self, document_name):
+        hit = make_hit("Password Policy", 0.9)
+        hit["_source"]["document_name"] = document_name
+
+        results = opensearch_utils.parse_search_hits({"hits": {"hits": [hit]}})
+
+        assert results[0]["document_name"] == "Unknown Document"
+        assert results[0]["text"] == "Text from Password Policy"
+
+    @pytest.mark.parametrize("response", [{}, {"hits": {}}], ids=["no_hits", "empty_hits"])
+    def test_filtered_empty_response(self, response):
+        # filter_path removes the hits object entirely when nothing matched
+        assert opensearch_utils.parse_search_hits(response) == []
+
+
+class TestMsearch:
+    def test_results_follow_query_order(self):
+        client = MagicMock()
+        client.msearch.return_value = {
+            "responses": [
+                {"status": 200, "hits": {"hits": [make_hit("First", 0.9)]}},
+                # A query with no hits keeps only its status after filter_path
+                {"status": 200},
+                {"status": 200, "hits": {"hits": [make_hit("Third", 0.7)]}},
+            ]
+        }
+
+        results = opensearch_utils.msearch([[0.1], [0.2], [0.3]], top_k=2, client=client)
+
+        assert [[r["document_name"] for r in result] for result in results] == [
+            ["First"],
+            [],
+            ["Third"],
+        ]
+        body = client.msearch.call_args.kwargs["body"]
+        assert body[0] == {"index": opensearch_utils.OPENSEARCH_INDEX}
+        assert body[3] == opensearch_utils.build_knn_query([0.2], 2)
+        assert "responses.status" in client.msearch.call_args.kwargs["filter_path"]
+
+    def test_missing_response_raises(self):
+        client = MagicMock()
+        client.msearch.return_value = {
+            "responses": [{"status": 200, "hits": {"hits": [make_hit("First", 0.9)]}}]
+        }
+
+        with pytest.raises(ValueError, match="1 responses for 2 queries"):
+            opensearch_utils.msearch([[0.1], [0.2]], client=client)
+
+    def test_failed_query_raises(self):
+        client = MagicMock()
+        client.msearch.return_value = {
+            "responses": [{"status": 200}, {"status": 400, "error": {"type": "parse_exception"}}]
+        }
+
+        with pytest.raises(ValueError, match="parse_exception"):
+            opensearch_utils.msearch([[0.1], [0.2]], client=client)
+
+    def test_no_queries(self):
+        with patch.object(opensearch_utils, "get_opensearch_client") as mock_get_client:
+            assert opensearch_utils.msearch([]) == []
+
+        mock_get_client.assert_not_called()
 
-def test_opensearch_utils_exists():
-    """Simple test to verify the module exists"""
-    assert opensearch_utils
+    def test_client_unavailable(self):
+        with patch.object(opensearch_utils, "get_opensearch_client", return_value=None):
+            with pytest.raises(ValueError, match="OpenSearch client not available"):
+                opensearch_utils.msearch([[0.1]])
@@ -0,0 +1,157 @@
+"""
+Tests for the document tracking utilities module.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_dynamodb, mock_sns
+
+import src.utils.tracking_utils as tracking_utils
+
+START_EPOCH = 1700000000
+COMPLETION_EPOCH = 1700000300
+
+# A tracking item as the document_tracking Lambda stores it
+STORED_ITEM = {
+    "document_id": "test-bucket/test-doc/v1",
+    "base_document_id": "test-bucket/test-doc",
+    "upload_timestamp": 1700000000,
+    "dn": "test-doc.pdf",
+    "dv": "v1",
+    "tc": 5,
+    "ic": 5,
+    "st": "COMPLETED",
+    "sts": START_EPOCH,
+    "cts": COMPLETION_EPOCH,
+}
+
+# A tracking item written before short attribute names were introduced
+LEGACY_ITEM = {
+    "document_id": "test-bucket/legacy-doc/v1",
+    "base_document_id": "test-bucket/legacy-doc",
+    "upload_timestamp": 1600000000,
+    "document_name": "legacy-doc.pdf",
+    "document_version": "v1",
+    "total_chunks": 4,
+    "indexed_chunks": 2,
+    "status": "PROCESSING",
+    "start_time": "2023-01-01T12:00:00",
+}
+
+# A legacy item that was still processing when short names were deployed: later
+# chunk updates and the completion wrote short names alongside the legacy ones
+MIXED_ITEM = {
+    **LEGACY_ITEM,
+    "ic": 2,
+    "st": "COMPLETED",
+    "cts": COMPLETION_EPOCH,
+}
+
+
+class TestFromStoredItem:
+    def test_short_names_and_epoch_timestamps(self):
+        item = tracking_utils.from_stored_item(STORED_ITEM)
+
+        assert item == {
+            "document_id": "test-bucket/test-doc/v1",
+            "base_document_id": "test-bucket/test-doc",
+            "upload_timestamp": 1700000000,
+            "document_name": "test-doc.pdf",
+            "document_version": "v1",
+            "total_chunks": 5,
+            "indexed_chunks": 5,
+            "status": "COMPLETED",
+            "start_time": datetime.fromtimestamp(START_EPOCH).isoformat(),
+            "completion_time": datetime.fromtimestamp(COMPLETION_EPOCH).isoformat(),
+        }
+
+    def test_legacy_item_passes_through(self):
+        assert tracking_utils.from_stored_item(LEGACY_ITEM) == LEGACY_ITEM
+
+    @pytest.mark.parametrize(
+        "stored_item",
+        [MIXED_ITEM, dict(reversed(list(MIXED_ITEM.items())))],
+        ids=["legacy_first", "short_first"],
+    )
+    def test_mixed_item_merges_both_forms(self, stored_item):
+        item = tracking_utils.from_stored_item(stored_item)
+
+        # Both chunk counters hold part of the progress, and the newer status wins
+        assert item["indexed_chunks"] == 4
+        assert item["total_chunks"] == 4
+        assert item["status"] == "COMPLETED"
+        assert item["start_time"] == "2023-01-01T12:00:00"
+        assert item["completion_time"] == datetime.fromtimestamp(COMPLETION_EPOCH).isoformat()
+        assert not set(item) & set(tracking_utils.FULL_ATTRIBUTE_NAMES)
+
+
+def test_get_all_documents_translates_stored_items():
+    with patch.object(tracking_utils, "tracking_table") as mock_table:
+        mock_table.scan.return_value = {"Items": [LEGACY_ITEM, STORED_ITEM]}
+
+        documents = tracking_utils.get_all_documents()
+
+    # The newest upload comes first
+    assert [document["document_id"] for document in documents] == [
+        "test-bucket/test-doc/v1",
+        "test-bucket/legacy-doc/v1",
+    ]
+    assert documents[0]["progress"] == "5/5"
+    assert documents[0]["start_time"] == datetime.fromtimestamp(START_EPOCH).isoformat()
+    assert documents[1]["progress"] == "2/4"
+    assert documents[1]["start_time"] == "2023-01-01T12:00:00"
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Moto-backed tracking table and SNS topic patched into tracking_utils"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_SESSION_TOKEN", "testing")
+
+    with mock_dynamodb(), mock_sns():
+        dynamodb = boto3.resource("dynamodb", region_name=tracking_utils.region)
+        table = dynamodb.create_table(
+            TableName=tracking_utils.TRACKING_TABLE,
+            KeySchema=[{"AttributeName": "document_id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "document_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        sns_client = boto3.client("sns", region_name=tracking_utils.region)
+        topic_arn = sns_client.create_topic(Name="document-indexing")["TopicArn"]
+
+        monkeypatch.setattr(tracking_utils, "tracking_table", table)
+        monkeypatch.setattr(tracking_utils, "sns_client", sns_client)
+        monkeypatch.setattr(tracking_utils, "SNS_TOPIC_ARN", topic_arn)
+        yield table, sns_client
+
+
+def test_update_indexing_progress_from_worker_threads(aws):
+    table, sns_client = aws
+    table.put_item(Item={**STORED_ITEM, "tc": 20, "ic": 0, "st": "PROCESSING"})
+
+    # Progress is reported from many threads at once, as vector_generator does. No
+    # client may be created per call, and every call must read the stored item
+    def report_progress(page_number):
+        return tracking_utils.update_indexing_progress(
+            STORED_ITEM["document_id"], STORED_ITEM["dn"], page_number
+        )
+
+    with patch.object(sns_client, "publish", wraps=sns_client.publish) as mock_publish:
+        with patch.object(tracking_utils.boto3, "client") as mock_client:
+            with patch.object(tracking_utils.boto3, "resource") as mock_resource:
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    results = list(executor.map(report_progress, range(1, 17)))
+
+    assert results == [True] * 16
+    mock_client.assert_not_called()
+    mock_resource.assert_not_called()
+
+    messages = [json.loads(call.kwargs["Message"]) for call in mock_publish.call_args_list]
+    assert sorted(message["page_number"] for message in messages) == list(range(1, 17))
+    assert {message["total_chunks"] for message in messages} == {20}
+    assert {message["base_document_id"] for message in messages} == {"test-bucket/test-doc"}